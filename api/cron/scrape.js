@@ -8,6 +8,25 @@ import path from 'path';
 
 const execAsync = promisify(exec);
 
+// Write to a temp file in the same directory, fsync, then rename over the
+// target so the API never reads a half-written status file
+function writeFileAtomic(file, data) {
+  const tmp = path.join(path.dirname(file), `.${path.basename(file)}.${process.pid}.tmp`);
+  const fd = fs.openSync(tmp, 'w', 0o644);
+  try {
+    fs.writeSync(fd, data);
+    fs.fsyncSync(fd);
+  } finally {
+    fs.closeSync(fd);
+  }
+  try {
+    fs.renameSync(tmp, file);
+  } catch (err) {
+    fs.rmSync(tmp, { force: true });
+    throw err;
+  }
+}
+
 export default async function handler(req, res) {
   // Only allow POST requests (Vercel cron requirement)
   if (req.method !== 'POST') {
@@ -38,7 +57,7 @@ export default async function handler(req, res) {
     };
 
     // Write status to a file that the main API can read
-    fs.writeFileSync('data/cron_status.json', JSON.stringify(statusData, null, 2));
+    writeFileAtomic('data/cron_status.json', JSON.stringify(statusData, null, 2));
 
     return res.status(200).json({
       status: 'success',
@@ -58,7 +77,7 @@ export default async function handler(req, res) {
       stack: error.stack
     };
     
-    fs.writeFileSync('data/cron_error.json', JSON.stringify(errorData, null, 2));
+    writeFileAtomic('data/cron_error.json', JSON.stringify(errorData, null, 2));
 
     return res.status(500).json({
       status: 'error',
@@ -0,0 +1,340 @@
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip is always available
+    brotli = None
+
+# Project root directory (data files live in <root>/data)
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data"
+
+# The scraper and its storage modules live at the project root
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from history import PublicationHistory
+from publication_index import PublicationIndex
+
+
+class CachedJSONFile:
+    """A JSON file parsed once and kept in memory until it changes on disk"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._data = None
+        self._signature = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.publishes = 0
+        # Incremented every time a new snapshot is loaded or published
+        self.generation = 0
+
+    def _stat_signature(self):
+        """Return (inode, mtime_ns, size) for the file, or None if it is missing"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def exists(self):
+        return self._stat_signature() is not None
+
+    def get(self):
+        """Return the parsed snapshot, reloading only if the file was rewritten"""
+        return self.get_versioned()[1]
+
+    def get_versioned(self):
+        """Return (generation, snapshot) so callers can cache derived data per snapshot"""
+        signature = self._stat_signature()
+        if signature is None:
+            with self._lock:
+                self._data = None
+                self._signature = None
+            raise FileNotFoundError(self.path)
+
+        with self._lock:
+            if self._signature == signature and self._data is not None:
+                self.hits += 1
+                return self.generation, self._data
+
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            if self._signature is None:
+                self.misses += 1
+            else:
+                self.reloads += 1
+            self._data = data
+            self._signature = signature
+            self.generation += 1
+            return self.generation, data
+
+    def publish(self, data):
+        """Swap in an already-parsed snapshot written by an in-process scrape"""
+        signature = self._stat_signature()
+        with self._lock:
+            self._data = data
+            self._signature = signature
+            self.generation += 1
+            self.publishes += 1
+
+    def get_or_default(self, default=None):
+        """Like get(), but return default when the file is missing or unreadable"""
+        try:
+            return self.get()
+        except (OSError, ValueError):
+            return default
+
+    def stats(self):
+        return {
+            "file": self.path.name,
+            "loaded": self._signature is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "publishes": self.publishes,
+            "generation": self.generation,
+        }
+
+
+def quality(params):
+    """q-value among the ";"-separated parameters of an Accept-Encoding entry (1 without one, 0 if malformed)"""
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                return 0.0
+            return q if 0 <= q <= 1 else 0.0
+    return 1.0
+
+
+class RenderedPayload:
+    """A JSON response body serialized once, with compressed variants and a content-hash ETag"""
+
+    def __init__(self, data):
+        # Same separators/escaping as FastAPI's default JSONResponse
+        self.body = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.encodings = {"gzip": gzip.compress(self.body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.encodings["br"] = brotli.compress(self.body, quality=11)
+
+    def choose(self, accept_encoding):
+        """Return (content_encoding, body) for an Accept-Encoding header value"""
+        accepted = set()
+        for part in (accept_encoding or "").split(","):
+            coding, *params = part.split(";")
+            if coding.strip() and quality(params) > 0:
+                accepted.add(coding.strip().lower())
+        for coding in ("br", "gzip"):
+            if coding in self.encodings and (coding in accepted or "*" in accepted):
+                return coding, self.encodings[coding]
+        return None, self.body
+
+    def matches(self, if_none_match):
+        """True when an If-None-Match header value covers this payload's ETag"""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") == self.etag for tag in tags)
+
+
+class DataStore:
+    """Shared in-memory snapshot of the scraper output files used by the API"""
+
+    def __init__(self, data_dir=DATA_DIR, year=None):
+        self.data_dir = Path(data_dir)
+        # Pin a yearly snapshot; None follows whichever snapshot the scraper wrote last
+        self.year = year
+        self._payloads = {}
+        self._payload_lock = threading.Lock()
+        self.renders = 0
+        self._snapshots = {}
+        self._snapshots_lock = threading.Lock()
+        self._latest_snapshot = (None, None)
+        self.cron_status_file = CachedJSONFile(self.data_dir / "cron_status.json")
+        self.cron_error_file = CachedJSONFile(self.data_dir / "cron_error.json")
+        # Bumped by the scraper after all output files of a run are in place
+        self.generation_file = CachedJSONFile(self.data_dir / "generation.json")
+        self.change_log_file = self.data_dir / "changelog.jsonl"
+        self.history = PublicationHistory(self.data_dir / "history")
+        self.history_index_file = CachedJSONFile(self.history.index_file)
+        self.publication_index = PublicationIndex(self.data_dir / "publications.db")
+        self._index_lock = threading.Lock()
+        self._indexed_source = None
+        self._publication_id = None
+
+    def _latest_snapshot_path(self):
+        """Newest angspe_publications_{year}.json, re-listed only when the directory changes"""
+        try:
+            signature = os.stat(self.data_dir).st_mtime_ns
+        except FileNotFoundError:
+            signature = None
+        cached_signature, path = self._latest_snapshot
+        if signature is None or signature != cached_signature:
+            years = []
+            for candidate in self.data_dir.glob("angspe_publications_*.json"):
+                year = candidate.stem.rsplit("_", 1)[-1]
+                if year.isdigit():
+                    years.append(int(year))
+            year = max(years) if years else datetime.now().year
+            path = self.data_dir / f"angspe_publications_{year}.json"
+            self._latest_snapshot = (signature, path)
+        return path
+
+    def current_snapshot_path(self):
+        """Path of the "current" publications file
+        
+        The scraper records the files of its last run in generation.json; data
+        written before that is resolved to the newest yearly snapshot.
+        """
+        if self.year is not None:
+            return self.data_dir / f"angspe_publications_{self.year}.json"
+        files = (self.generation_file.get_or_default({}) or {}).get("files") or {}
+        if files.get("publications"):
+            return self.data_dir / files["publications"]
+        return self._latest_snapshot_path()
+
+    @property
+    def publications_file(self):
+        """CachedJSONFile of the current snapshot (one per path, so a year change keeps the cache warm)"""
+        path = self.current_snapshot_path()
+        cached = self._snapshots.get(path)
+        if cached is None:
+            with self._snapshots_lock:
+                cached = self._snapshots.setdefault(path, CachedJSONFile(path))
+        return cached
+
+    def publications_data(self):
+        """Return the full publications document (publications, analysis, metadata)"""
+        return self.publications_file.get()
+
+    def publish_publications(self, document):
+        self.publications_file.publish(document)
+
+    def publications(self):
+        return self.publications_data().get('publications', [])
+
+    def analysis(self):
+        return self.publications_data().get('analysis', {})
+
+    def rendered(self, name, select):
+        """Return the RenderedPayload of select(publications document), rendered once per snapshot
+
+        Loading and compressing a snapshot blocks; async endpoints call this through run_in_threadpool.
+        """
+        snapshot = self.publications_file
+        generation, data = snapshot.get_versioned()
+        version = (snapshot.path, generation)
+        cached = self._payloads.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with self._payload_lock:
+            cached = self._payloads.get(name)
+            if cached is None or cached[0] != version:
+                cached = (version, RenderedPayload(select(data)))
+                self._payloads[name] = cached
+                self.renders += 1
+        return cached[1]
+
+    def data_generation(self):
+        """Generation number of the data on disk (None before the first tracked scrape)"""
+        return (self.generation_file.get_or_default({}) or {}).get('generation')
+
+    def recent_changes(self, limit=20):
+        """Return the last `limit` change log entries, newest first"""
+        try:
+            with open(self.change_log_file, "r", encoding="utf-8") as f:
+                lines = deque(f, maxlen=limit)
+        except FileNotFoundError:
+            return []
+        entries = []
+        for line in reversed(lines):
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # Torn last line of an interrupted append
+        return entries
+
+    def ensure_publication_index(self):
+        """Bring the SQLite index up to the current snapshot if the scraper didn't
+        (data written before the index existed, or by another process)"""
+        data = self.publications_data()
+        source = data.get('scraped_at')
+        if source is not None and source == self._indexed_source:
+            return
+        with self._index_lock:
+            if not self.publication_index.is_synced(source):
+                self.publication_index.sync(
+                    [pub if pub.get('id') else {**pub, 'id': self._legacy_id(pub)} for pub in data.get('publications', [])],
+                    seen_at=source,
+                    source=source
+                )
+            self._indexed_source = source
+
+    def _legacy_id(self, pub):
+        """Stable ID for publications saved before IDs were stored"""
+        if self._publication_id is None:
+            from scraper import ANGSPEScraper
+            self._publication_id = ANGSPEScraper(self.data_dir).publication_id
+        return self._publication_id(pub)
+
+    def query_publications(self, **filters):
+        """One page of publications from the SQLite index (see PublicationIndex.query)"""
+        self.ensure_publication_index()
+        return self.publication_index.query(**filters)
+
+    def search_publications(self, query, limit=20, offset=0):
+        """Ranked full-text search over the current publications (see PublicationIndex.search)"""
+        self.ensure_publication_index()
+        return self.publication_index.search(query, limit, offset)
+
+    def history_index(self):
+        """The publication history index, cached until the scraper rewrites it"""
+        index = self.history_index_file.get_or_default()
+        if index is None or not self.history.is_current(index):
+            # Missing or behind the log (e.g. read mid-append): replay without writing
+            index = self.history.load_index(persist=False)
+        return index
+
+    def history_records(self, year=None, category=None, active=None, limit=None):
+        return self.history.query(year=year, category=category, active=active, limit=limit,
+                                  index=self.history_index())
+
+    def history_summary(self):
+        return self.history.summary(index=self.history_index())
+
+    def cron_info(self):
+        """Return cron status merged with the last cron error, if any"""
+        cron_info = dict(self.cron_status_file.get_or_default({}) or {})
+        cron_error = self.cron_error_file.get_or_default()
+        if cron_error is not None:
+            cron_info['last_error'] = cron_error
+        return cron_info
+
+    def stats(self):
+        return {
+            "publications": self.publications_file.stats(),
+            "history_index": self.history_index_file.stats(),
+            "cron_status": self.cron_status_file.stats(),
+            "cron_error": self.cron_error_file.stats(),
+            "rendered_payloads": self.renders,
+        }
+
+
+# Module-level store shared by all endpoints
+data_store = DataStore()
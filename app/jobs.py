@@ -0,0 +1,129 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+# Pipeline stages reported by the scraper, in order
+STAGES = ("fetch", "parse", "download", "dedup", "analyze", "save", "viewers")
+# Job states that will not change any more
+TERMINAL_STATES = ("success", "not_modified", "skipped", "error")
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Job:
+    """One refresh run: state, timings and per-stage progress
+
+    Updates must happen on the event loop; every change wakes the waiters of
+    the current `changed` event so SSE streams can push it immediately.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.state = "queued"
+        self.created_at = _now()
+        self.started_at = None
+        self.finished_at = None
+        self.duration_seconds = None
+        self.result = {}
+        self.stages = OrderedDict(
+            (name, {"state": "pending", "started_at": None, "finished_at": None, "duration_seconds": None})
+            for name in STAGES
+        )
+        self.version = 0
+        self.changed = asyncio.Event()
+        self._start = None
+        self._stage_starts = {}
+
+    @property
+    def done(self):
+        return self.state in TERMINAL_STATES
+
+    def _notify(self):
+        self.version += 1
+        event, self.changed = self.changed, asyncio.Event()
+        event.set()
+
+    def start(self):
+        self.state = "running"
+        self.started_at = _now()
+        self._start = time.perf_counter()
+        self._notify()
+
+    def update_stage(self, name, state):
+        """Move a stage to running, done or skipped"""
+        stage = self.stages.get(name)
+        if stage is None:
+            return
+        if state == "running":
+            stage["started_at"] = _now()
+            self._stage_starts[name] = time.perf_counter()
+        elif name in self._stage_starts:
+            stage["finished_at"] = _now()
+            stage["duration_seconds"] = round(time.perf_counter() - self._stage_starts.pop(name), 3)
+        stage["state"] = state
+        self._notify()
+
+    def finish(self, state, **result):
+        self.state = state
+        self.finished_at = _now()
+        if self._start is not None:
+            self.duration_seconds = round(time.perf_counter() - self._start, 3)
+        for stage in self.stages.values():
+            if stage["state"] in ("pending", "running"):
+                stage["state"] = "skipped"
+        self.result = result
+        self._notify()
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "state": self.state,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": self.duration_seconds,
+            "stages": dict(self.stages),
+            **self.result
+        }
+
+
+class JobRegistry:
+    """In-memory registry of recent refresh jobs"""
+
+    def __init__(self, max_jobs=50):
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+
+    def create(self):
+        job = Job(uuid.uuid4().hex[:12])
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def recent(self, limit=10):
+        return [job.to_dict() for job in reversed(list(self._jobs.values())[-limit:])]
+
+    async def events(self, job, keepalive=15):
+        """Yield Server-Sent Events for a job until it reaches a terminal state"""
+        version = -1
+        while True:
+            changed = job.changed
+            if job.version != version:
+                version = job.version
+                event = "done" if job.done else "progress"
+                yield f"event: {event}\ndata: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+                if job.done:
+                    return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
@@ -1,16 +1,20 @@
-from fastapi import FastAPI, Request, BackgroundTasks, HTTPException, Depends, Header
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, Request, HTTPException, Depends, Header, Query
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from pathlib import Path
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime, timezone
 import os
-import subprocess
-import sys
-import json
+import time
 
 
 from app.models import Analysis, Status
+# Importing the data store also puts the project root (scraper modules) on sys.path
+from app.data_store import data_store, DATA_DIR
+
+from app.scrape_worker import ScrapeWorker
+from scraper import expand_analysis
+from publication_index import InvalidCursor
 
 # API Key for authentication (in production, use environment variables)
 API_KEY = os.getenv("ANGSPE_API_KEY", "angspe_refresh_2025")
@@ -33,6 +37,13 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# In-process scraper shared by all refreshes (keeps its connection pool warm)
+scrape_worker = ScrapeWorker(data_store, DATA_DIR)
+
+@app.on_event("shutdown")
+async def shutdown_scrape_worker():
+    await scrape_worker.shutdown()
+
 # Setup templates and static files
 templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -42,39 +53,124 @@ async def root(request: Request):
     """Main page with publications table"""
     return templates.TemplateResponse("index.html", {"request": request})
 
+def payload_response(request: Request, payload):
+    """Serve a pre-rendered payload: 304 on a matching ETag, else the best compressed variant"""
+    headers = {
+        "ETag": payload.etag,
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "no-cache"
+    }
+    if payload.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    
+    encoding, body = payload.choose(request.headers.get("accept-encoding"))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @app.get("/api/publications")
-async def get_publications():
-    """Get all publications data"""
+async def get_publications(
+    request: Request,
+    category: str = None,
+    year: int = None,
+    type_: str = Query(None, alias="type"),
+    sort: str = Query(None, pattern="^(listing|newest|oldest|title)$"),
+    limit: int = Query(None, ge=1, le=500),
+    cursor: str = None
+):
+    """Get all publications data, or one filtered page of it
+    
+    Without parameters the full list is returned. With any of category, year,
+    type, sort, limit or cursor, the query runs against the SQLite index and
+    returns {"items", "next_cursor"}; pass next_cursor back to get the next page.
+    """
     try:
-        # Get the project root directory
-        project_root = Path(__file__).parent.parent
-        data_path = project_root / "data" / "angspe_publications_2025.json"
-        
-        if not data_path.exists():
+        if not data_store.publications_file.exists():
             raise HTTPException(status_code=404, detail="Publications data not found")
         
-        with open(data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if any(value is not None for value in (category, year, type_, sort, limit, cursor)):
+            try:
+                # The first query after an out-of-process scrape syncs the SQLite index
+                items, next_cursor = await run_in_threadpool(
+                    data_store.query_publications,
+                    category=category, year=year, file_type=type_,
+                    sort=sort or "listing", limit=limit or 50, cursor=cursor
+                )
+            except InvalidCursor as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return {"items": items, "next_cursor": next_cursor}
         
-        return data.get('publications', [])
+        payload = await run_in_threadpool(
+            data_store.rendered, "publications", lambda data: data.get('publications', [])
+        )
+        return payload_response(request, payload)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading publications: {str(e)}")
 
-@app.get("/api/analysis")
-async def get_analysis():
-    """Get publications analysis data"""
+def select_analysis(data, publications_mode):
+    """Analysis with its publication references expanded, kept as IDs or omitted"""
+    analysis = data.get('analysis', {})
+    if publications_mode == "expand":
+        return expand_analysis(analysis, data.get('publications', []))
+    analysis = dict(analysis)
+    analysis.pop('publications_list', None)
+    analysis.pop('latest_publication', None)
+    if publications_mode == "omit":
+        analysis.pop('publication_ids', None)
+    return analysis
+
+def timed_search(q, limit, offset):
+    """(results, seconds): run in the threadpool, the search (and any index sync) blocks"""
+    start = time.perf_counter()
+    results = data_store.search_publications(q, limit, offset)
+    return results, time.perf_counter() - start
+
+@app.get("/api/search")
+async def search_publications(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Search titles and categories: accent- and case-insensitive, prefix matching, best matches first
+    
+    next_offset, when not null, is the offset of the next page of results.
+    """
     try:
-        # Get the project root directory
-        project_root = Path(__file__).parent.parent
-        data_path = project_root / "data" / "angspe_publications_2025.json"
+        if not data_store.publications_file.exists():
+            raise HTTPException(status_code=404, detail="Publications data not found")
         
-        if not data_path.exists():
+        # One extra match tells whether there is a next page
+        results, took = await run_in_threadpool(timed_search, q, limit + 1, offset)
+        return {
+            "query": q,
+            "results": [{**pub, "score": score} for pub, score in results[:limit]],
+            "next_offset": offset + limit if len(results) > limit else None,
+            "took_ms": round(took * 1000, 3)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching publications: {str(e)}")
+
+@app.get("/api/analysis")
+async def get_analysis(request: Request, publications: str = Query("expand", pattern="^(expand|ids|omit)$")):
+    """Get publications analysis data
+    
+    publications=expand (default) inlines the referenced publications,
+    ids keeps only their IDs and omit drops the list entirely.
+    """
+    try:
+        if not data_store.publications_file.exists():
             raise HTTPException(status_code=404, detail="Analysis data not found")
         
-        with open(data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        return data.get('analysis', {})
+        payload = await run_in_threadpool(
+            data_store.rendered, f"analysis:{publications}", lambda data: select_analysis(data, publications)
+        )
+        return payload_response(request, payload)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading analysis: {str(e)}")
 
@@ -82,39 +178,17 @@ async def get_analysis():
 async def get_status():
     """Get application status and data freshness"""
     try:
-        # Get the project root directory
-        project_root = Path(__file__).parent.parent
-        data_path = project_root / "data" / "angspe_publications_2025.json"
-        
-        if not data_path.exists():
+        if not data_store.publications_file.exists():
             raise HTTPException(status_code=404, detail="Status data not found")
         
-        with open(data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = data_store.publications_data()
         
         # Calculate data freshness
         scraped_at = data.get('scraped_at', '')
         total_publications = data.get('total_unique_publications', 0)
         
         # Check for cron job status
-        cron_status_path = project_root / "data" / "cron_status.json"
-        cron_error_path = project_root / "data" / "cron_error.json"
-        
-        cron_info = {}
-        if cron_status_path.exists():
-            try:
-                with open(cron_status_path, 'r', encoding='utf-8') as f:
-                    cron_info = json.load(f)
-            except:
-                pass
-        
-        if cron_error_path.exists():
-            try:
-                with open(cron_error_path, 'r', encoding='utf-8') as f:
-                    cron_error = json.load(f)
-                    cron_info['last_error'] = cron_error
-            except:
-                pass
+        cron_info = data_store.cron_info()
         
         status_info = {
             "status": "healthy",
@@ -126,18 +200,40 @@ async def get_status():
             "total_publications": total_publications,
             "version": "1.0.0",
             "uptime": "running",
-            "automation": "Vercel Cron Job (daily at 6:00 AM UTC)"
+            "automation": "Vercel Cron Job (daily at 6:00 AM UTC)",
+            "last_refresh": scrape_worker.last_run,
+            "data_generation": data_store.data_generation(),
+            "cache": data_store.stats()
         }
         
         return status_info
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading status: {str(e)}")
 
+@app.get("/api/cache")
+async def get_cache_stats():
+    """Get hit/miss/reload counters for the in-memory data store"""
+    return data_store.stats()
 
+@app.get("/api/changes")
+async def get_changes(limit: int = Query(20, ge=1, le=500)):
+    """Get the most recent change log entries (added/removed/changed publications per run)"""
+    return data_store.recent_changes(limit)
 
-
-
-
+@app.get("/api/history")
+async def get_history(
+    year: int = None,
+    category: str = None,
+    active: bool = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Get every publication ever seen (including removed ones) with first_seen/last_seen, filtered by year and category"""
+    return {
+        "summary": data_store.history_summary(),
+        "records": data_store.history_records(year=year, category=category, active=active, limit=limit)
+    }
 
 @app.get("/health")
 async def health_check():
@@ -145,19 +241,65 @@ async def health_check():
     return {"status": "healthy"}
 
 @app.post("/refresh")
-async def refresh_data(background_tasks: BackgroundTasks, api_key: str = Depends(verify_api_key)):
-    """Trigger a fresh data scrape from ANGSPE (requires API key)"""
+async def refresh_data(wait: bool = False, force: bool = False, api_key: str = Depends(verify_api_key)):
+    """Trigger a fresh data scrape from ANGSPE (requires API key)
+    
+    Only one scrape runs at a time: concurrent calls attach to the running job.
+    A call within the minimum interval after a successful scrape is coalesced
+    with it (or rejected, depending on configuration) unless force=true.
+    With ?wait=true the request blocks until the scrape finishes and reports its duration.
+    """
     try:
-        # Run the scraper in the background
-        background_tasks.add_task(run_scraper)
+        job_id, disposition = scrape_worker.submit(force=force)
+        
+        if disposition == "rejected":
+            retry_after = scrape_worker.retry_after()
+            return JSONResponse(
+                content={
+                    "status": "error",
+                    "message": f"Data was refreshed recently, retry in {retry_after} seconds",
+                    "previous_run": scrape_worker.last_run
+                },
+                status_code=429,
+                headers={"Retry-After": str(retry_after)}
+            )
+        
+        if disposition == "coalesced":
+            return JSONResponse(
+                content={
+                    "status": "success",
+                    "message": "Data was refreshed recently, returning the last run",
+                    "job_id": job_id,
+                    "disposition": disposition,
+                    "run": scrape_worker.last_run
+                },
+                status_code=200
+            )
+        
+        if wait:
+            run = await scrape_worker.wait(job_id)
+            ok = run["state"] != "error"
+            return JSONResponse(
+                content={
+                    "status": "success" if ok else "error",
+                    "message": "Data refresh completed",
+                    "job_id": job_id,
+                    "disposition": disposition,
+                    "run": run
+                },
+                status_code=200 if ok else 500
+            )
         
         return JSONResponse(
             content={
                 "status": "success",
-                "message": "Data refresh started in background",
-                "note": "Data will be updated in the background. Check /api/status for latest data freshness.",
+                "message": "Data refresh started in background" if disposition == "started" else "Data refresh already in progress",
+                "note": "Follow progress at /api/jobs/{job_id} or stream it from /api/jobs/{job_id}/events.",
+                "job_id": job_id,
+                "disposition": disposition,
                 "started_at": datetime.now(timezone.utc).isoformat(),
-                "estimated_completion": "10-30 seconds"
+                "estimated_completion": "10-30 seconds",
+                "previous_run": scrape_worker.last_run
             },
             status_code=202
         )
@@ -170,30 +312,30 @@ async def refresh_data(background_tasks: BackgroundTasks, api_key: str = Depends
             status_code=500
         )
 
-def run_scraper():
-    """Run the scraper script to get fresh data"""
-    try:
-        # Get the project root directory
-        project_root = Path(__file__).parent.parent
-        scraper_path = project_root / "scraper.py"
-        
-        # Run the scraper
-        result = subprocess.run(
-            [sys.executable, str(scraper_path)],
-            capture_output=True,
-            text=True,
-            cwd=str(project_root)
-        )
-        
-        if result.returncode == 0:
-            print(f"✅ Scraper completed successfully")
-            print(f"📊 Output: {result.stdout}")
-        else:
-            print(f"❌ Scraper failed with return code {result.returncode}")
-            print(f"🔴 Error: {result.stderr}")
-            
-    except Exception as e:
-        print(f"💥 Error running scraper: {e}")
+@app.get("/api/jobs")
+async def list_jobs(limit: int = Query(10, ge=1, le=100)):
+    """Get the most recent refresh jobs"""
+    return scrape_worker.jobs.recent(limit)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get the state, timings and per-stage progress of a refresh job"""
+    job = scrape_worker.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Stream a refresh job's progress as Server-Sent Events until it finishes"""
+    job = scrape_worker.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        scrape_worker.jobs.events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # Error handlers
 @app.exception_handler(404)
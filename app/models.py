@@ -3,6 +3,7 @@ from typing import List, Dict, Optional
 from datetime import datetime
 
 class Publication(BaseModel):
+    id: Optional[str] = None
     title: str
     download_url: str
     file_size: str
@@ -11,6 +12,7 @@ class Publication(BaseModel):
     file_type: str
 
 class LatestPublication(BaseModel):
+    id: Optional[str] = None
     title: str
     download_url: str
     file_size: str
@@ -24,8 +26,11 @@ class Analysis(BaseModel):
     file_types: Dict[str, int]
     publications_by_year: Dict[str, int]
     average_file_size: str
-    latest_publication: LatestPublication
-    publications_list: List[Publication]
+    latest_publication_id: Optional[str] = None
+    publication_ids: Optional[List[str]] = None
+    # Only present when the analysis is expanded (or in files from before publication IDs)
+    latest_publication: Optional[LatestPublication] = None
+    publications_list: Optional[List[Publication]] = None
 
 class Status(BaseModel):
     status: str
@@ -0,0 +1,142 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from async_scraper import AsyncANGSPEScraper
+from app.jobs import JobRegistry
+from scraper import threshold_setting
+
+# Minimum seconds between a successful scrape and the next one
+REFRESH_MIN_INTERVAL = float(os.getenv("ANGSPE_REFRESH_MIN_INTERVAL", "60"))
+# What to do with a refresh that comes too soon: "coalesce" (return the last run) or "reject"
+REFRESH_TOO_SOON = os.getenv("ANGSPE_REFRESH_TOO_SOON", "coalesce")
+# Also fetch the documents into data/documents/ on every refresh
+DOWNLOAD_DOCUMENTS = os.getenv("ANGSPE_DOWNLOAD_DOCUMENTS", "0") == "1"
+# Drop publications whose documents are byte-identical (Range-based fingerprints, see documents.py)
+CONTENT_DEDUP = os.getenv("ANGSPE_CONTENT_DEDUP", "0") == "1"
+# Drop publications whose titles are at least this similar (0-1, see near_duplicates.py); unset disables it
+FUZZY_TITLE_THRESHOLD = (threshold_setting(os.getenv("ANGSPE_FUZZY_TITLE_THRESHOLD"), "ANGSPE_FUZZY_TITLE_THRESHOLD")
+                         if os.getenv("ANGSPE_FUZZY_TITLE_THRESHOLD") else None)
+
+
+class ScrapeWorker:
+    """Runs the scraper in-process with a warm HTTP client and a dedicated thread
+
+    The same AsyncANGSPEScraper (and its connection pool) is reused across
+    runs. Blocking parse/analyze/save stages go to a single-thread executor
+    so they never compete with the request-handling thread pool.
+
+    Refreshes are single-flight: while a job runs, further submissions
+    attach to it instead of starting another scrape.
+    """
+
+    def __init__(self, store, data_dir, min_interval=REFRESH_MIN_INTERVAL, too_soon=REFRESH_TOO_SOON,
+                 download=DOWNLOAD_DOCUMENTS, content_dedup=CONTENT_DEDUP,
+                 fuzzy_title_threshold=FUZZY_TITLE_THRESHOLD):
+        self.store = store
+        self.min_interval = min_interval
+        self.too_soon = too_soon
+        self.download = download
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scraper")
+        self.scraper = AsyncANGSPEScraper(data_dir=data_dir, executor=self.executor)
+        self.scraper.content_dedup = content_dedup
+        self.scraper.fuzzy_title_threshold = fuzzy_title_threshold
+        self.jobs = JobRegistry()
+        self.last_run = None
+        self._current_job_id = None
+        self._current_task = None
+        self._last_success = None
+
+    def submit(self, force=False):
+        """Start a scrape, or attach to / coalesce with an existing one
+
+        Returns (job_id, disposition) where disposition is one of "started",
+        "attached", "coalesced" or "rejected" (job_id is None when rejected).
+        force bypasses the minimum interval and the conditional GET.
+        """
+        if self._current_task is not None and not self._current_task.done():
+            return self._current_job_id, "attached"
+
+        if not force and self._last_success is not None:
+            elapsed = time.monotonic() - self._last_success
+            if elapsed < self.min_interval:
+                if self.too_soon == "reject":
+                    return None, "rejected"
+                return self.last_run["job_id"], "coalesced"
+
+        job = self.jobs.create()
+        self._current_job_id = job.job_id
+        self._current_task = asyncio.create_task(self._run(job, force))
+        return job.job_id, "started"
+
+    def retry_after(self):
+        """Seconds until a non-forced refresh will be accepted again"""
+        if self._last_success is None:
+            return 0
+        return max(0, round(self.min_interval - (time.monotonic() - self._last_success)))
+
+    async def wait(self, job_id):
+        """Wait for a job to finish and return its summary"""
+        if job_id == self._current_job_id and self._current_task is not None:
+            await asyncio.shield(self._current_task)
+        job = self.jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    async def _run(self, job, force):
+        """Run one scrape, publish it to the data store and record the run summary"""
+        loop = asyncio.get_running_loop()
+        # Stages are reported from the executor thread too, so hop back onto the loop
+        self.scraper.progress_callback = (
+            lambda stage, state: loop.call_soon_threadsafe(job.update_stage, stage, state)
+        )
+        await self.scraper.open()
+        self.scraper.last_saved_document = None
+        self.scraper.page_not_modified = False
+        self.scraper.last_changes = None
+        job.start()
+        state = "error"
+        publications = None
+        error = None
+        try:
+            # Regular refreshes only rewrite the data when publications changed; force rebuilds it
+            publications, analysis = await self.scraper.run_full_scrape(
+                force=force, incremental=not force, download=self.download
+            )
+            if self.scraper.run_lock_busy:
+                state = "skipped"
+            elif self.scraper.page_not_modified:
+                state = "not_modified"
+            elif analysis:
+                state = "success"
+                # Readers switch to the new snapshot in one step, without re-reading the file
+                if self.scraper.last_saved_document is not None:
+                    self.store.publish_publications(self.scraper.last_saved_document)
+        except Exception as e:
+            error = str(e)
+            print(f"💥 Error running scraper: {e}")
+        finally:
+            self.scraper.progress_callback = None
+
+        changes = self.scraper.last_changes
+        job.finish(
+            state,
+            total_publications=len(publications) if publications is not None else None,
+            changes={
+                "added": len(changes["added"]),
+                "removed": len(changes["removed"]),
+                "changed": len(changes["changed"])
+            } if changes and state == "success" else None,
+            error=error
+        )
+        if state in ("success", "not_modified"):
+            self._last_success = time.monotonic()
+        self.last_run = job.to_dict()
+        print(f"⏱️ Scrape {job.job_id} finished in {job.duration_seconds}s ({state})")
+        return self.last_run
+
+    async def shutdown(self):
+        if self._current_task is not None and not self._current_task.done():
+            self._current_task.cancel()
+        await self.scraper.aclose()
+        self.executor.shutdown(wait=False)
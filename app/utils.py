@@ -11,9 +11,15 @@ def load_json_data(filename: str) -> dict:
             return json.load(f)
     return {}
 
+def latest_data_file(prefix: str) -> str:
+    """Name of the newest yearly data file, e.g. latest_data_file("angspe_analysis")"""
+    years = [path.stem.rsplit('_', 1)[-1] for path in Path("data").glob(f"{prefix}_*.json")]
+    years = [int(year) for year in years if year.isdigit()]
+    return f"{prefix}_{max(years) if years else datetime.now().year}.json"
+
 def get_data_freshness() -> str:
     """Calculate how fresh the data is"""
-    analysis_path = Path("data") / "angspe_analysis_2025.json"
+    analysis_path = Path("data") / latest_data_file("angspe_analysis")
     if not analysis_path.exists():
         return "No data available"
     
@@ -40,7 +46,7 @@ def get_uptime() -> str:
 
 def get_status_data() -> dict:
     """Generate status data for the status endpoint"""
-    analysis = load_json_data("angspe_analysis_2025.json")
+    analysis = load_json_data(latest_data_file("angspe_analysis"))
     
     return {
         "status": "healthy",
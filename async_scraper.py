@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Asyncio ANGSPE Publications Scraper
+Same pipeline as ANGSPEScraper, with concurrent network I/O over httpx
+"""
+
+import asyncio
+from datetime import datetime
+
+import httpx
+
+from documents import CHUNK_SIZE, IDENTITY, downloaded_bytes, summarize_downloads
+from run_report import RunReport
+from scraper import ANGSPEScraper, fuzzy_title_threshold, pages_size
+
+
+class AsyncANGSPEScraper(ANGSPEScraper):
+    """ANGSPEScraper whose network stages are coroutines sharing one httpx.AsyncClient
+
+    Parsing, analysis and saving are inherited and run in a worker thread,
+    as do the disk writes of downloaded documents, so the event loop stays
+    responsive when this is awaited from the API.
+    """
+
+    def __init__(self, data_dir="data", max_concurrency=8, executor=None):
+        super().__init__(data_dir)
+        self.max_concurrency = max_concurrency
+        # Executor for the blocking parse/analyze/save stages (None: the loop's default pool)
+        self.executor = executor
+        self.client = None
+        self._persistent_client = False
+        self._semaphore = None
+        self.link_checks = {}
+
+    async def open(self):
+        """Create a long-lived client so consecutive runs reuse warm connections"""
+        if self.client is None:
+            self.client = self._make_client()
+            self._persistent_client = True
+
+    async def aclose(self):
+        if self.client is not None and self._persistent_client:
+            await self.client.aclose()
+        self.client = None
+        self._persistent_client = False
+
+    async def _run_blocking(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def _make_client(self):
+        return httpx.AsyncClient(
+            headers=dict(self.session.headers),
+            timeout=30,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.max_concurrency)
+        )
+
+    async def _get(self, url, **kwargs):
+        async with self._semaphore:
+            return await self.client.get(url, **kwargs)
+
+    async def fetch_page_html(self, conditional=True):
+        """Fetch the HTML content of the publications page (see ANGSPEScraper.fetch_page_html)"""
+        self.page_not_modified = False
+        headers = self.conditional_headers() if conditional else {}
+
+        try:
+            response = await self._get(self.target_url, headers=headers)
+            if response.status_code == 304:
+                self.page_not_modified = True
+                return None
+            response.raise_for_status()
+            self.remember_validators(response)
+            return response.text
+        except httpx.HTTPError as e:
+            print(f"Error fetching page: {e}")
+            return None
+
+    async def _fetch_listing_page(self, crawler, url):
+        delay = crawler.rate_limiter.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            response = await self._get(url)
+            response.raise_for_status()
+            return response.text
+        except httpx.HTTPError as e:
+            print(f"⚠️ Error fetching page {url}: {e}")
+            return None
+
+    async def crawl_pages(self, html_content):
+        """Fetch paginated follow-up pages concurrently, wave by wave, in discovery order"""
+        crawler = self.make_crawler(None)
+        first_url = crawler._canonical(self.target_url)
+        order = [first_url]
+        results = {first_url: html_content}
+        wave = [(first_url, html_content)]
+
+        while wave:
+            discovered = []
+            for url, html in wave:
+                for page_url in crawler.discover_pages(html, url):
+                    if page_url not in results and page_url not in discovered and len(order) + len(discovered) < crawler.max_pages:
+                        discovered.append(page_url)
+            if not discovered:
+                break
+            print(f"📑 Fetching {len(discovered)} more listing pages concurrently")
+            pages = await asyncio.gather(*(self._fetch_listing_page(crawler, url) for url in discovered))
+            order.extend(discovered)
+            results.update(zip(discovered, pages))
+            wave = [(url, html) for url, html in zip(discovered, pages) if html]
+
+        return [(url, results[url]) for url in order if results.get(url)]
+
+    async def _check_link(self, url):
+        try:
+            async with self._semaphore:
+                response = await self.client.head(url)
+            return url, response.status_code
+        except httpx.HTTPError as e:
+            return url, str(e)
+
+    async def check_links(self, publications):
+        """HEAD-check every download URL concurrently, recording the status in link_checks"""
+        urls = [pub['download_url'] for pub in publications if pub.get('download_url')]
+        results = await asyncio.gather(*(self._check_link(url) for url in urls))
+        self.link_checks = dict(results)
+        broken = {url: status for url, status in self.link_checks.items() if status != 200}
+        print(f"🔗 Checked {len(urls)} download links, {len(broken)} unavailable")
+        for url, status in broken.items():
+            print(f"   ⚠️ {status}: {url}")
+        return self.link_checks
+
+    async def _download(self, url):
+        """Async counterpart of DocumentDownloader.fetch"""
+        try:
+            async with self._semaphore:
+                async with self.client.stream('GET', url, headers={**IDENTITY, **self.documents.conditional_headers(url)}) as response:
+                    if self.documents.is_unchanged(url, response.status_code, response.headers):
+                        return url, ('unchanged', self.documents.touch(url))
+                    response.raise_for_status()
+                    with self.documents.receive() as writer:
+                        # Disk writes, the flush and store()'s hash and rename stay off the event loop
+                        async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                            await self._run_blocking(writer.write, chunk)
+                        await self._run_blocking(writer.file.flush)
+                        entry = await self._run_blocking(self.documents.store, url, writer, response.headers)
+                        return url, ('downloaded', entry)
+        except (httpx.HTTPError, OSError) as e:
+            print(f"⚠️ Could not download {url}: {e}")
+            return url, ('failed', None)
+
+    async def download_documents(self, publications):
+        """Download every document concurrently into the document cache, streaming to disk"""
+        self.report_progress('download', 'running')
+        urls = list(dict.fromkeys(pub['download_url'] for pub in publications if pub.get('download_url')))
+        self.last_downloads = dict(await asyncio.gather(*(self._download(url) for url in urls)))
+        await self._run_blocking(self.documents.save)
+        self.print_download_summary()
+        self.report_progress('download', 'done', items_in=len(urls),
+                             items_out=summarize_downloads(self.last_downloads)['downloaded'],
+                             bytes_in=downloaded_bytes(self.last_downloads))
+        return self.last_downloads
+
+    async def run_full_scrape(self, force=False, check_links=False, download=False, incremental=False, report=False):
+        """Run the complete scraping and analysis process (awaitable ANGSPEScraper.run_full_scrape)"""
+        if not self.acquire_run_lock():
+            print("⏳ Another scrape is already running - skipping this run")
+            return (None, None, None) if report else (None, None)
+        self.run_report = RunReport()
+        publications = analysis = None
+        outcome = 'error'
+        try:
+            publications, analysis = await self._run_full_scrape(force, check_links, download, incremental)
+            outcome = self.run_outcome(analysis)
+        finally:
+            self.finish_run_report(outcome, publications)
+            self.release_run_lock()
+        if report:
+            return publications, analysis, self.last_run_report
+        return publications, analysis
+
+    async def _run_full_scrape(self, force, check_links, download, incremental=False):
+        print("🚀 Starting ANGSPE Publications Scraper (async)...")
+        print(f"📡 Fetching page: {self.target_url}")
+        print(f"🕒 Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+        existing_count = self.get_existing_publications_count()
+        if existing_count > 0:
+            print(f"📋 Found {existing_count} existing publications in local data")
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if not self._persistent_client:
+            self.client = self._make_client()
+        try:
+            self.report_progress('fetch', 'running')
+            html_content = await self.fetch_page_html(conditional=not force and existing_count > 0)
+            if self.page_not_modified:
+                self.report_progress('fetch', 'done')
+                return self.not_modified_result()
+
+            if not html_content:
+                print("❌ Failed to fetch page content")
+                return None, None
+
+            print("✅ Page content fetched successfully")
+            print(f"📄 HTML content length: {len(html_content)} characters")
+
+            pages = await self.crawl_pages(html_content)
+            self.report_progress('fetch', 'done', items_out=len(pages), bytes_in=pages_size(pages))
+            print("🔍 Parsing publications...")
+            print("🔄 Checking for duplicates by URL and title...")
+            publications = await self._run_blocking(self.parse_pages, pages)
+
+            network_stages = []
+            if check_links:
+                network_stages.append(self.check_links(publications))
+            if download:
+                network_stages.append(self.download_documents(publications))
+            await asyncio.gather(*network_stages)
+            # Runs after the downloads so cached documents are fingerprinted from disk
+            publications = await self._run_blocking(self.dedupe_publications, publications)
+        finally:
+            if not self._persistent_client:
+                await self.client.aclose()
+                self.client = None
+
+        return await self._run_blocking(self.finish_scrape, publications, existing_count, incremental)
+
+
+def main():
+    import sys
+    scraper = AsyncANGSPEScraper()
+    scraper.content_dedup = '--content-dedup' in sys.argv
+    scraper.fuzzy_title_threshold = fuzzy_title_threshold(sys.argv)
+    publications, analysis = asyncio.run(scraper.run_full_scrape(
+        force='--force' in sys.argv,
+        check_links='--check-links' in sys.argv,
+        download='--download' in sys.argv,
+        incremental='--incremental' in sys.argv
+    ))
+
+    if analysis:
+        scraper.print_analysis_summary(analysis, publications)
+    else:
+        print("❌ Scraping failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Crash-safe file writes for the scraper outputs
+Data is written to a temporary file in the target directory, fsynced, then
+renamed over the target, so readers see either the old or the new file, never
+a partial one.
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def _fsync_directory(directory):
+    """Persist the rename itself (no-op where directories can't be opened, e.g. Windows)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(path, mode='w', encoding='utf-8', newline=None):
+    """Open a temporary file for writing and atomically replace path with it on success"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        # mkstemp creates 0600 files; keep the target's mode, or the usual 0644
+        try:
+            os.chmod(tmp_path, path.stat().st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+
+        binary = 'b' in mode
+        with os.fdopen(fd, mode, encoding=None if binary else encoding, newline=None if binary else newline) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _fsync_directory(path.parent)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_json(path, data, indent=2):
+    """Atomically write data as UTF-8 JSON"""
+    with atomic_write(path) as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
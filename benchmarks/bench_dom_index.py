@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-link metadata extraction with and without the DocumentIndex
+
+Usage: python benchmarks/bench_dom_index.py [--links 5000] [--sample N]
+
+--sample limits the legacy (per-link get_text) path to the first N links and
+extrapolates, since it grows quadratically with page size.
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+
+from benchmarks.page_generator import generate_links_page
+from scraper import ANGSPEScraper, DocumentIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--links', type=int, default=5000)
+    parser.add_argument('--sample', type=int, default=None)
+    args = parser.parse_args()
+
+    scraper = ANGSPEScraper()
+    html = generate_links_page(args.links)
+    soup = BeautifulSoup(html, 'lxml')
+    links = soup.find_all('a', href=re.compile(r'\.pdf', re.I))
+    print(f"📄 Synthetic page: {len(html) / 1024:.0f} KiB, {len(links)} PDF links")
+
+    start = time.perf_counter()
+    index = DocumentIndex(soup, scraper)
+    build_time = time.perf_counter() - start
+    indexed = [scraper.extract_publication_info(link, soup, index) for link in links]
+    indexed_time = time.perf_counter() - start
+    print(f"⚡ Indexed: {indexed_time * 1000:.1f} ms total "
+          f"(index build {build_time * 1000:.1f} ms, {indexed_time / len(links) * 1e6:.1f} µs/link)")
+
+    sample = links[:args.sample] if args.sample else links
+    start = time.perf_counter()
+    legacy = [scraper.extract_publication_info(link, soup) for link in sample]
+    legacy_time = time.perf_counter() - start
+    per_link = legacy_time / len(sample)
+    estimated = per_link * len(links)
+    label = "measured" if len(sample) == len(links) else f"extrapolated from {len(sample)} links"
+    print(f"🐢 Legacy:  {estimated * 1000:.1f} ms total ({label}, {per_link * 1e6:.1f} µs/link)")
+
+    if legacy != indexed[:len(sample)]:
+        print("❌ Results differ between legacy and indexed extraction")
+        sys.exit(1)
+    print(f"✅ Identical results, speedup ≈ {estimated / indexed_time:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark: text normalization and extraction helpers, per-call regex/table builds vs extraction.py
+
+Usage: python benchmarks/bench_extraction.py [--texts 1000] [--repeat 5]
+
+Runs each helper over realistic French card texts and titles: the previous
+implementations (patterns passed to re.search in a loop, translation table
+rebuilt per call), the precompiled helpers with an empty memo (cold), and the
+same helpers on inputs seen before (memo hits). Reports the best per-call cost
+in microseconds and checks that both implementations agree on every input.
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import extraction
+from benchmarks.page_generator import CATEGORIES, TITLE_WORDS
+
+
+def legacy_normalize_title(title):
+    if not title:
+        return ''
+    normalized = title.lower().strip()
+    import string
+    translator = str.maketrans('', '', string.punctuation.replace('-', '').replace('.', ''))
+    normalized = normalized.translate(translator)
+    normalized = ' '.join(normalized.split())
+    normalized = normalized.replace('rapport sur l', 'rapport sur le')
+    normalized = normalized.replace('  ', ' ')
+    return normalized
+
+
+def legacy_extract_file_size(text):
+    if not text:
+        return None
+    for pattern in (r'(\d+(?:\.\d+)?)\s*(Mo|MB|Go|GB|ko|KB|To|TB)', r'(\d+(?:,\d+)?)\s*(Mo|MB|Go|GB|ko|KB|To|TB)'):
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            size, unit = match.groups()
+            return f"{size} {unit}"
+    return None
+
+
+def legacy_extract_date(text):
+    if not text:
+        return None
+    for pattern in (r'(\d{1,2})/(\d{1,2})/(\d{4})', r'(\d{1,2})-(\d{1,2})-(\d{4})',
+                    r'Posté le (\d{1,2})/(\d{1,2})/(\d{4})'):
+        match = re.search(pattern, text)
+        if match:
+            return f"{match.group(1)}/{match.group(2)}/{match.group(3)}"
+    return None
+
+
+def legacy_extract_category(text):
+    for category in ['Rapport d\'activités', 'Autres rapports', 'Publications', 'Documents']:
+        if category in text:
+            return category
+    return 'Non classé'
+
+
+def legacy_size_in_mb(size_str):
+    if not size_str:
+        return None
+    match = re.search(r'(\d+(?:\.\d+)?)', size_str)
+    if not match:
+        return None
+    if 'Mo' in size_str or 'MB' in size_str:
+        return float(match.group(1))
+    if 'ko' in size_str or 'KB' in size_str:
+        return float(match.group(1)) / 1024
+    return None
+
+
+def generate_texts(n, seed=0):
+    """(titles, card texts) like those found on the publications page"""
+    rng = random.Random(seed)
+    titles, cards = [], []
+    for i in range(n):
+        title = f"{' '.join(rng.sample(TITLE_WORDS, rng.randint(3, 7))).capitalize()} {2015 + i % 11} - {2016 + i % 11}"
+        if rng.random() < 0.3:
+            title = f"Rapport sur l'État actionnaire : {title}."
+        titles.append(title)
+        if rng.random() < 0.5:
+            size = f"{rng.randint(1, 20)}.{rng.randint(0, 99):02d} Mo"
+        else:
+            size = f"{rng.randint(100, 9999)} ko"
+        date = f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2015, 2025)}"
+        if rng.random() < 0.2:
+            date = date.replace('/', '-')
+        cards.append(f"\n{CATEGORIES[i % len(CATEGORIES)]}\n{title}\nPosté le {date}\n{size}\n Télécharger\n")
+    return titles, cards
+
+
+def per_call(func, inputs, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in inputs:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(inputs) * 1e6
+
+
+def cold_per_call(func, inputs, repeat):
+    """Per-call cost with the memo cleared before every pass, so every call misses"""
+    best = float('inf')
+    for _ in range(repeat):
+        func.cache_clear()
+        start = time.perf_counter()
+        for text in inputs:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(inputs) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--texts', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    titles, cards = generate_texts(args.texts)
+    sizes = [extraction.extract_file_size(card) for card in cards]
+    cases = [
+        ('normalize_title', legacy_normalize_title, extraction.normalize_title, titles),
+        ('extract_file_size', legacy_extract_file_size, extraction.extract_file_size, cards),
+        ('extract_date', legacy_extract_date, extraction.extract_date, cards),
+        ('extract_category', legacy_extract_category, extraction.extract_category, cards),
+        ('size_in_mb', legacy_size_in_mb, extraction.size_in_mb, sizes),
+    ]
+
+    print(f"{'helper':<18} {'before µs':>10} {'cold µs':>9} {'memo µs':>9} {'speedup':>8}")
+    for name, legacy, current, inputs in cases:
+        for text in inputs:
+            if legacy(text) != current(text):
+                print(f"❌ {name} differs on {text!r}")
+                sys.exit(1)
+        before = per_call(legacy, inputs, args.repeat)
+        if hasattr(current, 'cache_clear'):
+            cold = cold_per_call(current, inputs, args.repeat)
+            warm = f"{per_call(current, inputs, args.repeat):>9.2f}"
+        else:
+            cold = per_call(current, inputs, args.repeat)
+            warm = f"{'-':>9}"
+        print(f"{name:<18} {before:>10.2f} {cold:>9.2f} {warm} {before / cold:>7.1f}x")
+    print("✅ Identical results before and after")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parse_publications full-tree mode vs lean (SoupStrainer) mode
+
+Usage: python benchmarks/bench_lean_parse.py [--sizes 100,1000,10000]
+
+Reports best-of-3 parse time and tracemalloc peak memory for each mode, and checks
+that both modes return identical publications.
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.page_generator import generate_sections_page
+from scraper import ANGSPEScraper
+
+
+def measure(scraper, html, lean):
+    # Timed and memory-traced separately, tracemalloc slows allocation-heavy code
+    with contextlib.redirect_stdout(io.StringIO()):
+        elapsed = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            publications = scraper.parse_publications(html, lean=lean)
+            elapsed = min(elapsed, time.perf_counter() - start)
+        tracemalloc.start()
+        scraper.parse_publications(html, lean=lean)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return publications, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='100,1000,10000')
+    args = parser.parse_args()
+
+    scraper = ANGSPEScraper()
+    print(f"{'pubs':>7} {'KiB':>7} {'full ms':>9} {'lean ms':>9} {'full MiB':>9} {'lean MiB':>9}")
+    for n in (int(x) for x in args.sizes.split(',')):
+        html = generate_sections_page(n)
+        full, full_time, full_peak = measure(scraper, html, lean=False)
+        lean, lean_time, lean_peak = measure(scraper, html, lean=True)
+        if full != lean:
+            print(f"❌ Output differs between modes for {n} publications")
+            sys.exit(1)
+        print(f"{n:>7} {len(html) / 1024:>7.0f} {full_time * 1000:>9.1f} {lean_time * 1000:>9.1f} "
+              f"{full_peak / 2**20:>9.1f} {lean_peak / 2**20:>9.1f}")
+    print("✅ Identical output in both modes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MinHash/LSH near-duplicate titles vs exhaustive pairwise comparison
+
+Usage: python benchmarks/bench_near_duplicates.py [--titles 50000] [--threshold 0.8] [--sample 2000]
+
+Generates synthetic titles with planted near-duplicates (accents dropped,
+punctuation changed, a word added, a typo), indexes them all with
+NearDuplicateIndex, and reports time per stage, candidate comparisons and
+recall of the planted pairs that are above the threshold. On a sample, the LSH pairs are checked against
+the exhaustive O(n²) comparison, whose time is extrapolated to all titles.
+"""
+
+import argparse
+import random
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.page_generator import TITLE_WORDS
+from near_duplicates import NearDuplicateIndex, jaccard, numbers
+from scraper import ANGSPEScraper
+
+SUFFIXES = ["(version finale)", "- version révisée", "(mise à jour)", "(résumé)"]
+
+
+def _strip_accents(text):
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _variant(rng, title):
+    kind = rng.randrange(4)
+    if kind == 0:
+        return _strip_accents(title)
+    if kind == 1:
+        return title.replace(' ', ' - ', 1).replace("'", ' ') + '.'
+    if kind == 2:
+        return f"{title} {rng.choice(SUFFIXES)}"
+    i = rng.randrange(len(title) - 1)
+    return title[:i] + title[i + 1] + title[i] + title[i + 2:]
+
+
+def generate_titles(n, duplicate_rate=0.1, seed=0):
+    """n titles, of which about duplicate_rate are variants of an earlier title: (titles, {variant: original})"""
+    rng = random.Random(seed)
+    titles, planted = [], {}
+    while len(titles) < n:
+        if titles and rng.random() < duplicate_rate:
+            original = rng.randrange(len(titles))
+            planted[len(titles)] = original
+            titles.append(_variant(rng, titles[original]))
+        else:
+            words = rng.sample(TITLE_WORDS, rng.randint(4, 8))
+            titles.append(f"{' '.join(words).capitalize()} {rng.randint(2000, 2025)}")
+    return titles, planted
+
+
+def signature_time(normalized, threshold):
+    """Time to shingle and sign every title on its own, in a fresh index"""
+    index = NearDuplicateIndex(threshold=threshold)
+    start = time.perf_counter()
+    for text in normalized:
+        index.signature(index.shingles(text))
+    return time.perf_counter() - start
+
+
+def lsh_pairs(normalized, threshold):
+    """(every pair (j, i), j < i, found by the index, indexing time, index)"""
+    index = NearDuplicateIndex(threshold=threshold)
+    start = time.perf_counter()
+    pairs = set()
+    for i, text in enumerate(normalized):
+        pairs.update((j, i) for j, similarity in index.add(i, text))
+    return pairs, time.perf_counter() - start, index
+
+
+def exhaustive_pairs(normalized, threshold, index):
+    shingles = [index.shingles(text) for text in normalized]
+    title_numbers = [numbers(text) for text in normalized]
+    pairs = set()
+    for i in range(len(normalized)):
+        for j in range(i):
+            if title_numbers[i] == title_numbers[j] and jaccard(shingles[i], shingles[j]) >= threshold:
+                pairs.add((j, i))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--titles', type=int, default=50000)
+    parser.add_argument('--threshold', type=float, default=0.8)
+    parser.add_argument('--sample', type=int, default=2000)
+    args = parser.parse_args()
+
+    titles, planted = generate_titles(args.titles)
+    normalize = ANGSPEScraper()._normalize_title
+    start = time.perf_counter()
+    normalized = [normalize(title) for title in titles]
+    normalize_time = time.perf_counter() - start
+
+    sign_time = signature_time(normalized, args.threshold)
+    pairs, index_time, index = lsh_pairs(normalized, args.threshold)
+    # Planted variants that really are near-duplicates (some edits push short titles below the threshold)
+    expected = [(original, i) for i, original in planted.items()
+                if numbers(normalized[i]) == numbers(normalized[original])
+                and jaccard(index.shingles(normalized[i]), index.shingles(normalized[original])) >= args.threshold]
+    found = sum(1 for pair in expected if pair in pairs)
+    print(f"📄 {len(titles)} titles, {len(planted)} planted near-duplicates, threshold {args.threshold} "
+          f"({index.bands} bands x {index.rows} rows)")
+    print(f"   normalize  {normalize_time * 1000:>9.1f} ms")
+    print(f"   signatures {sign_time * 1000:>9.1f} ms")
+    print(f"   index      {index_time * 1000:>9.1f} ms  (signatures + LSH buckets + Jaccard verification, "
+          f"{index.comparisons} comparisons vs {len(titles) * (len(titles) - 1) // 2} pairs)")
+    print(f"   {len(pairs)} pairs found, recall {found / max(1, len(expected)):.3f} "
+          f"of the {len(expected)} planted pairs above the threshold")
+
+    sample = normalized[:args.sample]
+    sample_pairs, *_ = lsh_pairs(sample, args.threshold)
+    start = time.perf_counter()
+    exact = exhaustive_pairs(sample, args.threshold, index)
+    exhaustive_time = time.perf_counter() - start
+    recall = len(sample_pairs & exact) / len(exact) if exact else 1.0
+    scale = (len(titles) / len(sample)) ** 2
+    print(f"🔍 Sample of {len(sample)}: exhaustive {exhaustive_time * 1000:.1f} ms "
+          f"(~{exhaustive_time * scale:.0f} s extrapolated to {len(titles)}), "
+          f"LSH recall {recall:.3f} of {len(exact)} pairs, {len(sample_pairs - exact)} false positives")
+
+
+if __name__ == "__main__":
+    main()
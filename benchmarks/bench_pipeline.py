@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parse_publications, analyze_publications and save_results on synthetic pages, against a stored baseline
+
+Usage: python benchmarks/bench_pipeline.py [--sizes 10,100,1000,10000] [--layouts sections,links]
+                                           [--repeat 5] [--strict-time] [--update-baseline]
+
+Runs the three stages of a scrape on generated "les-publications" pages of N
+publications in both layouts (publication cards, bare PDF links under
+category headings) and reports per stage:
+  - ms:     median wall time over --repeat runs, with the extraction memos cleared each time
+  - MiB:    tracemalloc peak above the memory in use when the stage started
+  - blocks: allocated blocks the stage leaves alive (what it retains, not churn)
+Timing and memory are measured in separate passes, tracemalloc slows allocation-heavy code.
+
+Results are compared with benchmarks/pipeline_baseline.json. Peak memory and
+retained blocks are deterministic: beyond --memory-tolerance times the baseline
+they fail the run. Wall time depends on the machine and its load, so it is
+compared in units of a calibration loop timed just before each page size, and
+a stage beyond --time-tolerance only warns unless --strict-time is given.
+--update-baseline rewrites the entries for the sizes and layouts just measured
+(add 100000 to --sizes to cover the largest pages; it takes a few minutes).
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import extraction
+from atomic_io import atomic_write_json
+from benchmarks.page_generator import generate_links_page, generate_sections_page
+from scraper import ANGSPEScraper
+
+BASELINE_FILE = Path(__file__).resolve().parent / 'pipeline_baseline.json'
+LAYOUTS = {'sections': generate_sections_page, 'links': generate_links_page}
+STAGES = ('parse', 'analyze', 'save')
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS = 0.005
+MIN_PEAK_BYTES = 256 * 1024
+MIN_BLOCKS = 1000
+
+
+def calibrate(repeat=5):
+    """Median time of a fixed parse, the unit wall times are compared in across machines and loads"""
+    html = generate_sections_page(100, seed=1)
+    scraper = ANGSPEScraper(data_dir=tempfile.mkdtemp(prefix='angspe-bench-'))
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            clear_caches()
+            start = time.perf_counter()
+            scraper.parse_publications(html, lean=True)
+            times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def clear_caches():
+    for helper in vars(extraction).values():
+        if callable(getattr(helper, 'cache_clear', None)):
+            helper.cache_clear()
+
+
+def pipeline(scraper, html):
+    """[(stage, callable)] in pipeline order, and the state dict through which each feeds the next"""
+    state = {}
+
+    def parse():
+        state['publications'] = scraper.parse_publications(html, lean=True)
+
+    def analyze():
+        state['analysis'] = scraper.analyze_publications(state['publications'])
+
+    def save():
+        # What finish_scrape writes: the JSON snapshot, the analysis and the CSV
+        scraper.save_results(state['publications'], state['analysis'])
+        scraper.save_results(state['publications'], state['analysis'], format='csv')
+
+    return list(zip(STAGES, (parse, analyze, save))), state
+
+
+def measure(scraper, html, repeat):
+    """{stage: {seconds, peak_bytes, blocks}} and the number of parsed publications"""
+    results = {stage: {} for stage in STAGES}
+    times = {stage: [] for stage in STAGES}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            clear_caches()
+            stages, _ = pipeline(scraper, html)
+            for stage, run in stages:
+                start = time.perf_counter()
+                run()
+                times[stage].append(time.perf_counter() - start)
+        for stage in STAGES:
+            results[stage]['seconds'] = statistics.median(times[stage])
+
+        clear_caches()
+        stages, state = pipeline(scraper, html)
+        tracemalloc.start()
+        try:
+            for stage, run in stages:
+                # Parse trees are cyclic: collect so blocks counts what the stage keeps, not pending garbage
+                gc.collect()
+                blocks = sys.getallocatedblocks()
+                current, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                run()
+                _, peak = tracemalloc.get_traced_memory()
+                results[stage]['peak_bytes'] = peak - current
+                gc.collect()
+                results[stage]['blocks'] = sys.getallocatedblocks() - blocks
+        finally:
+            tracemalloc.stop()
+    return results, len(state['publications'])
+
+
+def time_ratio(result, baseline):
+    """Wall time relative to the baseline's, both in units of their calibration loop"""
+    return (result['seconds'] / result['calibration_seconds']) / (baseline['seconds'] / baseline['calibration_seconds'])
+
+
+def memory_regressions(key, result, baseline, tolerance):
+    """Descriptions of the deterministic metrics of result beyond tolerance of baseline"""
+    found = []
+    checks = (
+        ('peak_bytes', MIN_PEAK_BYTES, lambda v: f"{v / 2**20:.2f} MiB"),
+        ('blocks', MIN_BLOCKS, lambda v: f"{v} blocks"),
+    )
+    for metric, floor, fmt in checks:
+        value, expected = result[metric], baseline.get(metric)
+        if expected is not None and value > expected * tolerance and value - expected > floor:
+            found.append(f"{key} {metric}: {fmt(value)} vs baseline {fmt(expected)} ({value / max(expected, 1e-9):.2f}x)")
+    return found
+
+
+def time_regression(key, result, baseline, tolerance):
+    """Description of a calibrated wall time beyond tolerance of the baseline's, or None"""
+    ratio = time_ratio(result, baseline)
+    if ratio > tolerance and result['seconds'] - baseline['seconds'] > MIN_SECONDS:
+        return (f"{key} seconds: {result['seconds'] * 1000:.1f} ms vs baseline {baseline['seconds'] * 1000:.1f} ms "
+                f"({ratio:.2f}x calibrated)")
+    return None
+
+
+def load_baseline():
+    try:
+        with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'results': {}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='10,100,1000,10000')
+    parser.add_argument('--layouts', default='sections,links')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--time-tolerance', type=float, default=2.0)
+    parser.add_argument('--memory-tolerance', type=float, default=1.2)
+    parser.add_argument('--strict-time', action='store_true', help='fail on wall time regressions too')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    baseline = load_baseline()
+    scraper = ANGSPEScraper(data_dir=tempfile.mkdtemp(prefix='angspe-bench-'))
+    measured = {}
+    failures = []
+    slow = []
+    print(f"{'layout':<9} {'pubs':>7} {'stage':<8} {'ms':>10} {'MiB':>8} {'blocks':>9} {'time vs base':>13}")
+    for layout in args.layouts.split(','):
+        for n in (int(x) for x in args.sizes.split(',')):
+            html = LAYOUTS[layout](n)
+            calibration = calibrate()
+            results, publications = measure(scraper, html, args.repeat)
+            if publications != n:
+                print(f"❌ Parsed {publications} publications from a {layout} page of {n}")
+                sys.exit(1)
+            for stage in STAGES:
+                key = f"{layout}/{n}/{stage}"
+                result = dict(results[stage], calibration_seconds=calibration)
+                measured[key] = result
+                expected = baseline['results'].get(key)
+                if expected and 'calibration_seconds' in expected:
+                    failures.extend(memory_regressions(key, result, expected, args.memory_tolerance))
+                    regression = time_regression(key, result, expected, args.time_tolerance)
+                    if regression:
+                        (failures if args.strict_time else slow).append(regression)
+                    ratio = f"{time_ratio(result, expected):>12.2f}x"
+                else:
+                    ratio = f"{'-':>13}"
+                print(f"{layout:<9} {n:>7} {stage:<8} {result['seconds'] * 1000:>10.1f} "
+                      f"{result['peak_bytes'] / 2**20:>8.2f} {result['blocks']:>9} {ratio}")
+
+    if args.update_baseline:
+        baseline['results'].update(measured)
+        baseline.update({
+            'recorded_at': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'machine': f"{platform.system()} {platform.machine()}"
+        })
+        atomic_write_json(BASELINE_FILE, baseline)
+        print(f"💾 Baseline updated: {BASELINE_FILE}")
+        return
+    if slow:
+        print(f"⚠️ {len(slow)} stages slower than {args.time_tolerance}x the baseline (calibrated; "
+              f"--strict-time to fail on them):")
+        for regression in slow:
+            print(f"   {regression}")
+    if failures:
+        print(f"❌ {len(failures)} regressions against the baseline recorded {baseline.get('recorded_at', '?')}:")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+    elif not any(key in baseline['results'] for key in measured):
+        print("⚠️ No baseline for these sizes, run with --update-baseline to record one")
+    elif slow:
+        print("✅ No memory regressions against the baseline")
+    else:
+        print("✅ Within tolerance of the baseline")
+
+
+if __name__ == "__main__":
+    main()
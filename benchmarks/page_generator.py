@@ -0,0 +1,78 @@
+"""
+Synthetic ANGSPE "les-publications" page generator for benchmarks
+"""
+
+import random
+
+CATEGORIES = ["Rapport d'activités", "Autres rapports", "Publications", "Documents"]
+TITLE_WORDS = [
+    "Rapport", "annuel", "sur", "l'État", "actionnaire", "Charte", "de", "gouvernance",
+    "pour", "les", "EEP", "établissements", "entreprises", "publics", "performance",
+    "stratégie", "participations", "bilan", "synthèse", "note", "orientation",
+]
+
+
+def _title(rng, i):
+    words = rng.sample(TITLE_WORDS, rng.randint(3, 7))
+    return f"{' '.join(words).capitalize()} {2015 + i % 11} - n°{i}"
+
+
+def _size(rng):
+    if rng.random() < 0.5:
+        return f"{rng.randint(1, 20)}.{rng.randint(0, 99):02d} Mo"
+    return f"{rng.randint(100, 9999)} ko"
+
+
+# Site chrome (menus, footer, inline scripts) surrounding the publications list
+_MENU = ''.join(
+    f'<li class="menu-item"><a href="/rubrique-{i}">Rubrique {i}</a>'
+    f'<ul class="sub-menu">{"".join(f"<li><a href=/rubrique-{i}/page-{j}>Page {j}</a></li>" for j in range(8))}</ul></li>'
+    for i in range(20)
+)
+_SCRIPT = '<script>window.__NUXT__=' + '{"state":"' + 'x' * 20000 + '"}</script>'
+_FOOTER = ''.join(f'<div class="footer-col"><h5>Liens {i}</h5><p>{"Lorem ipsum dolor sit amet. " * 10}</p></div>' for i in range(6))
+
+
+def _page(body):
+    return (
+        '<html><head><title>Les publications | ANGSPE</title></head><body>'
+        f'<header><nav><a href="/">Accueil</a><a href="/les-publications">Publications</a><ul class="menu">{_MENU}</ul></nav></header>'
+        f'<main><h1>Les publications</h1>{body}</main>'
+        f'<footer>{_FOOTER}© ANGSPE</footer>{_SCRIPT}</body></html>'
+    )
+
+
+def generate_sections_page(n, seed=0):
+    """Page where each publication is a card whose class matches the scraper's section pattern"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        cat = CATEGORIES[i % len(CATEGORIES)]
+        items.append(
+            f'<div class="col-md-4"><div class="card"><div class="publication-item">'
+            f'<span class="badge">{cat}</span><h3>{_title(rng, i)}</h3>'
+            f'<ul class="meta"><li>Posté le {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2015, 2025)}</li>'
+            f'<li>{_size(rng)}</li></ul>'
+            f'<a class="btn" href="https://api.angspe.ma/uploads/doc_{i}_{rng.getrandbits(32):08x}.pdf">'
+            f'<i class="icon-download"></i> Télécharger</a></div></div></div>'
+        )
+    return _page(f'<div class="row">{"".join(items)}</div>')
+
+
+def generate_links_page(n, seed=0):
+    """Page where publications are bare PDF links grouped under category headings"""
+    rng = random.Random(seed)
+    per_category = {cat: [] for cat in CATEGORIES}
+    for i in range(n):
+        cat = CATEGORIES[i % len(CATEGORIES)]
+        per_category[cat].append(
+            f'<div class="card"><h4>{_title(rng, i)}</h4>'
+            f'<p class="meta">Posté le {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2015, 2025)}</p>'
+            f'<p class="size">{_size(rng)}</p>'
+            f'<a href="https://api.angspe.ma/uploads/doc_{i}_{rng.getrandbits(32):08x}.pdf">Télécharger</a></div>'
+        )
+    body = ''.join(
+        f'<div class="tab-pane"><h2>{cat}</h2><div class="grid">{"".join(items)}</div></div>'
+        for cat, items in per_category.items()
+    )
+    return _page(body)
@@ -0,0 +1,154 @@
+"""
+Pagination-aware crawler for the ANGSPE publication listings
+Discovers follow-up listing pages and fetches them concurrently over a shared session
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+
+PAGE_PARAMS = {'page', 'p', 'paged', 'pg', 'offset', 'start', '_page'}
+OFFSET_PARAMS = {'offset', 'start'}
+PAGE_PATH_RE = re.compile(r'/page/\d+/?$', re.I)
+DOCUMENT_RE = re.compile(r'\.(pdf|docx?)($|\?)', re.I)
+
+
+class HostRateLimiter:
+    """Enforces a minimum interval between requests to the same host"""
+
+    def __init__(self, min_interval=0.5, per_host=None):
+        self.min_interval = min_interval
+        self.per_host = per_host or {}
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, url):
+        """Reserve the next request slot for url's host and return the delay until it"""
+        host = urlparse(url).netloc
+        interval = self.per_host.get(host, self.min_interval)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        return slot - now
+
+    def wait(self, url):
+        """Block until a request to url's host is allowed"""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class PaginationCrawler:
+    """Fetches every page of a paginated listing with a bounded worker pool"""
+
+    def __init__(self, session, allowed_hosts, max_workers=4, max_pages=50,
+                 min_interval=0.5, per_host_intervals=None, timeout=(10, 30)):
+        self.session = session
+        self.allowed_hosts = set(allowed_hosts)
+        self.max_workers = max_workers
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.rate_limiter = HostRateLimiter(min_interval, per_host_intervals)
+
+    @staticmethod
+    def _canonical(url):
+        """Drop the fragment so the same page isn't queued twice"""
+        return urlunparse(urlparse(url)._replace(fragment=''))
+
+    @staticmethod
+    def _is_first_page(url):
+        """True for explicit links back to page one (?page=1, ?offset=0, /page/1)"""
+        parsed = urlparse(url)
+        if re.search(r'/page/1/?$', parsed.path):
+            return True
+        params = {key.lower(): value for key, value in parse_qsl(parsed.query) if value.isdigit()}
+        numbers = [int(value) - (0 if key in OFFSET_PARAMS else 1)
+                   for key, value in params.items() if key in PAGE_PARAMS]
+        return bool(numbers) and all(n <= 0 for n in numbers)
+
+    def _is_page_link(self, url, rel, listing_path):
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or parsed.netloc not in self.allowed_hosts:
+            return False
+        if DOCUMENT_RE.search(parsed.path):
+            return False
+        if 'next' in rel:
+            return True
+        # Otherwise only numbered variants of the listing itself count as pages
+        if PAGE_PATH_RE.sub('', parsed.path).rstrip('/') != listing_path:
+            return False
+        query_keys = {key.lower() for key, value in parse_qsl(parsed.query) if value.isdigit()}
+        return bool(query_keys & PAGE_PARAMS) or bool(PAGE_PATH_RE.search(parsed.path))
+
+    def discover_pages(self, html, page_url):
+        """Return absolute URLs of follow-up listing pages linked from html"""
+        soup = BeautifulSoup(html, 'lxml', parse_only=SoupStrainer(['a', 'link'], href=True))
+        listing_path = PAGE_PATH_RE.sub('', urlparse(page_url).path).rstrip('/')
+        pages = []
+        for anchor in soup.find_all(['a', 'link'], href=True):
+            url = self._canonical(urljoin(page_url, anchor['href']))
+            rel = [value.lower() for value in (anchor.get('rel') or [])]
+            if url in pages or self._is_first_page(url):
+                continue
+            if self._is_page_link(url, rel, listing_path):
+                pages.append(url)
+        return pages
+
+    def fetch(self, url):
+        """Fetch one page, honoring the per-host rate limit. Returns the HTML or None"""
+        self.rate_limiter.wait(url)
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return response.text
+        except requests.RequestException as e:
+            print(f"⚠️ Error fetching page {url}: {e}")
+            return None
+
+    def crawl(self, first_url, first_html):
+        """Fetch every page reachable from the first page
+
+        Returns (url, html) pairs in discovery order, first page included, so
+        results merge deterministically regardless of completion order.
+        """
+        first_url = self._canonical(first_url)
+        order = [first_url]
+        results = {first_url: first_html}
+        queued = {first_url}
+
+        def enqueue(html, url):
+            for page_url in self.discover_pages(html, url):
+                if page_url not in queued and len(queued) < self.max_pages:
+                    queued.add(page_url)
+                    order.append(page_url)
+                    pending.append(page_url)
+
+        pending = []
+        enqueue(first_html, first_url)
+        if not pending:
+            return [(first_url, first_html)]
+
+        print(f"📑 Pagination detected, crawling up to {self.max_pages} pages with {self.max_workers} workers")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = {}
+            while pending or in_flight:
+                while pending:
+                    url = pending.pop(0)
+                    in_flight[executor.submit(self.fetch, url)] = url
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = in_flight.pop(future)
+                    html = future.result()
+                    results[url] = html
+                    if html:
+                        enqueue(html, url)
+
+        pages = [(url, results[url]) for url in order if results.get(url)]
+        print(f"📑 Fetched {len(pages)}/{len(order)} listing pages")
+        return pages
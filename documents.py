@@ -0,0 +1,289 @@
+"""
+Content-addressed cache of the published documents
+Documents are streamed to a temporary file while their SHA-256 is computed,
+then moved to objects/<sha[:2]>/<sha><suffix>, so identical files are stored
+once whatever URL they came from. A manifest maps each download URL to its
+object and to the validators (ETag, Last-Modified, Content-Length) used to
+skip unchanged documents on the next run.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+from atomic_io import atomic_write_json
+
+CHUNK_SIZE = 64 * 1024
+# Bytes hashed from each end of a document for its partial fingerprint
+FINGERPRINT_EDGE = 64 * 1024
+CONTENT_RANGE_RE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+# Documents are mostly compressed already, and byte ranges and Content-Length must describe the file itself
+IDENTITY = {'Accept-Encoding': 'identity'}
+
+
+def partial_fingerprint(total, head, tail):
+    """Fingerprint of a document from its length, first bytes and last bytes
+    
+    head is the first FINGERPRINT_EDGE bytes and tail the last
+    min(FINGERPRINT_EDGE, total - len(head)) bytes, so the two never overlap
+    and a document of at most twice FINGERPRINT_EDGE is hashed completely.
+    """
+    digest = hashlib.sha256(f'{total}:'.encode('ascii'))
+    digest.update(head)
+    digest.update(tail)
+    return digest.hexdigest()
+
+
+def tail_length(total, edge=FINGERPRINT_EDGE):
+    return max(0, min(edge, total - edge))
+
+
+def content_length(headers):
+    """Content-Length of a response as an int, or None when missing or malformed"""
+    try:
+        return int(headers['Content-Length'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class HashingWriter:
+    """File-like sink that hashes and counts what it writes"""
+
+    def __init__(self, f, tmp_path):
+        self.file = f
+        self.tmp_path = tmp_path
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk):
+        self.file.write(chunk)
+        self.sha256.update(chunk)
+        self.size += len(chunk)
+
+
+class DocumentCache:
+    """On-disk document store keyed by SHA-256, with a URL manifest"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.objects_dir = self.directory / 'objects'
+        self.manifest_file = self.directory / 'manifest.json'
+        self._manifest = None
+        # Reentrant: save, touch and store read the manifest while holding it
+        self._lock = threading.RLock()
+
+    @property
+    def manifest(self):
+        """{url: entry} for every document fetched so far (loaded on first use)"""
+        if self._manifest is None:
+            # Download threads may all get here first; only one of them loads the file
+            with self._lock:
+                if self._manifest is None:
+                    try:
+                        with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                            self._manifest = json.load(f)
+                    except (OSError, ValueError):
+                        self._manifest = {}
+        return self._manifest
+
+    def save(self):
+        with self._lock:
+            atomic_write_json(self.manifest_file, self.manifest)
+
+    def entry(self, url):
+        """Manifest entry of url if its object is still on disk, else None"""
+        entry = self.manifest.get(url)
+        if entry and (self.directory / entry['path']).exists():
+            return entry
+        return None
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since headers for a document already in the cache"""
+        entry = self.entry(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def is_unchanged(self, url, status_code, headers):
+        """True if the response shows the cached copy is current, before reading any body
+
+        A 304 answers a conditional request. Servers without validators are
+        trusted on an identical Content-Length.
+        """
+        entry = self.entry(url)
+        if entry is None:
+            return False
+        if status_code == 304:
+            return True
+        if headers.get('ETag') or headers.get('Last-Modified'):
+            return False
+        # A malformed Content-Length proves nothing: download again
+        length = content_length(headers)
+        return length is not None and entry.get('content_length') == length
+
+    def file_fingerprint(self, url, edge=FINGERPRINT_EDGE):
+        """(partial fingerprint, total size) of a cached document, read from disk"""
+        path = self.directory / self.entry(url)['path']
+        total = path.stat().st_size
+        with open(path, 'rb') as f:
+            head = f.read(edge)
+            f.seek(total - tail_length(total, edge))
+            tail = f.read(tail_length(total, edge))
+        return partial_fingerprint(total, head, tail), total
+
+    def touch(self, url):
+        """Record that url was checked and found unchanged"""
+        with self._lock:
+            self.manifest[url]['checked_at'] = datetime.now().isoformat()
+        return self.manifest[url]
+
+    @contextmanager
+    def receive(self):
+        """Temporary file (wrapped in a HashingWriter) to stream a download into"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.download.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                yield HashingWriter(f, tmp_path)
+        finally:
+            # Still there unless store() moved it into the cache
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def store(self, url, writer, headers):
+        """Move a finished download into the cache and record it in the manifest"""
+        sha256 = writer.sha256.hexdigest()
+        suffix = Path(urlparse(url).path).suffix.lower()
+        relative = Path('objects') / sha256[:2] / f'{sha256}{suffix}'
+        target = self.directory / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists():
+            os.unlink(writer.tmp_path)  # Same content already cached under another URL
+        else:
+            os.replace(writer.tmp_path, target)
+
+        now = datetime.now().isoformat()
+        entry = {
+            'sha256': sha256,
+            'size': writer.size,
+            'path': relative.as_posix(),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'content_length': content_length(headers),
+            'fetched_at': now,
+            'checked_at': now
+        }
+        with self._lock:
+            self.manifest[url] = entry
+        return entry
+
+
+class DocumentDownloader:
+    """Downloads documents into a DocumentCache with a bounded thread pool over a shared session"""
+
+    def __init__(self, session, cache, max_workers=4, timeout=(10, 60), rate_limiter=None):
+        self.session = session
+        self.cache = cache
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+
+    def fetch(self, url):
+        """Download url unless the cached copy is current. Returns (status, entry)
+
+        status is "downloaded", "unchanged" or "failed" (entry is None when failed).
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+        try:
+            with self.session.get(url, headers={**IDENTITY, **self.cache.conditional_headers(url)},
+                                  stream=True, timeout=self.timeout) as response:
+                if self.cache.is_unchanged(url, response.status_code, response.headers):
+                    return 'unchanged', self.cache.touch(url)
+                response.raise_for_status()
+                with self.cache.receive() as writer:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        writer.write(chunk)
+                    writer.file.flush()
+                    return 'downloaded', self.cache.store(url, writer, response.headers)
+        except (requests.RequestException, OSError) as e:
+            print(f"⚠️ Could not download {url}: {e}")
+            return 'failed', None
+
+    def _get_range(self, url, byte_range):
+        """GET one byte range; returns (body, total size) or None if the server ignored the Range"""
+        with self.session.get(url, headers={**IDENTITY, 'Range': f'bytes={byte_range}'}, stream=True,
+                              timeout=self.timeout) as response:
+            response.raise_for_status()
+            match = CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+            if response.status_code != 206 or not match or match.group(3) == '*':
+                return None
+            return response.content, int(match.group(3))
+
+    def fingerprint(self, url, edge=FINGERPRINT_EDGE):
+        """(partial fingerprint, total size) of a remote document, from at most two Range requests
+        
+        Cached documents are fingerprinted from disk. When the server doesn't
+        honor Range requests the document is downloaded into the cache instead.
+        Returns None if the document can't be fetched.
+        """
+        if self.cache.entry(url):
+            return self.cache.file_fingerprint(url, edge)
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+        try:
+            first = self._get_range(url, f'0-{edge - 1}')
+            if first is not None:
+                head, total = first
+                tail = b''
+                if tail_length(total, edge):
+                    last = self._get_range(url, f'-{tail_length(total, edge)}')
+                    if last is None:
+                        first = None
+                    else:
+                        tail = last[0]
+                if first is not None:
+                    return partial_fingerprint(total, head, tail), total
+        except requests.RequestException as e:
+            print(f"⚠️ Could not fingerprint {url}: {e}")
+            return None
+
+        status, entry = self.fetch(url)
+        if status == 'failed':
+            return None
+        return self.cache.file_fingerprint(url, edge)
+
+    def download_all(self, urls):
+        """Fetch every URL concurrently, save the manifest and return {url: (status, entry)}"""
+        urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = dict(zip(urls, executor.map(self.fetch, urls)))
+        self.cache.save()
+        return results
+
+
+def summarize_downloads(results):
+    """Counts per status, e.g. {"downloaded": 3, "unchanged": 10, "failed": 0}"""
+    summary = {'downloaded': 0, 'unchanged': 0, 'failed': 0}
+    for status, entry in results.values():
+        summary[status] += 1
+    return summary
+
+
+def downloaded_bytes(results):
+    """Bytes stored by the downloads in results (unchanged and failed documents count 0)"""
+    return sum(entry['size'] for status, entry in results.values() if status == 'downloaded')
@@ -0,0 +1,126 @@
+"""
+Text normalization and metadata extraction helpers for publication listings
+Regexes and translation tables are built once at import, and the regex-based
+helpers are memoized: the same parent text (a card, a listing section) is
+typically examined once per link it contains. Substring checks are cheaper
+than a cache lookup and are left unmemoized.
+"""
+
+import re
+import string
+from functools import lru_cache, wraps
+
+# Punctuation dropped from titles; hyphens and periods may be meaningful ("2023 - 2024", "n°1.2")
+TITLE_PUNCTUATION = str.maketrans('', '', string.punctuation.replace('-', '').replace('.', ''))
+
+# "6.92 Mo", "1755 ko", "2.5 MB": the units Mo/MB/Go/GB/ko/KB/To/TB in any case (the
+# Kelvin sign is what re.IGNORECASE also accepted for K). A comma decimal ("2,5 Mo")
+# yields its last digits, as the former (\d+(?:,\d+)?) fallback never got to match first.
+# A size never starts right after a digit (that digit would start an earlier match), which
+# also stops the engine from retrying every suffix of each number.
+FILE_SIZE_RE = re.compile(r'(?<!\d)(\d+(?:\.\d+)?)\s*([MGKTmgkt\u212a][OBob])')
+SIZE_NUMBER_RE = re.compile(r'(\d+(?:\.\d+)?)')
+
+# Tried in order: a DD/MM/YYYY date anywhere in the text beats an earlier DD-MM-YYYY one
+DATE_RES = (
+    re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})'),
+    re.compile(r'(\d{1,2})-(\d{1,2})-(\d{4})'),
+)
+
+# In priority order; "Documents" names a category but doesn't mark a listing section
+CATEGORIES = ("Rapport d'activités", 'Autres rapports', 'Publications', 'Documents')
+CATEGORY_MARKERS = CATEGORIES[:3]
+DEFAULT_CATEGORY = 'Non classé'
+
+PDF_HREF_RE = re.compile(r'\.pdf', re.I)
+# Link texts that say what the link does rather than what it points to
+GENERIC_LINK_LABELS = frozenset({
+    'télécharger', 'telecharger', 'télécharger le document', 'télécharger le pdf', 'download', 'pdf',
+    'voir', 'consulter', 'lire la suite', 'ouvrir', 'lien'
+})
+DOCUMENT_HREF_RE = re.compile(r'\.(pdf|doc|docx)', re.I)
+
+
+def memoized(maxsize=1024, max_length=4096):
+    """lru_cache for one-string functions that bypasses texts longer than max_length
+
+    Long texts (the text of a whole listing) are rarely passed twice as the
+    same string, and hashing them for the lookup costs as much as the scan.
+    """
+    def decorator(func):
+        cached = lru_cache(maxsize=maxsize)(func)
+
+        @wraps(func)
+        def wrapper(text):
+            if text is not None and len(text) > max_length:
+                return func(text)
+            return cached(text)
+        wrapper.cache_info = cached.cache_info
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+    return decorator
+
+
+@memoized(maxsize=4096)
+def normalize_title(title):
+    """Normalize title for duplicate detection (and for publication IDs, so never change its output)"""
+    if not title:
+        return ''
+    normalized = ' '.join(title.lower().translate(TITLE_PUNCTUATION).split())
+    # Remove common variations
+    return normalized.replace('rapport sur l', 'rapport sur le').replace('  ', ' ')
+
+
+@memoized()
+def extract_file_size(text):
+    """First file size in text ("6.92 Mo"), or None"""
+    if not text:
+        return None
+    match = FILE_SIZE_RE.search(text)
+    if match:
+        return f"{match.group(1)} {match.group(2)}"
+    return None
+
+
+@memoized()
+def extract_date(text):
+    """First DD/MM/YYYY date in text, else the first DD-MM-YYYY one, as day/month/year; or None"""
+    if not text:
+        return None
+    for date_re in DATE_RES:
+        match = date_re.search(text)
+        if match:
+            return '/'.join(match.groups())
+    return None
+
+
+def is_descriptive_link_text(text):
+    """False for link texts that cannot serve as a title: too short, or a generic label ("Télécharger", "PDF")"""
+    return bool(text) and len(text) >= 5 and ' '.join(text.lower().split()) not in GENERIC_LINK_LABELS
+
+
+def has_category_marker(text):
+    return any(marker in text for marker in CATEGORY_MARKERS)
+
+
+def extract_category(text):
+    """First category of CATEGORIES mentioned in text, else DEFAULT_CATEGORY"""
+    for category in CATEGORIES:
+        if category in text:
+            return category
+    return DEFAULT_CATEGORY
+
+
+@memoized()
+def size_in_mb(size_str):
+    """File size string ("6.92 Mo", "1755 ko") in MB, or None"""
+    if not size_str:
+        return None
+    match = SIZE_NUMBER_RE.search(size_str)
+    if not match:
+        return None
+    if 'Mo' in size_str or 'MB' in size_str:
+        return float(match.group(1))
+    if 'ko' in size_str or 'KB' in size_str:
+        return float(match.group(1)) / 1024  # Convert KB to MB
+    return None
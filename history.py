@@ -0,0 +1,253 @@
+"""
+Append-only publication history spanning every scrape
+Each run appends the publications it added, changed or removed (plus a
+"seen" marker) to one JSONL log. A small index, rebuilt from the log if it
+is ever out of date, tracks first_seen/last_seen per record and the record
+IDs per year and per category, so history queries only read the log lines
+they return.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from atomic_io import atomic_write_json
+
+INDEX_VERSION = 1
+
+
+def publication_year(pub):
+    """Year of a publication's DD/MM/YYYY date, or None"""
+    date_str = pub.get('date_posted')
+    if date_str and isinstance(date_str, str) and '/' in date_str:
+        try:
+            return int(date_str.split('/')[-1])
+        except ValueError:
+            return None
+    return None
+
+
+class PublicationHistory:
+    """All publications ever seen, with first_seen/last_seen, indexed by year and category"""
+
+    def __init__(self, directory, key=None, year_of=None):
+        self.directory = Path(directory)
+        self.log_file = self.directory / 'publications.jsonl'
+        self.index_file = self.directory / 'index.json'
+        self.key = key or (lambda pub: pub['id'])
+        self.year_of = year_of or publication_year
+
+    def exists(self):
+        return self.log_file.exists()
+
+    def log_size(self):
+        try:
+            return self.log_file.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def _empty_index():
+        return {
+            'version': INDEX_VERSION,
+            'log_size': 0,
+            'runs': 0,
+            'first_run': None,
+            'last_run': None,
+            'records': {},
+            'by_year': {},
+            'by_category': {}
+        }
+
+    def is_current(self, index):
+        """True if index is in the current format and covers the whole log"""
+        return index.get('version') == INDEX_VERSION and index.get('log_size') == self.log_size()
+
+    def load_index(self, persist=True):
+        """Return the index, rebuilding it from the log if it is missing or stale
+
+        Readers that must not write (the API) pass persist=False.
+        """
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if self.is_current(index):
+                return index
+        except (OSError, ValueError):
+            pass
+        return self.rebuild_index(persist)
+
+    def rebuild_index(self, persist=True):
+        """Replay the whole log into a fresh index (and save it unless persist is False)"""
+        index = self._empty_index()
+        if self.log_file.exists():
+            with open(self.log_file, 'rb') as f:
+                offset = 0
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # Torn tail of an interrupted append, dropped by the next record_run
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        break
+                    self._apply(index, event, offset)
+                    offset += len(line)
+            index['log_size'] = offset
+        if persist and self.log_file.exists():
+            self._save_index(index)
+        return index
+
+    def _save_index(self, index):
+        atomic_write_json(self.index_file, index, indent=None)
+
+    def _apply(self, index, event, offset):
+        """Fold one log event into the index"""
+        records = index['records']
+        at = event['at']
+        kind = event['event']
+
+        if kind == 'seen':
+            index['runs'] += 1
+            index['first_run'] = index['first_run'] or at
+            index['last_run'] = at
+            for record in records.values():
+                if record['active']:
+                    record['last_seen'] = at
+            return
+
+        pub_id = event['id']
+        record = records.get(pub_id)
+        if kind == 'removed':
+            if record is not None:
+                record['active'] = False
+                record['removed_at'] = at
+            return
+
+        # added / changed: the event line holds the latest version of the publication
+        pub = event['publication']
+        if record is None:
+            record = records[pub_id] = {'first_seen': at, 'last_seen': at, 'year': None, 'category': None}
+        else:
+            self._unpost(index, pub_id, record)
+        record.update({
+            'active': True,
+            'removed_at': None,
+            'last_seen': at,
+            'year': self.year_of(pub),
+            'category': pub.get('category', 'Non classé'),
+            'offset': offset
+        })
+        if record['year'] is not None:
+            index['by_year'].setdefault(str(record['year']), []).append(pub_id)
+        index['by_category'].setdefault(record['category'], []).append(pub_id)
+
+    @staticmethod
+    def _unpost(index, pub_id, record):
+        for postings, value in ((index['by_year'], record['year']), (index['by_category'], record['category'])):
+            if value is None:
+                continue
+            ids = postings.get(str(value))
+            if ids and pub_id in ids:
+                ids.remove(pub_id)
+                if not ids:
+                    del postings[str(value)]
+
+    def record_run(self, changes, seen_at=None):
+        """Append a run's change set (see ANGSPEScraper.diff_publications) and update the index
+
+        Publications that are still listed get last_seen = seen_at even when
+        nothing changed, so call this once per successful run.
+        """
+        seen_at = seen_at or datetime.now().isoformat()
+        events = [{'event': 'added', 'at': seen_at, 'id': self.key(pub), 'publication': pub}
+                  for pub in changes.get('added', [])]
+        events += [{'event': 'changed', 'at': seen_at, 'id': self.key(new), 'publication': new}
+                   for old, new in changes.get('changed', [])]
+        events += [{'event': 'removed', 'at': seen_at, 'id': self.key(pub)}
+                   for pub in changes.get('removed', [])]
+        events.append({'event': 'seen', 'at': seen_at})
+
+        index = self.load_index()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        offset = index['log_size']
+        if self.log_size() > offset:
+            os.truncate(self.log_file, offset)
+        with open(self.log_file, 'ab') as f:
+            for event in events:
+                line = (json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8')
+                f.write(line)
+                self._apply(index, event, offset)
+                offset += len(line)
+            f.flush()
+            os.fsync(f.fileno())
+        index['log_size'] = offset
+        self._save_index(index)
+        return index
+
+    def _read_publications(self, offsets):
+        """Read the publication stored at each log offset (in the order given)"""
+        if not offsets:
+            return []
+        publications = {}
+        with open(self.log_file, 'rb') as f:
+            for offset in sorted(set(offsets)):
+                f.seek(offset)
+                publications[offset] = json.loads(f.readline())['publication']
+        return [publications[offset] for offset in offsets]
+
+    def query(self, year=None, category=None, active=None, limit=None, index=None):
+        """Return history records matching every given filter, most recently first seen first
+
+        Each record is the latest version of the publication plus its id,
+        first_seen, last_seen, active and removed_at. Pass an already loaded
+        index to skip reading it from disk.
+        """
+        index = index if index is not None else self.load_index()
+        records = index['records']
+
+        candidates = None
+        for postings, value in ((index['by_year'], year), (index['by_category'], category)):
+            if value is not None:
+                ids = set(postings.get(str(value), ()))
+                candidates = ids if candidates is None else candidates & ids
+        ids = list(records) if candidates is None else [pub_id for pub_id in records if pub_id in candidates]
+        if active is not None:
+            ids = [pub_id for pub_id in ids if records[pub_id]['active'] == active]
+        ids.sort(key=lambda pub_id: records[pub_id]['first_seen'], reverse=True)
+        if limit is not None:
+            ids = ids[:limit]
+
+        publications = self._read_publications([records[pub_id]['offset'] for pub_id in ids])
+        return [
+            {
+                **pub,
+                'id': pub_id,
+                'first_seen': records[pub_id]['first_seen'],
+                'last_seen': records[pub_id]['last_seen'],
+                'active': records[pub_id]['active'],
+                'removed_at': records[pub_id].get('removed_at')
+            }
+            for pub_id, pub in zip(ids, publications)
+        ]
+
+    def summary(self, index=None):
+        """Record counts per year and per category, plus run bookkeeping"""
+        index = index if index is not None else self.load_index()
+        records = index['records']
+
+        def counts(postings):
+            return {
+                value: {'total': len(ids), 'active': sum(1 for pub_id in ids if records[pub_id]['active'])}
+                for value, ids in postings.items()
+            }
+
+        return {
+            'total_records': len(records),
+            'active_records': sum(1 for record in records.values() if record['active']),
+            'runs': index['runs'],
+            'first_run': index['first_run'],
+            'last_run': index['last_run'],
+            'years': dict(sorted(counts(index['by_year']).items(), reverse=True)),
+            'categories': counts(index['by_category'])
+        }
@@ -0,0 +1,152 @@
+"""
+Near-duplicate title detection with MinHash signatures and LSH banding
+Titles are reduced to character shingles, summarized by MinHash signatures
+and bucketed band by band, so only titles that collide in some band are
+compared. Finding near-duplicates among n titles costs about O(n) instead of
+the O(n²) of comparing every pair.
+"""
+
+import hashlib
+import random
+import re
+from collections import defaultdict
+
+# Mersenne prime for the (a * x + b) mod p permutation family
+_PRIME = (1 << 61) - 1
+_NUMBER_RE = re.compile(r'\d+')
+
+
+def choose_bands(threshold, num_perm):
+    """(bands, rows) whose LSH S-curve midpoint (1/bands)^(1/rows) is the highest at or below threshold
+
+    Staying just below the threshold keeps recall high; candidates are
+    verified with the exact similarity afterwards.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def numbers(text):
+    """Digit runs of a title, in order (years, issue numbers)"""
+    return _NUMBER_RE.findall(text)
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+# Low enough for a suffix like "(version finale)" on a short title (Jaccard 0.56 for
+# "Rapport annuel 2023"); titles with different numbers never match whatever the threshold
+DEFAULT_THRESHOLD = 0.5
+
+
+def parse_threshold(value):
+    """Similarity threshold in (0, 1] from a command-line or environment string, or None if invalid"""
+    try:
+        threshold = float(value)
+    except (TypeError, ValueError):
+        return None
+    return threshold if 0 < threshold <= 1 else None
+
+
+class NearDuplicateIndex:
+    """Incremental MinHash/LSH index of titles
+
+    texts should already be normalized (e.g. with _normalize_title). Titles
+    that mention different numbers (years, issue numbers) are never reported
+    as near-duplicates when same_numbers is True: "Rapport annuel 2023" and
+    "Rapport annuel 2024" are different reports however similar they look.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=128, shingle_size=3, same_numbers=True, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.same_numbers = same_numbers
+        self.bands, self.rows = choose_bands(threshold, num_perm)
+        rng = random.Random(seed)
+        self._permutations = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        # Shingles repeat across titles, so each one's hash row is computed once
+        self._shingle_rows = {}
+        self._buckets = [defaultdict(list) for _ in range(self.bands)]
+        self._shingles = {}
+        self._numbers = {}
+        self.comparisons = 0
+
+    def __len__(self):
+        return len(self._shingles)
+
+    def shingles(self, text):
+        text = f' {text} '
+        k = self.shingle_size
+        return frozenset(text[i:i + k] for i in range(max(1, len(text) - k + 1)))
+
+    def _row(self, shingle):
+        row = self._shingle_rows.get(shingle)
+        if row is None:
+            x = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+            row = self._shingle_rows[shingle] = tuple((a * x + b) % _PRIME for a, b in self._permutations)
+        return row
+
+    def signature(self, shingles):
+        """MinHash signature: per permutation, the minimum over the shingles' hash rows"""
+        rows = [self._row(shingle) for shingle in shingles]
+        return tuple(map(min, *rows)) if len(rows) > 1 else rows[0]
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [hash(signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    def query(self, text):
+        """[(key, similarity)] of indexed titles at or above the threshold, most similar first"""
+        shingles = self.shingles(text)
+        return self._matches(shingles, self._band_keys(self.signature(shingles)), text)
+
+    def _matches(self, shingles, band_keys, text):
+        candidates = set()
+        for buckets, band_key in zip(self._buckets, band_keys):
+            candidates.update(buckets.get(band_key, ()))
+        text_numbers = numbers(text) if self.same_numbers else None
+        matches = []
+        for key in candidates:
+            self.comparisons += 1
+            if self.same_numbers and self._numbers[key] != text_numbers:
+                continue
+            similarity = jaccard(shingles, self._shingles[key])
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+    def add(self, key, text):
+        """Index a title under key and return its matches among the titles indexed before it"""
+        shingles = self.shingles(text)
+        band_keys = self._band_keys(self.signature(shingles))
+        matches = self._matches(shingles, band_keys, text)
+        self._insert(key, text, shingles, band_keys)
+        return matches
+
+    def _insert(self, key, text, shingles, band_keys):
+        self._shingles[key] = shingles
+        self._numbers[key] = numbers(text)
+        for buckets, band_key in zip(self._buckets, band_keys):
+            buckets[band_key].append(key)
+
+    def add_unique(self, key, text):
+        """Index a title unless it near-duplicates one already indexed
+
+        Returns the matches (empty when the title was added), so callers can
+        keep the first of each group of near-duplicates in one pass.
+        """
+        shingles = self.shingles(text)
+        band_keys = self._band_keys(self.signature(shingles))
+        matches = self._matches(shingles, band_keys, text)
+        if not matches:
+            self._insert(key, text, shingles, band_keys)
+        return matches
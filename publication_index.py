@@ -0,0 +1,257 @@
+"""
+SQLite index of the current publications
+The scraper upserts every run into data/publications.db; the API answers
+filtered, sorted and paginated queries from it instead of shipping the
+whole list. Pagination is keyset-based (WHERE (sort_key, id) > cursor), so
+every page costs the same however deep it is.
+"""
+
+import base64
+import binascii
+import json
+import sqlite3
+import threading
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+
+from history import publication_year
+
+# Bumped when a sync must repopulate derived tables (e.g. the full-text index was added)
+SCHEMA_VERSION = '2'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS publications (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    title_sort TEXT NOT NULL,
+    category TEXT,
+    date_posted TEXT,
+    date_sort TEXT NOT NULL,
+    year INTEGER,
+    file_type TEXT,
+    file_size TEXT,
+    download_url TEXT,
+    active INTEGER NOT NULL DEFAULT 1,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_publications_category ON publications (category);
+CREATE INDEX IF NOT EXISTS idx_publications_date_posted ON publications (date_sort, id);
+CREATE INDEX IF NOT EXISTS idx_publications_file_type ON publications (file_type);
+CREATE INDEX IF NOT EXISTS idx_publications_year ON publications (year, date_sort, id);
+CREATE INDEX IF NOT EXISTS idx_publications_position ON publications (position, id);
+CREATE INDEX IF NOT EXISTS idx_publications_title ON publications (title_sort, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS publications_fts USING fts5 (
+    id UNINDEXED,
+    title,
+    category,
+    tokenize = "unicode61 remove_diacritics 2"
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# sort name -> (column, descending)
+SORTS = {
+    'listing': ('position', False),
+    'newest': ('date_sort', True),
+    'oldest': ('date_sort', False),
+    'title': ('title_sort', False),
+}
+
+
+# Title matches count more than category matches (id is unindexed)
+FTS_WEIGHTS = (0.0, 10.0, 1.0)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def fold_text(text):
+    """Search folding: case- and accent-insensitive, punctuation treated as a word break
+    
+    Same lowercasing and punctuation/whitespace folding as the scraper's
+    _normalize_title, except punctuation splits words instead of being
+    deleted, so "l'État" yields "l etat" rather than "letat".
+    """
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(''.join(ch if ch.isalnum() else ' ' for ch in stripped).split())
+
+
+def match_expression(query):
+    """FTS5 MATCH expression requiring every query word, each as a prefix"""
+    terms = fold_text(query).split()
+    return ' AND '.join(f'"{term}"*' for term in terms)
+
+
+def date_sort_key(date_posted):
+    """DD/MM/YYYY -> YYYY-MM-DD so dates sort as text ('' when unknown)"""
+    parts = (date_posted or '').split('/')
+    if len(parts) == 3 and all(part.isdigit() for part in parts):
+        day, month, year = parts
+        return f"{year}-{int(month):02d}-{int(day):02d}"
+    return ''
+
+
+def encode_cursor(sort_value, pub_id):
+    raw = json.dumps([sort_value, pub_id], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_value, pub_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+    # Both are bound as SQL parameters: anything else is a forged cursor, not a server error
+    if not isinstance(pub_id, str) or not (sort_value is None or isinstance(sort_value, (str, int, float))):
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+    return sort_value, pub_id
+
+
+class PublicationIndex:
+    """Queryable SQLite copy of the current publications snapshot"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def exists(self):
+        return self.path.exists()
+
+    def _connect(self):
+        """One connection per thread, created (with the schema) on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.create_function('fold', 1, fold_text, deterministic=True)
+            # WAL lets the API read while a scrape writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def get_meta(self, key):
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+
+    def is_synced(self, source):
+        """True if the index holds the snapshot identified by source, in the current schema"""
+        return (self.exists() and source is not None
+                and self.get_meta('source') == source and self.get_meta('schema') == SCHEMA_VERSION)
+
+    def sync(self, publications, seen_at, source=None):
+        """Upsert a full snapshot and mark publications that left it inactive
+
+        source identifies the snapshot (its scraped_at) so readers can tell
+        whether the index is behind the JSON file.
+        """
+        seen_at = seen_at or datetime.now().isoformat()
+        rows = []
+        for position, pub in enumerate(publications):
+            rows.append((
+                pub['id'], position, pub.get('title') or '', (pub.get('title') or '').casefold(),
+                pub.get('category'), pub.get('date_posted'), date_sort_key(pub.get('date_posted')),
+                publication_year(pub), pub.get('file_type'), pub.get('file_size'), pub.get('download_url'),
+                seen_at, seen_at, json.dumps(pub, ensure_ascii=False)
+            ))
+
+        conn = self._connect()
+        with conn:
+            conn.executemany("""
+                INSERT INTO publications (id, position, title, title_sort, category, date_posted, date_sort,
+                                          year, file_type, file_size, download_url, active, first_seen, last_seen, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    position = excluded.position, title = excluded.title, title_sort = excluded.title_sort,
+                    category = excluded.category, date_posted = excluded.date_posted, date_sort = excluded.date_sort,
+                    year = excluded.year, file_type = excluded.file_type, file_size = excluded.file_size,
+                    download_url = excluded.download_url, active = 1, last_seen = excluded.last_seen,
+                    data = excluded.data
+            """, rows)
+            conn.execute("UPDATE publications SET active = 0 WHERE active = 1 AND last_seen <> ?", (seen_at,))
+            # The full-text index only covers the current publications; rebuilding it is cheap
+            conn.execute("DELETE FROM publications_fts")
+            conn.execute("""
+                INSERT INTO publications_fts (id, title, category)
+                SELECT id, fold(title), fold(category) FROM publications WHERE active = 1
+            """)
+            # Make the weighted bm25 the table's rank so MATCH ... ORDER BY rank LIMIT n stays top-n
+            conn.execute("INSERT INTO publications_fts (publications_fts, rank) VALUES ('rank', ?)",
+                         (f"bm25({', '.join(map(str, FTS_WEIGHTS))})",))
+            conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                             [('source', source or seen_at), ('schema', SCHEMA_VERSION)])
+        # Refresh planner statistics so filtered queries pick the right index
+        conn.execute("ANALYZE")
+        return len(rows)
+
+    def query(self, category=None, year=None, file_type=None, sort='listing', limit=50, cursor=None):
+        """Return (publications, next_cursor) for one page of active publications
+
+        next_cursor is None on the last page. Raises InvalidCursor for a
+        cursor that wasn't produced by this method, and ValueError for an
+        unknown sort.
+        """
+        if sort not in SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        column, descending = SORTS[sort]
+
+        clauses = ["active = 1"]
+        params = []
+        for name, value in (('category', category), ('year', year), ('file_type', file_type)):
+            if value is not None:
+                clauses.append(f"{name} = ?")
+                params.append(value)
+        if cursor:
+            sort_value, pub_id = decode_cursor(cursor)
+            clauses.append(f"({column}, id) {'<' if descending else '>'} (?, ?)")
+            params += [sort_value, pub_id]
+
+        order = 'DESC' if descending else 'ASC'
+        sql = (f"SELECT id, {column} AS sort_value, data FROM publications WHERE {' AND '.join(clauses)} "
+               f"ORDER BY {column} {order}, id {order} LIMIT ?")
+        rows = self._connect().execute(sql, params + [limit + 1]).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['sort_value'], rows[-1]['id'])
+        return [json.loads(row['data']) for row in rows], next_cursor
+
+    def search(self, query, limit=20, offset=0):
+        """Ranked prefix search over titles and categories: [(publication, score)], best first
+
+        Scores are bm25 (lower is better) negated so that higher is better.
+        offset skips that many of the best matches, to page through them.
+        """
+        expression = match_expression(query)
+        if not expression:
+            return []
+        # Rank and cut inside the FTS table first, then fetch only the winning rows;
+        # rowid breaks rank ties so that pages neither repeat nor skip a match
+        rows = self._connect().execute("""
+            SELECT p.data, f.rank
+            FROM (SELECT id, rank FROM publications_fts WHERE publications_fts MATCH ?
+                  ORDER BY rank, rowid LIMIT ? OFFSET ?) f
+            JOIN publications p ON p.id = f.id
+            ORDER BY f.rank, p.position
+        """, (expression, limit, offset)).fetchall()
+        return [(json.loads(row['data']), round(-row['rank'], 4)) for row in rows]
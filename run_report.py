@@ -0,0 +1,72 @@
+"""
+Per-stage resource accounting for a scrape run
+The scraper already reports each pipeline stage as running/done/skipped to
+its progress callback; RunReport listens to the same notifications and
+records, per stage, wall time, process CPU time, how much the stage raised
+the process's peak RSS, and the bytes and items it took in and produced.
+"""
+
+import sys
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Metrics a stage may report when it finishes; anything it doesn't know stays None
+STAGE_METRICS = ('items_in', 'items_out', 'bytes_in', 'bytes_out')
+
+
+def peak_rss_bytes():
+    """High-water mark of the process's resident set size, or None where unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RunReport:
+    """Stages of one run in the order they started, with their measurements"""
+
+    def __init__(self):
+        self.started_at = datetime.now().isoformat()
+        self.stages = {}
+        self._starts = {}
+        self._run_start = (time.perf_counter(), time.process_time(), peak_rss_bytes())
+
+    def update(self, stage, state, **metrics):
+        """Record a stage moving to running, done or skipped (the progress callback's states)"""
+        entry = self.stages.setdefault(stage, {
+            'state': 'pending', 'wall_seconds': None, 'cpu_seconds': None, 'peak_rss_delta_bytes': None,
+            **{metric: None for metric in STAGE_METRICS}
+        })
+        entry['state'] = state
+        if state == 'running':
+            self._starts[stage] = (time.perf_counter(), time.process_time(), peak_rss_bytes())
+        elif stage in self._starts:
+            wall, cpu, rss = self._starts.pop(stage)
+            entry['wall_seconds'] = round(time.perf_counter() - wall, 6)
+            entry['cpu_seconds'] = round(time.process_time() - cpu, 6)
+            if rss is not None:
+                entry['peak_rss_delta_bytes'] = peak_rss_bytes() - rss
+        entry.update((metric, value) for metric, value in metrics.items() if metric in STAGE_METRICS)
+
+    def to_dict(self, outcome, **extra):
+        """JSON-serializable report; stages still running (the run failed in them) end as interrupted"""
+        for stage in list(self._starts):
+            self.update(stage, 'interrupted')
+        wall, cpu, rss = self._run_start
+        return {
+            'started_at': self.started_at,
+            'finished_at': datetime.now().isoformat(),
+            'outcome': outcome,
+            'wall_seconds': round(time.perf_counter() - wall, 6),
+            'cpu_seconds': round(time.process_time() - cpu, 6),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'peak_rss_delta_bytes': peak_rss_bytes() - rss if rss is not None else None,
+            'stages': {stage: dict(entry) for stage, entry in self.stages.items()},
+            **extra
+        }
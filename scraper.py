@@ -5,54 +5,314 @@ Scrapes and analyzes publications from https://angspe.ma/les-publications
 """
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+import bisect
 import re
 import os
 from datetime import datetime
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 import json
-from collections import Counter
+import hashlib
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from atomic_io import atomic_write, atomic_write_json
+from crawler import PaginationCrawler
+from documents import FINGERPRINT_EDGE, DocumentCache, DocumentDownloader, downloaded_bytes, summarize_downloads
+import extraction
+from extraction import DEFAULT_CATEGORY, DOCUMENT_HREF_RE, PDF_HREF_RE
+from history import PublicationHistory, publication_year
+from near_duplicates import DEFAULT_THRESHOLD, NearDuplicateIndex, parse_threshold
+from publication_index import PublicationIndex
+from run_report import RunReport
+from snapshots import ReplaySession, SnapshotArchive
+from transport import HTML_ACCEPT_ENCODING, make_session
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+SECTION_TAGS = ['div', 'article', 'section']
+SECTION_CLASS_RE = re.compile(r'publication|rapport|document', re.I)
+
+
+def pages_size(pages):
+    """UTF-8 size in bytes of the HTML of (url, html) listing pages"""
+    return sum(len(html.encode('utf-8')) for _, html in pages)
+
+
+class DocumentIndex:
+    """One-pass index over a parsed page so per-link metadata lookups don't rescan the tree
+    
+    The walk records, for every tag, its character span in the concatenated
+    document text (the same strings get_text() would join) and its position
+    in document order. Dates, file sizes and categories are then computed at
+    most once per node and memoized.
+    """
+
+    def __init__(self, soup, scraper):
+        self.scraper = scraper
+        self._spans = {}
+        self._order = {}
+        self._heading_orders = []
+        self._headings = []
+        self._dates = {}
+        self._file_sizes = {}
+        self._categories = {}
+        self._build(soup)
+
+    def _build(self, soup):
+        string_types = soup.interesting_string_types
+        pieces = []
+        offset = 0
+        order = 0
+        starts = {}
+        stack = [(soup, False)]
+        while stack:
+            node, leaving = stack.pop()
+            if isinstance(node, Tag):
+                key = id(node)
+                if leaving:
+                    self._spans[key] = (starts.pop(key), offset)
+                    self._order[key] = (self._order[key], order)
+                    continue
+                starts[key] = offset
+                self._order[key] = order
+                if node.name in HEADING_TAGS:
+                    self._heading_orders.append(order)
+                    self._headings.append(node)
+                order += 1
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.contents))
+            elif type(node) in string_types:
+                pieces.append(node)
+                offset += len(node)
+        self.text_content = ''.join(pieces)
+
+    def text(self, node):
+        """Equivalent of node.get_text() served from the precomputed document text"""
+        start, end = self._spans[id(node)]
+        return self.text_content[start:end]
+
+    def first_heading(self, node):
+        """Equivalent of node.find(HEADING_TAGS) via a lookup in document order"""
+        first, last = self._order[id(node)]
+        i = bisect.bisect_right(self._heading_orders, first)
+        if i < len(self._heading_orders) and self._heading_orders[i] < last:
+            return self._headings[i]
+        return None
+
+    def date(self, node):
+        key = id(node)
+        if key not in self._dates:
+            self._dates[key] = self.scraper.extract_date_from_text(self.text(node))
+        return self._dates[key]
+
+    def file_size(self, node):
+        key = id(node)
+        if key not in self._file_sizes:
+            self._file_sizes[key] = self.scraper.extract_file_size(self.text(node))
+        return self._file_sizes[key]
+
+    def category(self, element):
+        """Category of the closest ancestor mentioning a category marker"""
+        pending = []
+        node = element.parent
+        category = DEFAULT_CATEGORY
+        while node is not None:
+            key = id(node)
+            if key in self._categories:
+                category = self._categories[key]
+                break
+            pending.append(key)
+            text = self.text(node)
+            if extraction.has_category_marker(text):
+                category = self.scraper.extract_category_from_text(text)
+                break
+            node = node.parent
+        for key in pending:
+            self._categories[key] = category
+        return category
+
+
+def expand_analysis(analysis, publications):
+    """Return a copy of a normalized analysis with the referenced publications inlined
+    
+    Analyses store publication IDs (latest_publication_id, publication_ids).
+    This restores latest_publication and publications_list for consumers of
+    the original format. Analyses already in that format are returned as is.
+    """
+    if not analysis or 'publications_list' in analysis or 'publication_ids' not in analysis:
+        return analysis
+    by_id = {pub.get('id'): pub for pub in publications}
+    expanded = dict(analysis)
+    expanded['latest_publication'] = by_id.get(analysis.get('latest_publication_id'))
+    expanded['publications_list'] = [by_id[pub_id] for pub_id in analysis['publication_ids'] if pub_id in by_id]
+    return expanded
+
+
 class ANGSPEScraper:
-    def __init__(self):
+    def __init__(self, data_dir="data", http2=False):
+        self.data_dir = Path(data_dir)
         self.base_url = "https://angspe.ma"
         self.target_url = "https://angspe.ma/les-publications"
-        self.session = requests.Session()
+        # Pooled session with (connect, read) timeouts and budgeted retries (see transport.py);
+        # with http2=True requests go over HTTP/2 through httpx when h2 is installed
+        self.session = make_session(http2=http2, pool_size=10)
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            # Listing pages compress well; documents are requested as identity (see documents.py)
+            'Accept-Encoding': HTML_ACCEPT_ENCODING
         })
+        # session.summary() of the last run: request timings and wire vs decoded bytes
+        self.last_transport = None
+        # Pagination crawl settings (api.angspe.ma serves the documents and may serve listings)
+        self.crawl_hosts = {'api.angspe.ma'}
+        self.crawl_workers = 4
+        self.crawl_max_pages = 50
+        self.crawl_min_interval = 0.5
+        self.validators_file = self.data_dir / "fetch_validators.json"
+        self.page_not_modified = False
+        self._pending_validators = None
+        self.last_saved_document = None
+        self.change_log_file = self.data_dir / "changelog.jsonl"
+        # Every publication ever seen, across years (see history.py)
+        self.history = PublicationHistory(
+            self.data_dir / "history",
+            key=lambda pub: pub.get('id') or self.publication_id(pub),
+            year_of=self._publication_year
+        )
+        # Queryable SQLite copy of the current publications (see publication_index.py)
+        self.publication_index = PublicationIndex(self.data_dir / "publications.db")
+        # Optional document download stage (see documents.py)
+        self.documents = DocumentCache(self.data_dir / "documents")
+        self.download_workers = 4
+        # {url: (status, manifest entry)} of the last download stage
+        self.last_downloads = None
+        # Also drop publications whose document is byte-identical to an earlier one's
+        self.content_dedup = False
+        # Also drop publications whose title is this similar (0-1, Jaccard over character
+        # shingles) to an earlier one's; None disables near-duplicate title detection
+        self.fuzzy_title_threshold = None
+        # Names of the files written by save_results in this run, recorded in generation.json
+        self.last_saved_files = {}
+        # Change set of the last finished run (see diff_publications)
+        self.last_changes = None
+        self.run_lock_busy = False
+        # Optional callable(stage, state) notified as fetch/parse/analyze/save progress
+        self.progress_callback = None
+        # Per-stage time, CPU, memory, bytes and items of the current run (see run_report.py),
+        # written to data/run_report.json when the run ends and kept in last_run_report
+        self.run_report = None
+        self.last_run_report = None
+        self.run_report_file = self.data_dir / "run_report.json"
         
-    def fetch_page_html(self):
-        """Fetch the HTML content of the publications page"""
+    def load_validators(self):
+        """Load the ETag/Last-Modified validators saved by the previous run"""
         try:
-            response = self.session.get(self.target_url, timeout=30)
+            if not self.validators_file.exists():
+                return {}
+            with open(self.validators_file, 'r', encoding='utf-8') as f:
+                validators = json.load(f)
+            # Validators only apply to the URL they were recorded for
+            if validators.get('url') != self.target_url:
+                return {}
+            return validators
+        except Exception as e:
+            print(f"⚠️ Warning: Could not read fetch validators: {e}")
+            return {}
+    
+    def save_validators(self):
+        """Persist the validators of the last fetched response for the next run"""
+        if not self._pending_validators:
+            return
+        try:
+            atomic_write_json(self.validators_file, self._pending_validators)
+            self._pending_validators = None
+        except Exception as e:
+            print(f"⚠️ Warning: Could not save fetch validators: {e}")
+    
+    def conditional_headers(self):
+        """If-None-Match / If-Modified-Since headers from the validators saved by the previous run"""
+        validators = self.load_validators()
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+    
+    def remember_validators(self, response):
+        """Keep the validators of the fetched page pending until the results are saved, so a failed run is retried"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self._pending_validators = {
+                'url': self.target_url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'fetched_at': datetime.now().isoformat()
+            }
+    
+    def fetch_page_html(self, conditional=True):
+        """Fetch the HTML content of the publications page
+        
+        When conditional is True and validators from a previous run exist, the
+        request carries If-None-Match / If-Modified-Since. A 304 response sets
+        page_not_modified and returns None.
+        """
+        self.page_not_modified = False
+        headers = self.conditional_headers() if conditional else {}
+        
+        try:
+            response = self.session.get(self.target_url, headers=headers)
+            if response.status_code == 304:
+                self.page_not_modified = True
+                return None
             response.raise_for_status()
+            self.remember_validators(response)
             return response.text
         except requests.RequestException as e:
             print(f"Error fetching page: {e}")
             return None
     
-    def parse_publications(self, html_content):
-        """Parse publications from the HTML content"""
-        soup = BeautifulSoup(html_content, 'lxml')
+    def parse_publications(self, html_content, lean=False, seen_urls=None, seen_titles=None):
+        """Parse publications from the HTML content
+        
+        With lean=True the page is first parsed through a SoupStrainer that only
+        materializes publication sections. The full tree is built only when the
+        page has no sections (bare links and alternative parsing need the
+        whole document for context). The output is identical either way.
+        
+        seen_urls / seen_titles may be shared across calls to dedup several pages.
+        """
+        soup = None
         publications = []
-        seen_urls = set()  # Track URLs to avoid duplicates
-        seen_titles = set()  # Track titles to avoid duplicates
+        if seen_urls is None:
+            seen_urls = set()  # Track URLs to avoid duplicates
+        if seen_titles is None:
+            seen_titles = set()  # Track titles to avoid duplicates
         
         # Find all publication items
         # Based on the provided content, publications seem to be in a specific structure
-        publication_sections = soup.find_all(['div', 'article', 'section'], class_=re.compile(r'publication|rapport|document', re.I))
+        if lean:
+            strainer = SoupStrainer(SECTION_TAGS, class_=SECTION_CLASS_RE)
+            sections_soup = BeautifulSoup(html_content, 'lxml', parse_only=strainer)
+            publication_sections = sections_soup.find_all(SECTION_TAGS, class_=SECTION_CLASS_RE)
+            if not publication_sections:
+                soup = BeautifulSoup(html_content, 'lxml')
+        else:
+            soup = BeautifulSoup(html_content, 'lxml')
+            publication_sections = soup.find_all(SECTION_TAGS, class_=SECTION_CLASS_RE)
         
         # If no specific sections found, look for download links and titles
         if not publication_sections:
             # Look for PDF download links
-            pdf_links = soup.find_all('a', href=re.compile(r'\.pdf', re.I))
+            pdf_links = soup.find_all('a', href=PDF_HREF_RE)
             print(f"🔗 Found {len(pdf_links)} PDF links to process")
+            index = DocumentIndex(soup, self) if pdf_links else None
             
             for i, link in enumerate(pdf_links, 1):
                 print(f"   📄 Processing link {i}/{len(pdf_links)}...")
-                publication = self.extract_publication_info(link, soup)
+                publication = self.extract_publication_info(link, soup, index)
                 if publication and self._is_unique_publication(publication, seen_urls, seen_titles):
                     publications.append(publication)
                     seen_urls.add(publication['download_url'])
@@ -68,15 +328,61 @@ class ANGSPEScraper:
         
         # If still no publications found, try alternative parsing
         if not publications:
+            if soup is None:
+                soup = BeautifulSoup(html_content, 'lxml')
             alt_publications = self.alternative_parsing(soup)
             for publication in alt_publications:
                 if self._is_unique_publication(publication, seen_urls, seen_titles):
                     publications.append(publication)
                     seen_urls.add(publication['download_url'])
                     seen_titles.add(self._normalize_title(publication.get('title', '')))
+        
+        for publication in publications:
+            publication['id'] = self.publication_id(publication)
             
         return publications
     
+    def report_progress(self, stage, state, **metrics):
+        """Notify the progress callback, if any, that a pipeline stage changed state
+        
+        metrics (items_in, items_out, bytes_in, bytes_out) only go to the run report.
+        """
+        if self.run_report is not None:
+            self.run_report.update(stage, state, **metrics)
+        if self.progress_callback is not None:
+            try:
+                self.progress_callback(stage, state)
+            except Exception as e:
+                print(f"⚠️ Warning: Progress callback failed: {e}")
+    
+    def make_crawler(self, session):
+        """Build a PaginationCrawler configured for this scraper's hosts and limits"""
+        allowed_hosts = {urlparse(self.target_url).netloc, urlparse(self.base_url).netloc} | self.crawl_hosts
+        return PaginationCrawler(
+            session,
+            allowed_hosts,
+            max_workers=self.crawl_workers,
+            max_pages=self.crawl_max_pages,
+            min_interval=self.crawl_min_interval
+        )
+    
+    def crawl_publications(self, html_content):
+        """Parse the first listing page plus any paginated follow-up pages, deduplicated together"""
+        pages = self.make_crawler(self.session).crawl(self.target_url, html_content)
+        self.report_progress('fetch', 'done', items_out=len(pages), bytes_in=pages_size(pages))
+        return self.parse_pages(pages)
+    
+    def parse_pages(self, pages):
+        """Parse (url, html) listing pages in order with a shared dedup state"""
+        self.report_progress('parse', 'running')
+        publications = []
+        seen_urls = set()
+        seen_titles = set()
+        for page_url, page_html in pages:
+            publications.extend(self.parse_publications(page_html, lean=True, seen_urls=seen_urls, seen_titles=seen_titles))
+        self.report_progress('parse', 'done', items_in=len(pages), bytes_in=pages_size(pages), items_out=len(publications))
+        return publications
+    
     def _is_unique_publication(self, publication, seen_urls, seen_titles):
         """Check if publication is unique based on URL and title"""
         if not publication:
@@ -110,31 +416,128 @@ class ANGSPEScraper:
         
         return True
     
-    def _normalize_title(self, title):
-        """Normalize title for duplicate detection"""
-        if not title:
-            return ''
+    def download_documents(self, publications):
+        """Fetch every document into the content-addressed cache, skipping unchanged ones"""
+        self.report_progress('download', 'running')
+        downloader = DocumentDownloader(self.session, self.documents, max_workers=self.download_workers)
+        urls = [pub['download_url'] for pub in publications if pub.get('download_url')]
+        self.last_downloads = downloader.download_all(urls)
+        self.print_download_summary()
+        self.report_progress('download', 'done', items_in=len(urls),
+                             items_out=summarize_downloads(self.last_downloads)['downloaded'],
+                             bytes_in=downloaded_bytes(self.last_downloads))
+        return self.last_downloads
+    
+    def print_download_summary(self):
+        summary = summarize_downloads(self.last_downloads)
+        print(f"📥 Documents: {summary['downloaded']} downloaded, {summary['unchanged']} unchanged, "
+              f"{summary['failed']} failed (cache: {self.documents.directory})")
+    
+    def dedupe_by_content(self, publications):
+        """Drop publications whose document is byte-identical to an earlier one's
         
-        # Convert to lowercase and strip whitespace
-        normalized = title.lower().strip()
+        Documents are compared by a partial fingerprint first (length plus the
+        first and last 64 KB, fetched with HTTP Range requests or read from
+        the document cache). Only larger documents that share a fingerprint
+        are confirmed with a full SHA-256, which downloads them into the cache.
+        """
+        print("🔄 Checking for duplicates by document content...")
+        downloader = DocumentDownloader(self.session, self.documents, max_workers=self.download_workers)
+        urls = list(dict.fromkeys(pub['download_url'] for pub in publications if pub.get('download_url')))
+        with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+            fingerprints = dict(zip(urls, executor.map(downloader.fingerprint, urls)))
         
-        # Remove common punctuation and extra spaces
-        import string
-        # Remove punctuation except hyphens and periods that might be meaningful
-        translator = str.maketrans('', '', string.punctuation.replace('-', '').replace('.', ''))
-        normalized = normalized.translate(translator)
+        groups = defaultdict(list)
+        for url, fingerprint in fingerprints.items():
+            if fingerprint is not None:
+                groups[fingerprint].append(url)
         
-        # Replace multiple spaces with single space
-        normalized = ' '.join(normalized.split())
+        duplicate_of = {}
+        confirmed_downloads = False
+        for (fingerprint, total), group in groups.items():
+            if len(group) < 2:
+                continue
+            if total <= 2 * FINGERPRINT_EDGE:
+                keys = {url: fingerprint for url in group}  # The fingerprint covered every byte
+            else:
+                keys = {}
+                for url in group:
+                    entry = self.documents.entry(url)
+                    if entry is None:
+                        entry = downloader.fetch(url)[1]
+                        confirmed_downloads = True
+                    if entry is not None:
+                        keys[url] = entry['sha256']
+            originals = {}
+            for url in group:
+                if url in keys:
+                    original = originals.setdefault(keys[url], url)
+                    if original != url:
+                        duplicate_of[url] = original
+        if confirmed_downloads:
+            self.documents.save()
         
-        # Remove common variations
-        normalized = normalized.replace('rapport sur l', 'rapport sur le')
-        normalized = normalized.replace('  ', ' ')
+        titles = {}
+        for pub in publications:
+            titles.setdefault(pub.get('download_url'), pub.get('title'))
+        unique = []
+        for pub in publications:
+            original = duplicate_of.get(pub.get('download_url'))
+            if original:
+                print(f"🔄 Skipping duplicate by content: {pub.get('title')}")
+                print(f"   📄 Same document as: {titles[original]}")
+            else:
+                unique.append(pub)
+        print(f"📄 Compared {len(fingerprints)} documents, {len(publications) - len(unique)} duplicates by content")
+        return unique
+    
+    def dedupe_near_titles(self, publications, threshold=None):
+        """Drop publications whose title nearly matches an earlier one's
         
-        return normalized
+        Titles are compared by Jaccard similarity over character 3-shingles;
+        MinHash/LSH (see near_duplicates.py) keeps this close to linear in the
+        number of publications. Titles mentioning different numbers, such as
+        two yearly reports, are never treated as duplicates.
+        """
+        threshold = threshold if threshold is not None else self.fuzzy_title_threshold
+        print(f"🔄 Checking for near-duplicate titles (similarity >= {threshold})...")
+        index = NearDuplicateIndex(threshold=threshold)
+        unique = []
+        for pub in publications:
+            matches = index.add_unique(len(unique), self._normalize_title(pub.get('title', '')))
+            if matches:
+                original, similarity = matches[0]
+                print(f"🔄 Skipping near-duplicate title: {pub.get('title')}")
+                print(f"   📄 Similar ({similarity:.2f}) to: {unique[original].get('title')}")
+            else:
+                unique.append(pub)
+        print(f"📄 Compared {len(publications)} titles, {len(publications) - len(unique)} near-duplicates")
+        return unique
+    
+    def dedupe_publications(self, publications):
+        """Optional dedup stage run after parsing: near-duplicate titles, then document content"""
+        if self.fuzzy_title_threshold is None and not self.content_dedup:
+            return publications
+        self.report_progress('dedup', 'running')
+        items_in = len(publications)
+        if self.fuzzy_title_threshold is not None:
+            publications = self.dedupe_near_titles(publications)
+        if self.content_dedup:
+            publications = self.dedupe_by_content(publications)
+        self.report_progress('dedup', 'done', items_in=items_in, items_out=len(publications))
+        return publications
+    
+    def publication_id(self, publication):
+        """Stable ID of a publication: hash of its normalized title and download URL"""
+        key = f"{self._normalize_title(publication.get('title', ''))}|{publication.get('download_url', '')}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+    
+    def _normalize_title(self, title):
+        """Normalize title for duplicate detection (see extraction.normalize_title)"""
+        return extraction.normalize_title(title)
     
-    def extract_publication_info(self, link, soup):
-        """Extract publication information from a download link"""
+    def extract_publication_info(self, link, soup, index=None):
+        """Extract publication information from a download link (index: optional DocumentIndex)"""
         try:
             # Get the href
             href = link.get('href', '')
@@ -146,11 +549,14 @@ class ANGSPEScraper:
             
             # Extract title (could be link text or nearby heading)
             title = link.get_text(strip=True)
-            if not title or len(title) < 5:  # If link text is not descriptive
+            if not extraction.is_descriptive_link_text(title):
                 # Look for nearby headings
                 parent = link.find_parent()
                 if parent:
-                    heading = parent.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+                    if index is not None:
+                        heading = index.first_heading(parent)
+                    else:
+                        heading = parent.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
                     if heading:
                         title = heading.get_text(strip=True)
             
@@ -160,13 +566,16 @@ class ANGSPEScraper:
                 # Look in parent elements
                 parent = link.find_parent()
                 if parent:
-                    file_size = self.extract_file_size(parent.get_text())
+                    if index is not None:
+                        file_size = index.file_size(parent)
+                    else:
+                        file_size = self.extract_file_size(parent.get_text())
             
             # Extract date
-            date_posted = self.extract_date(link, soup)
+            date_posted = self.extract_date(link, soup, index)
             
             # Extract category
-            category = self.extract_category(link, soup)
+            category = self.extract_category(link, soup, index)
             
             return {
                 'title': title,
@@ -188,7 +597,7 @@ class ANGSPEScraper:
             title = title_elem.get_text(strip=True) if title_elem else ''
             
             # Find download link
-            download_link = section.find('a', href=re.compile(r'\.(pdf|doc|docx)', re.I))
+            download_link = section.find('a', href=DOCUMENT_HREF_RE)
             download_url = ''
             file_type = 'Unknown'
             
@@ -255,71 +664,40 @@ class ANGSPEScraper:
         return publications
     
     def extract_file_size(self, text):
-        """Extract file size from text"""
-        if not text:
-            return None
-            
-        # Look for patterns like "6.92 Mo", "1755 ko", "2.5 MB", etc.
-        size_patterns = [
-            r'(\d+(?:\.\d+)?)\s*(Mo|MB|Go|GB|ko|KB|To|TB)',
-            r'(\d+(?:,\d+)?)\s*(Mo|MB|Go|GB|ko|KB|To|TB)'
-        ]
-        
-        for pattern in size_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                size, unit = match.groups()
-                return f"{size} {unit}"
-        
-        return None
+        """Extract file size from text ("6.92 Mo", "1755 ko", "2.5 MB", ...)"""
+        return extraction.extract_file_size(text)
     
-    def extract_date(self, element, soup):
+    def extract_date(self, element, soup, index=None):
         """Extract date from element or nearby elements"""
         # Look for date patterns in the element and its parents
         for elem in [element] + list(element.find_parents())[:3]:
-            date = self.extract_date_from_text(elem.get_text())
+            if index is not None:
+                date = index.date(elem)
+            else:
+                date = self.extract_date_from_text(elem.get_text())
             if date:
                 return date
         return None
     
     def extract_date_from_text(self, text):
-        """Extract date from text using various patterns"""
-        if not text:
-            return None
-            
-        # French date patterns
-        date_patterns = [
-            r'(\d{1,2})/(\d{1,2})/(\d{4})',  # DD/MM/YYYY
-            r'(\d{1,2})-(\d{1,2})-(\d{4})',  # DD-MM-YYYY
-            r'Posté le (\d{1,2})/(\d{1,2})/(\d{4})',  # "Posté le DD/MM/YYYY"
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, text)
-            if match:
-                if 'Posté le' in pattern:
-                    return f"{match.group(1)}/{match.group(2)}/{match.group(3)}"
-                else:
-                    return f"{match.group(1)}/{match.group(2)}/{match.group(3)}"
-        
-        return None
+        """Extract a DD/MM/YYYY (or DD-MM-YYYY) date from text"""
+        return extraction.extract_date(text)
     
-    def extract_category(self, element, soup):
+    def extract_category(self, element, soup, index=None):
         """Extract category from element context"""
+        if index is not None:
+            return index.category(element)
+        
         # Look for category indicators in parent elements
         for parent in element.find_parents():
             parent_text = parent.get_text()
-            if any(cat in parent_text for cat in ['Rapport d\'activités', 'Autres rapports', 'Publications']):
+            if extraction.has_category_marker(parent_text):
                 return self.extract_category_from_text(parent_text)
-        return 'Non classé'
+        return DEFAULT_CATEGORY
     
     def extract_category_from_text(self, text):
         """Extract category from text"""
-        categories = ['Rapport d\'activités', 'Autres rapports', 'Publications', 'Documents']
-        for category in categories:
-            if category in text:
-                return category
-        return 'Non classé'
+        return extraction.extract_category(text)
     
     def analyze_publications(self, publications):
         """Analyze the extracted publications data"""
@@ -332,8 +710,9 @@ class ANGSPEScraper:
             "file_types": {},
             "publications_by_year": {},
             "average_file_size": None,
-            "latest_publication": None,
-            "publications_list": publications
+            "latest_publication_id": None,
+            # Publications are stored once, at the top level; the analysis refers to them by ID
+            "publication_ids": [pub.get('id') or self.publication_id(pub) for pub in publications]
         }
         
         # Count categories
@@ -345,93 +724,216 @@ class ANGSPEScraper:
         analysis["file_types"] = dict(Counter(file_types))
         
         # Analyze dates if available
-        years = []
-        for pub in publications:
-            date_str = pub.get('date_posted')
-            if date_str:
-                try:
-                    if isinstance(date_str, str) and '/' in date_str:
-                        year = date_str.split('/')[-1]
-                        years.append(int(year))
-                except:
-                    continue
-        
+        years = [year for year in map(self._publication_year, publications) if year is not None]
         if years:
             analysis["publications_by_year"] = dict(Counter(years))
-            
-            # Find latest publication
-            latest_year = max(years)
-            for pub in publications:
-                date_str = pub.get('date_posted', '')
-                if str(latest_year) in date_str:
-                    analysis["latest_publication"] = pub
-                    break
-        
-        # Analyze file sizes
-        sizes = []
-        for pub in publications:
-            size_str = pub.get('file_size')
-            if size_str:
-                try:
-                    # Convert to MB for comparison
-                    if 'Mo' in size_str or 'MB' in size_str:
-                        size_num = float(re.search(r'(\d+(?:\.\d+)?)', size_str).group(1))
-                        sizes.append(size_num)
-                    elif 'ko' in size_str or 'KB' in size_str:
-                        size_num = float(re.search(r'(\d+(?:\.\d+)?)', size_str).group(1))
-                        sizes.append(size_num / 1024)  # Convert KB to MB
-                except:
-                    continue
+            analysis["latest_publication_id"] = self._latest_publication_id(publications, max(years))
         
-        if sizes:
-            analysis["average_file_size"] = f"{sum(sizes)/len(sizes):.2f} MB"
+        analysis["average_file_size"] = self._average_file_size(publications)
         
         return analysis
     
+    def _publication_year(self, pub):
+        """Year of a publication's DD/MM/YYYY date, or None"""
+        return publication_year(pub)
+    
+    def _latest_publication_id(self, publications, latest_year):
+        """ID of the first publication dated in latest_year"""
+        for pub in publications:
+            if str(latest_year) in (pub.get('date_posted') or ''):
+                return pub.get('id') or self.publication_id(pub)
+        return None
+    
+    def _size_in_mb(self, size_str):
+        """File size string ("6.92 Mo", "1755 ko") in MB, or None"""
+        return extraction.size_in_mb(size_str)
+    
+    def _average_file_size(self, publications):
+        sizes = [size for size in (self._size_in_mb(pub.get('file_size')) for pub in publications) if size is not None]
+        if sizes:
+            return f"{sum(sizes)/len(sizes):.2f} MB"
+        return None
+    
+    def diff_publications(self, previous, publications):
+        """Compare two snapshots by stable publication ID
+        
+        Returns a change set with the added and removed publications, the
+        (old, new) pairs whose other fields differ, and whether the order of
+        otherwise identical snapshots changed.
+        """
+        def fields(pub):
+            return {key: value for key, value in pub.items() if key != 'id'}
+        
+        old_by_id = {pub.get('id') or self.publication_id(pub): pub for pub in previous}
+        new_by_id = {pub.get('id') or self.publication_id(pub): pub for pub in publications}
+        added = [pub for pub_id, pub in new_by_id.items() if pub_id not in old_by_id]
+        removed = [pub for pub_id, pub in old_by_id.items() if pub_id not in new_by_id]
+        changed = [(old_by_id[pub_id], pub) for pub_id, pub in new_by_id.items()
+                   if pub_id in old_by_id and fields(old_by_id[pub_id]) != fields(pub)]
+        return {
+            'added': added,
+            'removed': removed,
+            'changed': changed,
+            'reordered': not (added or removed) and list(old_by_id) != list(new_by_id)
+        }
+    
+    def has_changes(self, changes):
+        return bool(changes['added'] or changes['removed'] or changes['changed'] or changes['reordered'])
+    
+    def update_analysis(self, analysis, changes, publications):
+        """Apply a change set to the previous analysis, recomputing only the aggregates it affects
+        
+        Counters are adjusted by the outgoing (removed, old side of changed)
+        and incoming (added, new side of changed) publications. Returns None
+        when the previous analysis can't be updated in place (legacy format,
+        error result), so the caller falls back to analyze_publications.
+        """
+        if not analysis or 'publication_ids' not in analysis or 'error' in analysis:
+            return None
+        
+        outgoing = changes['removed'] + [old for old, new in changes['changed']]
+        incoming = changes['added'] + [new for old, new in changes['changed']]
+        updated = dict(analysis)
+        
+        def adjust(counts, key_of):
+            counter = Counter(counts)
+            counter.subtract(key_of(pub) for pub in outgoing)
+            counter.update(key_of(pub) for pub in incoming)
+            return {key: count for key, count in counter.items() if count > 0}
+        
+        updated['total_publications'] = len(publications)
+        updated['publication_ids'] = [pub.get('id') or self.publication_id(pub) for pub in publications]
+        updated['categories'] = adjust(analysis.get('categories', {}), lambda pub: pub.get('category', 'Non classé'))
+        updated['file_types'] = adjust(analysis.get('file_types', {}), lambda pub: pub.get('file_type', 'Unknown'))
+        
+        # Year keys come back from JSON as strings
+        previous_years = {int(year): count for year, count in (analysis.get('publications_by_year') or {}).items()}
+        by_year = Counter(previous_years)
+        by_year.subtract(year for year in map(self._publication_year, outgoing) if year is not None)
+        by_year.update(year for year in map(self._publication_year, incoming) if year is not None)
+        updated['publications_by_year'] = {year: count for year, count in by_year.items() if count > 0}
+        
+        # The first publication of the latest year depends on the order of the whole listing,
+        # which a change set doesn't capture (e.g. a swap next to an addition): one pass finds it
+        years = updated['publications_by_year']
+        updated['latest_publication_id'] = self._latest_publication_id(publications, max(years)) if years else None
+        
+        touched = outgoing + incoming
+        if any(pub.get('file_size') for pub in touched):
+            updated['average_file_size'] = self._average_file_size(publications)
+        
+        return updated
+    
+    def change_log_entry(self, changes):
+        """Compact, JSON-serializable record of a change set"""
+        def summary(pub):
+            return {'id': pub.get('id') or self.publication_id(pub), 'title': pub.get('title')}
+        
+        changed = []
+        for old, new in changes['changed']:
+            fields = {key: [old.get(key), new.get(key)]
+                      for key in sorted(set(old) | set(new) - {'id'}) if old.get(key) != new.get(key)}
+            changed.append({**summary(new), 'fields': fields})
+        
+        return {
+            'recorded_at': datetime.now().isoformat(),
+            'added': [summary(pub) for pub in changes['added']],
+            'removed': [summary(pub) for pub in changes['removed']],
+            'changed': changed,
+            'reordered': changes['reordered']
+        }
+    
+    def append_change_log(self, entry):
+        """Append one change set to data/changelog.jsonl"""
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.change_log_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+    
     def save_results(self, publications, analysis, format='json'):
         """Save results to file"""
         current_year = datetime.now().year
         
         # Ensure data directory exists
-        data_dir = Path("data")
-        data_dir.mkdir(exist_ok=True)
+        data_dir = self.data_dir
+        data_dir.mkdir(parents=True, exist_ok=True)
         
         if format == 'json':
             # Save raw data with current year in filename
             filename = data_dir / f'angspe_publications_{current_year}.json'
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'publications': publications,
-                    'analysis': analysis,
-                    'scraped_at': datetime.now().isoformat(),
-                    'source_url': self.target_url,
-                    'total_unique_publications': len(publications)
-                }, f, ensure_ascii=False, indent=2)
+            document = {
+                'publications': publications,
+                'analysis': analysis,
+                'scraped_at': datetime.now().isoformat(),
+                'source_url': self.target_url,
+                'total_unique_publications': len(publications),
+                'generation': self.read_generation() + 1
+            }
+            atomic_write_json(filename, document)
+            self.last_saved_files['publications'] = filename.name
+            # Kept so in-process callers can publish the run without re-reading the file
+            self.last_saved_document = document
             print(f"✅ Publications saved to: {filename}")
             
             # Save analysis summary
             analysis_filename = data_dir / f'angspe_analysis_{current_year}.json'
-            with open(analysis_filename, 'w', encoding='utf-8') as f:
-                json.dump(analysis, f, ensure_ascii=False, indent=2)
+            atomic_write_json(analysis_filename, analysis)
+            self.last_saved_files['analysis'] = analysis_filename.name
             print(f"✅ Analysis saved to: {analysis_filename}")
         
         elif format == 'csv':
             if publications:
                 import csv
                 csv_filename = data_dir / f'angspe_publications_{current_year}.csv'
-                with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
+                with atomic_write(csv_filename, newline='') as csvfile:
                     if publications:
                         fieldnames = publications[0].keys()
                         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                         writer.writeheader()
                         writer.writerows(publications)
+                self.last_saved_files['csv'] = csv_filename.name
                 print(f"✅ CSV saved to: {csv_filename}")
     
+    def saved_bytes(self):
+        """Total size of the files save_results wrote in this run"""
+        total = 0
+        for name in self.last_saved_files.values():
+            try:
+                total += (self.data_dir / name).stat().st_size
+            except OSError:
+                pass
+        return total
+    
+    def read_generation(self):
+        """Current data generation number from data/generation.json (0 if never written)"""
+        try:
+            with open(self.data_dir / 'generation.json', 'r', encoding='utf-8') as f:
+                return int(json.load(f).get('generation', 0))
+        except (OSError, ValueError):
+            return 0
+    
+    def commit_generation(self):
+        """Bump the generation counter once every output file of a run has been replaced"""
+        generation = self.read_generation() + 1
+        atomic_write_json(self.data_dir / 'generation.json', {
+            'generation': generation,
+            'updated_at': datetime.now().isoformat(),
+            # The API resolves the "current" files from here instead of guessing the year
+            'files': dict(self.last_saved_files)
+        })
+        return generation
+    
     def generate_standalone_viewer(self, publications, analysis):
         """Generate standalone HTML viewer that works with file:// protocol"""
         try:
             import subprocess
             
+            # Don't pay for a Python subprocess when the generator isn't deployed
+            if not os.path.exists('generate_standalone.py'):
+                print("⚠️ Standalone viewer generator not found, skipping...")
+                return
+            
             # Use the external generator script which works properly
             result = subprocess.run(['python3', 'generate_standalone.py'], 
                                   capture_output=True, text=True)
@@ -460,13 +962,47 @@ class ANGSPEScraper:
         except Exception as e:
             print(f"⚠️ Warning: Could not generate dynamic viewer: {e}")
     
+    def snapshot_files(self):
+        """Yearly publication snapshots in the data directory as {year: path}"""
+        snapshots = {}
+        for path in self.data_dir.glob('angspe_publications_*.json'):
+            year = path.stem.rsplit('_', 1)[-1]
+            if year.isdigit():
+                snapshots[int(year)] = path
+        return dict(sorted(snapshots.items()))
+    
+    def latest_snapshot_file(self):
+        """The most recent snapshot, which stays "current" across a change of year (None if none)"""
+        snapshots = self.snapshot_files()
+        return snapshots[max(snapshots)] if snapshots else None
+    
+    def bootstrap_history(self):
+        """Seed an empty history from the yearly snapshots already on disk, oldest first
+        
+        Must run before a new snapshot is saved, or that run would be imported twice.
+        """
+        if self.history.exists():
+            return
+        previous = []
+        for year, path in self.snapshot_files().items():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                publications = data.get('publications', [])
+                seen_at = data.get('scraped_at') or datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+                self.history.record_run(self.diff_publications(previous, publications), seen_at)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Warning: Could not import {path.name} into history: {e}")
+                continue
+            previous = publications
+            print(f"🗂️ Imported {path.name} into publication history")
+    
     def get_existing_publications_count(self):
         """Get count of existing publications from local data file"""
         try:
-            current_year = datetime.now().year
-            filename = Path("data") / f'angspe_publications_{current_year}.json'
+            filename = self.latest_snapshot_file()
             
-            if not filename.exists():
+            if filename is None:
                 return 0
                 
             with open(filename, 'r', encoding='utf-8') as f:
@@ -477,13 +1013,27 @@ class ANGSPEScraper:
             print(f"⚠️ Warning: Could not read existing data: {e}")
             return 0
     
+    def get_existing_data(self):
+        """Get the full existing data document (publications and analysis)"""
+        try:
+            filename = self.latest_snapshot_file()
+            
+            if filename is None:
+                return {}
+                
+            with open(filename, 'r', encoding='utf-8') as f:
+                return json.load(f)
+                
+        except Exception as e:
+            print(f"⚠️ Warning: Could not read existing data: {e}")
+            return {}
+    
     def get_existing_publications(self):
         """Get existing publications from local data file for comparison"""
         try:
-            current_year = datetime.now().year
-            filename = Path("data") / f'angspe_publications_{current_year}.json'
+            filename = self.latest_snapshot_file()
             
-            if not filename.exists():
+            if filename is None:
                 return []
                 
             with open(filename, 'r', encoding='utf-8') as f:
@@ -494,8 +1044,142 @@ class ANGSPEScraper:
             print(f"⚠️ Warning: Could not read existing publications: {e}")
             return []
 
-    def run_full_scrape(self):
-        """Run the complete scraping and analysis process"""
+    def acquire_run_lock(self):
+        """Take the data directory's scrape lock so overlapping runs (API, cron) never write together"""
+        self.run_lock_busy = False
+        try:
+            import fcntl
+        except ImportError:
+            return True  # No advisory locks on this platform
+        
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        handle = open(self.data_dir / '.scrape.lock', 'w')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            self.run_lock_busy = True
+            return False
+        self._run_lock = handle
+        return True
+    
+    def release_run_lock(self):
+        handle = getattr(self, '_run_lock', None)
+        if handle is not None:
+            handle.close()  # Closing the file releases the flock
+            self._run_lock = None
+    
+    def run_full_scrape(self, force=False, incremental=False, download=False, report=False):
+        """Run the complete scraping and analysis process
+        
+        Unless force is True, the page is fetched conditionally and an
+        unchanged page (304) returns the existing data without rewriting files.
+        With incremental=True the parsed publications are diffed against the
+        saved snapshot: only the affected aggregates are recomputed and the
+        output files are left alone when nothing changed.
+        With download=True every document is fetched into the document cache
+        after parsing.
+        Every run writes data/run_report.json (see run_report.py); with
+        report=True it is also returned: (publications, analysis, run_report).
+        Returns (None, None) without doing anything if another scrape holds the lock.
+        """
+        if not self.acquire_run_lock():
+            print("⏳ Another scrape is already running - skipping this run")
+            return (None, None, None) if report else (None, None)
+        self.session.start_run()
+        self.run_report = RunReport()
+        publications = analysis = None
+        outcome = 'error'
+        try:
+            publications, analysis = self._run_full_scrape(force, incremental, download)
+            self.finish_snapshot(publications)
+            outcome = self.run_outcome(analysis)
+        finally:
+            self.print_transport_summary()
+            self.finish_run_report(outcome, publications)
+            self.release_run_lock()
+        if report:
+            return publications, analysis, self.last_run_report
+        return publications, analysis
+    
+    def run_outcome(self, analysis):
+        if self.page_not_modified:
+            return 'not_modified'
+        return 'success' if analysis else 'failed'
+    
+    def finish_run_report(self, outcome, publications):
+        """Close the run report, write it to data/run_report.json and print one line per stage"""
+        run_report = self.run_report.to_dict(
+            outcome,
+            publications=len(publications) if publications is not None else None,
+            transport=self.last_transport
+        )
+        self.run_report = None
+        self.last_run_report = run_report
+        try:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            atomic_write_json(self.run_report_file, run_report)
+        except OSError as e:
+            print(f"⚠️ Warning: Could not write run report: {e}")
+        stages = ', '.join(
+            f"{stage} {entry['wall_seconds']:.2f}s" for stage, entry in run_report['stages'].items()
+            if entry['wall_seconds'] is not None
+        )
+        print(f"⏱️ Run {outcome} in {run_report['wall_seconds']:.2f}s (cpu {run_report['cpu_seconds']:.2f}s)"
+              + (f": {stages}" if stages else ''))
+        return run_report
+    
+    def record_snapshots(self, directory):
+        """Archive every response of the following runs under directory (see snapshots.py)"""
+        self.session.recorder = SnapshotArchive(directory)
+        return self.session.recorder
+    
+    def replay_snapshots(self, directory):
+        """Serve every request from the archive recorded under directory, without network access"""
+        headers = self.session.headers
+        self.session = ReplaySession(SnapshotArchive(directory))
+        self.session.headers.update(headers)
+        self.crawl_min_interval = 0  # Nothing to be polite to
+        return self.session.archive
+    
+    def finish_snapshot(self, publications):
+        """Save the recorded archive, or check a replayed run against the recorded one"""
+        if self.session.recorder is not None:
+            self.session.recorder.save()
+            # No publications (page not modified, or the run failed): nothing to compare a replay with
+            if publications is not None:
+                self.session.recorder.save_result(publications)
+            print(f"📼 Recorded {len(self.session.recorder.index)} responses to {self.session.recorder.directory}")
+        elif isinstance(self.session, ReplaySession):
+            matches = self.session.archive.check_result(publications)
+            if matches is None:
+                print("📼 Replayed run (no recorded result to compare with)")
+            elif matches:
+                print("✅ Replayed run matches the recorded publications")
+            else:
+                print("❌ Replayed run differs from the recorded publications")
+    
+    def print_transport_summary(self):
+        """One line of HTTP totals for the run, plus the slowest request broken down by phase"""
+        summary = self.last_transport = self.session.summary()
+        if not summary['requests']:
+            return
+        phases = summary['phases']
+        versions = ', '.join(f"{version} x{count}" for version, count in summary['http_versions'].items())
+        print(f"📶 HTTP: {summary['requests']} requests ({versions or 'no response'}; "
+              f"{summary['retries']} retries, {summary['failures']} failed); "
+              f"dns {phases['dns']:.2f}s, connect {phases['connect']:.2f}s, "
+              f"ttfb {phases['ttfb']:.2f}s, transfer {phases['transfer']:.2f}s")
+        if summary['decoded_bytes']:
+            saved = 1 - summary['wire_bytes'] / summary['decoded_bytes']
+            print(f"   📦 {summary['wire_bytes'] / 1024:.0f} KiB on the wire for {summary['decoded_bytes'] / 1024:.0f} KiB "
+                  f"decoded ({saved:.0%} saved by compression)")
+        slowest = summary['slowest'][0]
+        print(f"   🐢 Slowest: {slowest['url']} {slowest['total']:.2f}s (dns {slowest['dns']:.2f}s, "
+              f"connect {slowest['connect']:.2f}s, ttfb {slowest['ttfb']:.2f}s, "
+              f"transfer {slowest['transfer'] or 0:.2f}s)")
+    
+    def _run_full_scrape(self, force, incremental=False, download=False):
         print("🚀 Starting ANGSPE Publications Scraper...")
         print(f"📡 Fetching page: {self.target_url}")
         print(f"🕒 Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -505,8 +1189,13 @@ class ANGSPEScraper:
         if existing_count > 0:
             print(f"📋 Found {existing_count} existing publications in local data")
         
-        # Fetch HTML
-        html_content = self.fetch_page_html()
+        # Fetch HTML (conditional only when there is existing data to fall back on)
+        self.report_progress('fetch', 'running')
+        html_content = self.fetch_page_html(conditional=not force and existing_count > 0)
+        if self.page_not_modified:
+            self.report_progress('fetch', 'done')
+            return self.not_modified_result()
+        
         if not html_content:
             print("❌ Failed to fetch page content")
             return None, None
@@ -517,41 +1206,117 @@ class ANGSPEScraper:
         # Parse publications
         print("🔍 Parsing publications...")
         print("🔄 Checking for duplicates by URL and title...")
-        publications = self.parse_publications(html_content)
+        publications = self.crawl_publications(html_content)
+        if download:
+            self.download_documents(publications)
+        publications = self.dedupe_publications(publications)
         
-        if len(publications) == existing_count:
-            print(f"📋 No new publications found - all {len(publications)} publications already scraped")
-            print("✅ Data is up to date, no changes needed")
-        else:
-            print(f"📚 Found {len(publications)} unique publications (duplicates removed)")
-            if existing_count > 0:
-                new_count = len(publications) - existing_count
-                if new_count > 0:
-                    print(f"🆕 {new_count} new publications detected")
-                elif new_count < 0:
-                    print(f"⚠️ {abs(new_count)} publications may have been removed from source")
+        return self.finish_scrape(publications, existing_count, incremental)
+    
+    def record_history(self, changes):
+        """Append this run to the publication history (a failure here never fails the scrape)"""
+        try:
+            self.history.record_run(changes)
+        except Exception as e:
+            print(f"⚠️ Warning: Could not update publication history: {e}")
+    
+    def sync_publication_index(self, publications, scraped_at):
+        """Upsert the run into the SQLite index (a failure here never fails the scrape)"""
+        try:
+            count = self.publication_index.sync(
+                [pub if pub.get('id') else {**pub, 'id': self.publication_id(pub)} for pub in publications],
+                seen_at=scraped_at,
+                source=scraped_at
+            )
+            print(f"✅ Indexed {count} publications in: {self.publication_index.path}")
+        except Exception as e:
+            print(f"⚠️ Warning: Could not update publication index: {e}")
+    
+    def not_modified_result(self):
+        """Result of a run whose listing page answered 304: the existing data, untouched"""
+        existing_data = self.get_existing_data()
+        # Still listed, so still seen
+        self.bootstrap_history()
+        self.record_history({'added': [], 'removed': [], 'changed': []})
+        print("📋 Page not modified since last run (304) - skipping parse, analysis and save")
+        print(f"🏁 Scraping completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print("=" * 60)
+        return existing_data.get('publications', []), existing_data.get('analysis')
+    
+    def finish_scrape(self, publications, existing_count, incremental=False):
+        """Compare, analyze, save and generate viewers for freshly parsed publications"""
+        existing_data = self.get_existing_data() if existing_count > 0 else {}
+        changes = self.diff_publications(existing_data.get('publications', []), publications)
+        self.last_changes = changes
+        self.last_saved_files = {}
+        self.bootstrap_history()
+        
+        print(f"📚 Found {len(publications)} unique publications (duplicates removed)")
+        if existing_count > 0:
+            if not self.has_changes(changes):
+                print(f"📋 No new publications found - all {len(publications)} publications already scraped")
+                print("✅ Data is up to date, no changes needed")
+            else:
+                print(f"🔄 Changes since last run: {len(changes['added'])} added, "
+                      f"{len(changes['removed'])} removed, {len(changes['changed'])} changed")
+                for pub in changes['added']:
+                    print(f"   🆕 {pub.get('title')}")
+                for pub in changes['removed']:
+                    print(f"   ⚠️ Removed from source: {pub.get('title')}")
+                for old, new in changes['changed']:
+                    print(f"   ✏️ Updated: {new.get('title')}")
+        
+        if incremental and existing_count > 0 and not self.has_changes(changes):
+            # Nothing to recompute or rewrite; only remember the new validators
+            self.report_progress('analyze', 'skipped')
+            self.report_progress('save', 'running')
+            self.record_history(changes)
+            if not self.publication_index.is_synced(existing_data.get('scraped_at')):
+                self.sync_publication_index(existing_data.get('publications', []), existing_data.get('scraped_at'))
+            self.save_validators()
+            self.report_progress('save', 'done')
+            print(f"🏁 Scraping completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            print("=" * 60)
+            return existing_data.get('publications', []), existing_data.get('analysis')
         
         # Analyze data
         print("📊 Analyzing publications data...")
-        analysis = self.analyze_publications(publications)
+        self.report_progress('analyze', 'running')
+        analysis = None
+        if incremental and existing_count > 0:
+            analysis = self.update_analysis(existing_data.get('analysis'), changes, publications)
+        if analysis is None:
+            analysis = self.analyze_publications(publications)
+        self.report_progress('analyze', 'done', items_in=len(publications))
         
         # Save results
+        self.report_progress('save', 'running')
         self.save_results(publications, analysis, 'json')
         self.save_results(publications, analysis, 'csv')
+        if existing_count > 0 and self.has_changes(changes):
+            self.append_change_log(self.change_log_entry(changes))
+        self.record_history(changes)
+        self.sync_publication_index(publications, self.last_saved_document['scraped_at'])
+        self.commit_generation()
+        self.save_validators()
+        self.report_progress('save', 'done', items_in=len(publications), bytes_out=self.saved_bytes())
         
+        self.report_progress('viewers', 'running')
         # Generate standalone HTML viewer
         self.generate_standalone_viewer(publications, analysis)
         
         # Generate dynamic viewer
         self.generate_dynamic_viewer()
+        self.report_progress('viewers', 'done')
         
         print(f"🏁 Scraping completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 60)
         
         return publications, analysis
     
-    def print_analysis_summary(self, analysis):
+    def print_analysis_summary(self, analysis, publications=None):
         """Print a formatted analysis summary"""
+        analysis = expand_analysis(analysis, publications or [])
         print("\n" + "="*60)
         print("📊 ANGSPE PUBLICATIONS ANALYSIS SUMMARY")
         print("="*60)
@@ -576,7 +1341,7 @@ class ANGSPEScraper:
         if analysis['average_file_size']:
             print(f"\n💾 Average File Size: {analysis['average_file_size']}")
         
-        if analysis['latest_publication']:
+        if analysis.get('latest_publication'):
             print(f"\n🆕 Latest Publication:")
             latest = analysis['latest_publication']
             print(f"   • Title: {latest.get('title', 'N/A')}")
@@ -584,7 +1349,7 @@ class ANGSPEScraper:
             print(f"   • Size: {latest.get('file_size', 'N/A')}")
         
         print("\n📋 All Publications:")
-        for i, pub in enumerate(analysis['publications_list'], 1):
+        for i, pub in enumerate(analysis.get('publications_list', []), 1):
             print(f"\n{i}. {pub.get('title', 'Untitled')}")
             print(f"   📅 Date: {pub.get('date_posted', 'N/A')}")
             print(f"   📂 Category: {pub.get('category', 'N/A')}")
@@ -592,14 +1357,66 @@ class ANGSPEScraper:
             print(f"   🔗 URL: {pub.get('download_url', 'N/A')}")
 
 
+def fuzzy_title_threshold(argv, default=DEFAULT_THRESHOLD):
+    """Threshold given by --fuzzy-titles[=value] in argv, or None if the flag is absent"""
+    for arg in argv:
+        if arg == '--fuzzy-titles':
+            return default
+        if arg.startswith('--fuzzy-titles='):
+            return threshold_setting(arg.split('=', 1)[1], '--fuzzy-titles', default)
+    return None
+
+
+def threshold_setting(value, source, default=DEFAULT_THRESHOLD):
+    """Near-duplicate threshold from a setting's value; an invalid one warns and falls back to default"""
+    threshold = parse_threshold(value)
+    if threshold is None:
+        print(f"⚠️ Invalid {source} value {value!r} (expected a number in (0, 1]), using {default}")
+        return default
+    return threshold
+
+
+def argv_value(argv, name):
+    """Value of a --name=value option in argv, or None"""
+    for arg in argv:
+        if arg.startswith(f'{name}='):
+            return arg.split('=', 1)[1]
+    return None
+
+
 def main():
-    scraper = ANGSPEScraper()
-    publications, analysis = scraper.run_full_scrape()
+    import sys
+    import tempfile
+    # --record=DIR archives every response under DIR; --replay=DIR runs offline from that archive.
+    # Both start from an empty temporary data directory so runs are reproducible and data/ is untouched
+    record = argv_value(sys.argv, '--record')
+    replay = argv_value(sys.argv, '--replay')
+    data_dir = tempfile.mkdtemp(prefix='angspe-snapshot-') if record or replay else "data"
+    # --http2 fetches over HTTP/2 (needs the h2 package)
+    scraper = ANGSPEScraper(data_dir=data_dir, http2='--http2' in sys.argv)
+    if record:
+        scraper.record_snapshots(record)
+    if replay:
+        scraper.replay_snapshots(replay)
+    # --force skips the conditional GET and always re-parses the page
+    # --incremental leaves the outputs alone unless publications changed
+    # --download fetches the documents into data/documents/
+    # --content-dedup also drops publications whose documents are identical
+    # --fuzzy-titles[=0.5] also drops publications whose titles are near-duplicates (Jaccard threshold)
+    scraper.content_dedup = '--content-dedup' in sys.argv
+    scraper.fuzzy_title_threshold = fuzzy_title_threshold(sys.argv)
+    publications, analysis = scraper.run_full_scrape(
+        force='--force' in sys.argv,
+        incremental='--incremental' in sys.argv,
+        download='--download' in sys.argv
+    )
     
     if analysis:
-        scraper.print_analysis_summary(analysis)
+        scraper.print_analysis_summary(analysis, publications)
     else:
         print("❌ Scraping failed")
+    if record or replay:
+        print(f"💾 Outputs written to {data_dir}")
 
 if __name__ == "__main__":
     main()
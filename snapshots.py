@@ -0,0 +1,188 @@
+"""
+Record/replay archive of the scraper's HTTP traffic
+In record mode every response the scraper receives is stored under a
+snapshot directory: bodies gzip-compressed and content-addressed by their
+SHA-256 (objects/<sha[:2]>/<sha>.gz), status and headers in index.json keyed
+by request. In replay mode ReplaySession answers every request from that
+archive without touching the network, so parsing and analysis can be
+benchmarked and regression-tested offline and deterministically.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from atomic_io import atomic_write, atomic_write_json
+from documents import HashingWriter
+from transport import ResilientSession
+
+# Describe the body as received on the wire; the archive stores it decoded
+_WIRE_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive'}
+
+
+class SnapshotMiss(requests.RequestException):
+    """The replayed archive has no response for this request"""
+
+
+def request_key(method, url, headers=None):
+    """Archive key of a request: method, URL and byte range (the only header that changes the body)"""
+    byte_range = (headers or {}).get('Range')
+    return f"{method.upper()} {url}" + (f" [{byte_range}]" if byte_range else '')
+
+
+class SnapshotArchive:
+    """Directory of recorded responses (see module docstring)"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.index_file = self.directory / 'index.json'
+        self.result_file = self.directory / 'result.json'
+        self._index = None
+        self._lock = threading.Lock()
+
+    @property
+    def index(self):
+        """{request key: {status, headers, sha256, size, recorded_at}} (loaded on first use)"""
+        if self._index is None:
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _object_path(self, sha256):
+        return self.directory / 'objects' / sha256[:2] / f'{sha256}.gz'
+
+    def store(self, method, url, request_headers, response, stream=False):
+        """Archive a response and return it for the caller to use
+
+        A streamed body is archived while the caller reads it, never held in
+        memory: iter_content is wrapped to hash and gzip each chunk into a
+        temporary object file, indexed once the body has been read to its
+        end. A streamed body the caller stops reading early isn't archived,
+        so replaying that request raises SnapshotMiss.
+        """
+        key = request_key(method, url, request_headers)
+        if response.status_code == 304 and key in self.index:
+            # Keep the full response: replay answers conditional requests from it
+            return response
+        if stream and method.upper() != 'HEAD' and response.status_code not in (204, 304):
+            self._archive_stream(key, response)
+            return response
+        body = response.content
+        sha256 = hashlib.sha256(body).hexdigest()
+        path = self._object_path(sha256)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_write(path, 'wb') as f:
+                f.write(gzip.compress(body, mtime=0))
+        self._add_entry(key, response, sha256, len(body))
+        return response
+
+    def _archive_stream(self, key, response):
+        """Tee response.iter_content through a HashingWriter over a gzip temporary file"""
+        iter_content = response.iter_content
+
+        def archiving_iter_content(*args, **kwargs):
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.object.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as compressed:
+                    writer = HashingWriter(compressed, tmp_path)
+                    for chunk in iter_content(*args, **kwargs):
+                        writer.write(chunk)
+                        yield chunk
+                sha256 = writer.sha256.hexdigest()
+                path = self._object_path(sha256)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, path)
+                self._add_entry(key, response, sha256, writer.size)
+            finally:
+                # Still there unless the body was read to its end
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+
+        response.iter_content = archiving_iter_content
+
+    def _add_entry(self, key, response, sha256, size):
+        entry = {
+            'status': response.status_code,
+            'headers': {name: value for name, value in response.headers.items() if name.lower() not in _WIRE_HEADERS},
+            'sha256': sha256,
+            'size': size,
+            'recorded_at': datetime.now().isoformat()
+        }
+        with self._lock:
+            self.index[key] = entry
+
+    def save(self):
+        with self._lock:
+            atomic_write_json(self.index_file, self.index)
+
+    def body(self, entry):
+        with open(self._object_path(entry['sha256']), 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def response(self, method, url, request_headers=None):
+        """requests.Response rebuilt from the archive, answering conditional requests with a 304"""
+        entry = self.index.get(request_key(method, url, request_headers))
+        if entry is None:
+            raise SnapshotMiss(f"No recorded response for {request_key(method, url, request_headers)}")
+        headers = CaseInsensitiveDict(entry['headers'])
+        request_headers = request_headers or {}
+        not_modified = (
+            (request_headers.get('If-None-Match') and request_headers['If-None-Match'] == headers.get('ETag'))
+            or (request_headers.get('If-Modified-Since')
+                and request_headers['If-Modified-Since'] == headers.get('Last-Modified'))
+        )
+        response = requests.Response()
+        response.url = url
+        response.status_code = 304 if not_modified and entry['status'] == 200 else entry['status']
+        response._content = b'' if response.status_code == 304 else self.body(entry)
+        response._content_consumed = True
+        headers['Content-Length'] = str(len(response._content))
+        response.headers = headers
+        response.encoding = get_encoding_from_headers(headers)
+        response.reason = 'Not Modified' if response.status_code == 304 else ''
+        return response
+
+    def save_result(self, publications):
+        """Record what the scrape produced, for check_result on replay"""
+        atomic_write_json(self.result_file, result_fingerprint(publications))
+
+    def check_result(self, publications):
+        """True/False if publications match the recorded run's, None if none was recorded"""
+        try:
+            with open(self.result_file, 'r', encoding='utf-8') as f:
+                expected = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return expected == result_fingerprint(publications)
+
+
+def result_fingerprint(publications):
+    """Count and SHA-256 of the publications (order and content), for comparing runs"""
+    canonical = json.dumps(publications or [], sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return {'publications': len(publications or []), 'sha256': hashlib.sha256(canonical).hexdigest()}
+
+
+class ReplaySession(ResilientSession):
+    """Session that serves every request from a SnapshotArchive; unknown requests raise SnapshotMiss"""
+
+    def __init__(self, archive, **kwargs):
+        kwargs.setdefault('max_attempts', 1)
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def request_once(self, method, url, headers=None, **kwargs):
+        return self.archive.response(method, url, headers)
@@ -104,6 +104,12 @@ function updatePublicationsTable(publications) {
     if (!tbody) return;
     
     tbody.innerHTML = '';
+    appendPublicationRows(publications);
+}
+
+function appendPublicationRows(publications) {
+    const tbody = document.getElementById('publications-tbody');
+    if (!tbody) return;
     
     publications.forEach(pub => {
         const row = document.createElement('tr');
@@ -267,20 +273,65 @@ document.addEventListener('click', function(e) {
     }
 });
 
-function filterByCategory(category) {
-    const rows = document.querySelectorAll('#publications-tbody tr');
+async function filterByCategory(category) {
+    if (category === 'All') {
+        loadPublicationsTable();
+        return;
+    }
     
-    rows.forEach(row => {
-        const categoryCell = row.querySelector('td:nth-child(2)');
-        if (categoryCell) {
-            const rowCategory = categoryCell.textContent.trim();
-            if (category === 'All' || rowCategory === category) {
-                row.style.display = '';
-            } else {
-                row.style.display = 'none';
-            }
+    try {
+        // Filter on the server instead of hiding rows of the full list
+        await showPublicationPage({ category: category });
+    } catch (error) {
+        console.error('Error filtering publications:', error);
+    }
+}
+
+const PAGE_SIZE = 50;
+
+// Show one page of the paginated /api/publications query; the next page loads on demand
+async function showPublicationPage(filters, cursor) {
+    const params = new URLSearchParams({ ...filters, limit: PAGE_SIZE });
+    if (cursor) params.set('cursor', cursor);
+    
+    const response = await fetch(`/api/publications?${params}`);
+    if (!response.ok) {
+        throw new Error('Failed to load publications');
+    }
+    const page = await response.json();
+    
+    if (cursor) {
+        appendPublicationRows(page.items);
+    } else {
+        updatePublicationsTable(page.items);
+    }
+    if (page.next_cursor) {
+        showLoadMore(() => showPublicationPage(filters, page.next_cursor));
+    }
+}
+
+// Add a "Load more" row at the end of the table; it calls loadMore, which appends the next rows
+function showLoadMore(loadMore) {
+    const tbody = document.getElementById('publications-tbody');
+    if (!tbody) return;
+    
+    const row = document.createElement('tr');
+    row.className = 'load-more-row';
+    row.innerHTML = `
+        <td colspan="5" class="load-more">
+            <button class="btn btn-small"><i class="fas fa-chevron-down"></i> Load more</button>
+        </td>
+    `;
+    row.querySelector('button').addEventListener('click', async function() {
+        row.remove();
+        try {
+            await loadMore();
+        } catch (error) {
+            console.error('Error loading more publications:', error);
+            showLoadMore(loadMore);
         }
     });
+    tbody.appendChild(row);
 }
 
 // Add search functionality
@@ -303,20 +354,42 @@ function addSearchBar() {
     }
 }
 
+let searchTimer = null;
+
 function searchPublications(query) {
-    const rows = document.querySelectorAll('#publications-tbody tr');
-    const searchTerm = query.toLowerCase();
-    
-    rows.forEach(row => {
-        const title = row.querySelector('td:first-child').textContent.toLowerCase();
-        const category = row.querySelector('td:nth-child(2)').textContent.toLowerCase();
+    // Debounce keystrokes, then search on the server (accent-insensitive, prefix matching)
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(async function() {
+        if (!query.trim()) {
+            loadPublicationsTable();
+            return;
+        }
         
-        if (title.includes(searchTerm) || category.includes(searchTerm)) {
-            row.style.display = '';
-        } else {
-            row.style.display = 'none';
+        try {
+            await showSearchPage(query, 0);
+        } catch (error) {
+            console.error('Error searching publications:', error);
         }
-    });
+    }, 150);
+}
+
+// Show one page of search results; the next page loads on demand
+async function showSearchPage(query, offset) {
+    const params = new URLSearchParams({ q: query, limit: PAGE_SIZE, offset: offset });
+    const response = await fetch(`/api/search?${params}`);
+    if (!response.ok) {
+        throw new Error('Search failed');
+    }
+    const data = await response.json();
+    
+    if (offset) {
+        appendPublicationRows(data.results);
+    } else {
+        updatePublicationsTable(data.results);
+    }
+    if (data.next_offset !== null) {
+        showLoadMore(() => showSearchPage(query, data.next_offset));
+    }
 }
 
 function clearSearch() {
@@ -360,8 +433,8 @@ function setupRefreshButton() {
                         freshnessEl.title = 'Data refresh in progress';
                     }
                     
-                    // Poll for completion by checking status endpoint
-                    pollForCompletion();
+                    // Follow the refresh job until it completes
+                    waitForJob(result.job_id, result.disposition);
                     
                 } else {
                     showNotification(`Refresh failed: ${result.detail || result.message}`, 'error');
@@ -377,83 +450,105 @@ function setupRefreshButton() {
     }
 }
 
-// Poll for scraper completion
-async function pollForCompletion() {
-    const maxAttempts = 30; // 5 minutes with 10-second intervals
+// Follow a refresh job until completion (Server-Sent Events, falling back to polling the job)
+function waitForJob(jobId, disposition) {
+    if (!jobId || disposition === 'coalesced') {
+        finishRefresh({ state: 'success' });
+        return;
+    }
+    
+    if (window.EventSource) {
+        const source = new EventSource(`/api/jobs/${jobId}/events`);
+        
+        source.addEventListener('progress', function(e) {
+            showJobProgress(JSON.parse(e.data));
+        });
+        
+        source.addEventListener('done', function(e) {
+            source.close();
+            finishRefresh(JSON.parse(e.data));
+        });
+        
+        source.onerror = function() {
+            // Stream dropped (proxy timeout, server restart...): fall back to polling
+            source.close();
+            pollJob(jobId);
+        };
+    } else {
+        pollJob(jobId);
+    }
+}
+
+// Poll the job endpoint until the job reaches a terminal state
+async function pollJob(jobId) {
+    const maxAttempts = 60; // 5 minutes with 5-second intervals
     let attempts = 0;
     
     const poll = async () => {
         try {
-            const response = await fetch('/api/status');
+            const response = await fetch(`/api/jobs/${jobId}`);
             if (response.ok) {
-                const status = await response.json();
-                const lastScrape = status.last_scrape;
-                
-                // Check if the timestamp has been updated (indicating scraper completion)
-                if (lastScrape) {
-                    const scrapeDate = new Date(lastScrape);
-                    const now = new Date();
-                    const timeDiff = now - scrapeDate;
-                    
-                    // If the data is very recent (less than 2 minutes old), scraper likely completed
-                    if (timeDiff < 120000) { // 2 minutes
-                        // Scraper completed, update the display
-                        updateDataFreshness(lastScrape, status.data_freshness);
-                        
-                        // Reload all data
-                        loadDashboardData();
-                        loadPublicationsTable();
-                        
-                        // Update button state
-                        const refreshBtn = document.getElementById('refreshBtn');
-                        if (refreshBtn) {
-                            refreshBtn.innerHTML = '<i class="fas fa-check"></i> Refresh Complete';
-                            refreshBtn.classList.remove('loading');
-                            
-                            setTimeout(() => {
-                                refreshBtn.innerHTML = '<i class="fas fa-sync-alt"></i> Refresh Data';
-                            }, 3000);
-                        }
-                        
-                        showNotification('Data refresh completed successfully!', 'success');
-                        return; // Stop polling
-                    }
-                }
-            }
-            
-            attempts++;
-            if (attempts < maxAttempts) {
-                // Continue polling
-                setTimeout(poll, 10000); // Check every 10 seconds
-            } else {
-                // Timeout reached
-                const refreshBtn = document.getElementById('refreshBtn');
-                if (refreshBtn) {
-                    refreshBtn.innerHTML = '<i class="fas fa-exclamation-triangle"></i> Timeout';
-                    refreshBtn.classList.remove('loading');
-                    
-                    setTimeout(() => {
-                        refreshBtn.innerHTML = '<i class="fas fa-sync-alt"></i> Refresh Data';
-                    }, 3000);
+                const job = await response.json();
+                if (['success', 'not_modified', 'skipped', 'error'].includes(job.state)) {
+                    finishRefresh(job);
+                    return;
                 }
-                
-                showNotification('Refresh timeout - data may still be updating in background', 'info');
-                
-                // Reload data anyway to show any updates
-                loadDashboardData();
-                loadPublicationsTable();
+                showJobProgress(job);
             }
         } catch (error) {
-            console.error('Error polling for completion:', error);
-            attempts++;
-            if (attempts < maxAttempts) {
-                setTimeout(poll, 10000);
-            }
+            console.error('Error polling refresh job:', error);
+        }
+        
+        attempts++;
+        if (attempts < maxAttempts) {
+            setTimeout(poll, 5000);
+        } else {
+            finishRefresh({ state: 'timeout' });
         }
     };
     
-    // Start polling after a short delay
-    setTimeout(poll, 5000);
+    poll();
+}
+
+// Show the running stage of a refresh job on the button
+function showJobProgress(job) {
+    const refreshBtn = document.getElementById('refreshBtn');
+    if (!refreshBtn || !job.stages) return;
+    
+    const running = Object.entries(job.stages).find(([, stage]) => stage.state === 'running');
+    if (running) {
+        refreshBtn.innerHTML = `<i class="fas fa-spinner"></i> Refreshing (${running[0]})...`;
+    }
+}
+
+// Reload the data and reset the refresh button once a job is finished
+function finishRefresh(job) {
+    const refreshBtn = document.getElementById('refreshBtn');
+    const failed = job.state === 'error' || job.state === 'timeout';
+    
+    loadDashboardData();
+    loadPublicationsTable();
+    
+    if (refreshBtn) {
+        refreshBtn.innerHTML = failed
+            ? '<i class="fas fa-exclamation-triangle"></i> ' + (job.state === 'timeout' ? 'Timeout' : 'Refresh Failed')
+            : '<i class="fas fa-check"></i> Refresh Complete';
+        refreshBtn.classList.remove('loading');
+        
+        setTimeout(() => {
+            refreshBtn.innerHTML = '<i class="fas fa-sync-alt"></i> Refresh Data';
+        }, 3000);
+    }
+    
+    if (job.state === 'timeout') {
+        showNotification('Refresh timeout - data may still be updating in background', 'info');
+    } else if (failed) {
+        showNotification(`Refresh failed: ${job.error || 'scraper error'}`, 'error');
+    } else if (job.state === 'not_modified') {
+        showNotification('Data refresh completed - no changes on the source page', 'success');
+    } else {
+        showNotification('Data refresh completed successfully!', 'success');
+    }
 }
 
 // Show notification
@@ -0,0 +1,193 @@
+import contextlib
+import io
+import tempfile
+import threading
+import time
+import unittest
+from urllib.parse import urlparse
+
+from crawler import HostRateLimiter, PaginationCrawler
+from scraper import ANGSPEScraper
+from tests.stub_server import StubHandler, serve
+from transport import ResilientSession
+
+
+def publication(title, href):
+    return (f'<div class="publication-item"><h3>{title}</h3><p>Posté le 01/02/2024 2 Mo</p>'
+            f'<a href="{href}">Télécharger</a></div>')
+
+
+# Listing pages by path: page one links to the other three through the three kinds of
+# pagination link, and every page repeats a publication from another one
+PAGES = {
+    '/les-publications': (
+        publication('Rapport annuel 2023', '/uploads/annuel-2023.pdf')
+        + publication('Charte de gouvernance', '/uploads/charte.pdf')
+        + '<a href="/les-publications?page=2">2</a>'
+        + '<a href="/les-publications/page/3">3</a>'
+        + '<a rel="next" href="/suite">Suivant</a>'
+        + '<a href="/les-publications?page=1">1</a>'
+        + '<a href="/autre-rubrique?page=2">Autre</a>'
+        + '<a href="/uploads/page/4.pdf">PDF</a>'
+        + '<a href="https://ailleurs.example/les-publications?page=5">Ailleurs</a>'
+    ),
+    '/les-publications?page=2': (
+        publication('Rapport annuel 2022', '/uploads/annuel-2022.pdf')
+        # Same document as on page one
+        + publication('Rapport annuel 2023 (copie)', '/uploads/annuel-2023.pdf')
+        + '<a href="/les-publications">1</a><a href="/les-publications/page/3">3</a>'
+    ),
+    '/les-publications/page/3': (
+        publication('Note d\'orientation', '/uploads/note.pdf')
+        # Same title as on page one, other URL
+        + publication('Charte de gouvernance', '/uploads/charte-v2.pdf')
+    ),
+    '/suite': publication('Bilan 2021', '/uploads/bilan-2021.pdf'),
+}
+
+
+def listing_handler(pages, delay=0.0):
+    """Handler serving pages, recording (path, arrival time) and the peak number of concurrent requests"""
+    lock = threading.Lock()
+
+    class Handler(StubHandler):
+        requests = []
+        in_flight = 0
+        max_in_flight = 0
+
+        def do_GET(self):
+            cls = type(self)
+            with lock:
+                cls.requests.append((self.path, time.monotonic()))
+                cls.in_flight += 1
+                cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+            try:
+                time.sleep(delay)
+                body = pages.get(self.path)
+                if body is None:
+                    self.send_body('<html><body>Introuvable</body></html>', status=404)
+                else:
+                    self.send_body(f'<html><body>{body}</body></html>')
+            finally:
+                with lock:
+                    cls.in_flight -= 1
+
+    return Handler
+
+
+class PageDiscoveryTest(unittest.TestCase):
+
+    def test_discovers_next_numbered_and_path_pages_only(self):
+        crawler = PaginationCrawler(None, {'angspe.ma'})
+        pages = crawler.discover_pages(
+            f"<html><body>{PAGES['/les-publications']}</body></html>", 'https://angspe.ma/les-publications'
+        )
+        self.assertEqual(pages, [
+            'https://angspe.ma/les-publications?page=2',
+            'https://angspe.ma/les-publications/page/3',
+            'https://angspe.ma/suite',
+        ])
+
+    def test_link_back_to_page_one_is_not_a_page(self):
+        crawler = PaginationCrawler(None, {'angspe.ma'})
+        html = ('<a href="/les-publications?page=1">1</a><a href="/les-publications/page/1">1</a>'
+                '<a href="/les-publications?offset=0">0</a><a href="/les-publications?offset=20">20</a>')
+        self.assertEqual(crawler.discover_pages(html, 'https://angspe.ma/les-publications'),
+                         ['https://angspe.ma/les-publications?offset=20'])
+
+
+class CrawlTest(unittest.TestCase):
+
+    def crawl(self, handler, **kwargs):
+        with serve(handler) as base_url:
+            crawler = PaginationCrawler(ResilientSession(), {urlparse(base_url).netloc}, **kwargs)
+            first_url = f"{base_url}/les-publications"
+            with contextlib.redirect_stdout(io.StringIO()):
+                pages = crawler.crawl(first_url, f"<html><body>{PAGES['/les-publications']}</body></html>")
+        return base_url, pages
+
+    def test_fetches_every_page_in_discovery_order(self):
+        handler = listing_handler(PAGES)
+        base_url, pages = self.crawl(handler, min_interval=0)
+        self.assertEqual([url for url, _ in pages], [
+            f"{base_url}/les-publications",
+            f"{base_url}/les-publications?page=2",
+            f"{base_url}/les-publications/page/3",
+            f"{base_url}/suite",
+        ])
+        # Page three is linked from pages one and two but fetched once; page one isn't refetched
+        self.assertEqual(sorted(path for path, _ in handler.requests),
+                         ['/les-publications/page/3', '/les-publications?page=2', '/suite'])
+
+    def test_worker_pool_bounds_concurrent_requests(self):
+        pages = {'/les-publications': ''.join(f'<a href="/les-publications?page={n}">{n}</a>' for n in range(2, 10))}
+        pages.update({f'/les-publications?page={n}': publication(f'Rapport {n}', f'/uploads/{n}.pdf') for n in range(2, 10)})
+        handler = listing_handler(pages, delay=0.1)
+        with serve(handler) as base_url:
+            crawler = PaginationCrawler(ResilientSession(), {urlparse(base_url).netloc}, max_workers=3, min_interval=0)
+            with contextlib.redirect_stdout(io.StringIO()):
+                fetched = crawler.crawl(f"{base_url}/les-publications", f"<html><body>{pages['/les-publications']}</body></html>")
+        self.assertEqual(len(fetched), 9)
+        self.assertEqual(len(handler.requests), 8)
+        self.assertLessEqual(handler.max_in_flight, 3)
+        self.assertGreater(handler.max_in_flight, 1)
+
+    def test_max_pages_caps_the_crawl(self):
+        handler = listing_handler(PAGES)
+        _, pages = self.crawl(handler, min_interval=0, max_pages=2)
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(len(handler.requests), 1)
+
+    def test_per_host_minimum_interval(self):
+        handler = listing_handler(PAGES)
+        start = time.monotonic()
+        self.crawl(handler, max_workers=3, min_interval=0.15)
+        arrivals = sorted(arrival for _, arrival in handler.requests)
+        self.assertEqual(len(arrivals), 3)
+        # Requests may arrive late (thread start, connection setup) but never before their slot
+        for n, arrival in enumerate(arrivals):
+            self.assertGreaterEqual(arrival - start, n * 0.15)
+
+
+class HostRateLimiterTest(unittest.TestCase):
+
+    def test_slots_are_spaced_per_host(self):
+        limiter = HostRateLimiter(min_interval=1.0, per_host={'slow.example': 5.0})
+        self.assertEqual(limiter.reserve('https://a.example/x'), 0)
+        self.assertAlmostEqual(limiter.reserve('https://a.example/y'), 1.0, places=2)
+        self.assertAlmostEqual(limiter.reserve('https://a.example/z'), 2.0, places=2)
+        # Other hosts have their own schedule
+        self.assertEqual(limiter.reserve('https://b.example/x'), 0)
+        self.assertEqual(limiter.reserve('https://slow.example/x'), 0)
+        self.assertAlmostEqual(limiter.reserve('https://slow.example/y'), 5.0, places=2)
+
+
+class CrossPageDedupTest(unittest.TestCase):
+
+    def test_crawl_publications_dedupes_urls_and_titles_across_pages(self):
+        handler = listing_handler(PAGES)
+        with serve(handler) as base_url, tempfile.TemporaryDirectory() as data_dir:
+            scraper = ANGSPEScraper(data_dir=data_dir)
+            scraper.base_url = base_url
+            scraper.target_url = f"{base_url}/les-publications"
+            scraper.crawl_min_interval = 0
+            with contextlib.redirect_stdout(io.StringIO()):
+                publications = scraper.crawl_publications(f"<html><body>{PAGES['/les-publications']}</body></html>")
+        self.assertEqual([pub['title'] for pub in publications], [
+            'Rapport annuel 2023', 'Charte de gouvernance', 'Rapport annuel 2022', "Note d'orientation", 'Bilan 2021',
+        ])
+        self.assertEqual(len({pub['id'] for pub in publications}), 5)
+
+    def test_parse_pages_shares_dedup_state_between_pages(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            scraper = ANGSPEScraper(data_dir=data_dir)
+            pages = [(path, f"<html><body>{html}</body></html>") for path, html in PAGES.items()]
+            with contextlib.redirect_stdout(io.StringIO()):
+                together = scraper.parse_pages(pages)
+                separately = [pub for _, html in pages for pub in scraper.parse_publications(html, lean=True)]
+        self.assertEqual(len(together), 5)
+        self.assertEqual(len(separately), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
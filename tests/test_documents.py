@@ -0,0 +1,89 @@
+import asyncio
+import contextlib
+import io
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from async_scraper import AsyncANGSPEScraper
+from documents import DocumentCache, HashingWriter
+from tests.stub_server import StubHandler, serve
+
+URL = 'https://angspe.ma/uploads/rapport.pdf'
+BODY = b'%PDF-1.4\n' + b'rapport' * 100
+
+
+class UnchangedTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = DocumentCache(tempfile.mkdtemp(prefix='angspe-documents-'))
+
+    def cache_document(self, headers):
+        with self.cache.receive() as writer:
+            writer.write(BODY)
+            writer.file.flush()
+            return self.cache.store(URL, writer, headers)
+
+    def test_same_content_length_without_validators_is_unchanged(self):
+        self.cache_document({'Content-Length': str(len(BODY))})
+        self.assertTrue(self.cache.is_unchanged(URL, 200, {'Content-Length': str(len(BODY))}))
+        self.assertFalse(self.cache.is_unchanged(URL, 200, {'Content-Length': str(len(BODY) + 1)}))
+        self.assertTrue(self.cache.is_unchanged(URL, 304, {}))
+
+    def test_malformed_content_length_means_download_again(self):
+        entry = self.cache_document({'Content-Length': 'beaucoup'})
+        self.assertIsNone(entry['content_length'])
+        self.cache_document({'Content-Length': str(len(BODY))})
+        for length in ('beaucoup', '', '12, 12'):
+            self.assertFalse(self.cache.is_unchanged(URL, 200, {'Content-Length': length}))
+
+
+class DocumentHandler(StubHandler):
+    """A PDF with an ETag, 304 when the request carries it"""
+
+    etag = '"rapport-v1"'
+
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_body(b'', status=304, headers={'ETag': self.etag})
+        else:
+            self.send_body(BODY, content_type='application/pdf', headers={'ETag': self.etag})
+
+
+class AsyncDownloadTest(unittest.TestCase):
+
+    def download(self, scraper, url):
+        async def run():
+            scraper._semaphore = asyncio.Semaphore(2)
+            await scraper.open()
+            try:
+                return await scraper.download_documents([{'download_url': url}])
+            finally:
+                await scraper.aclose()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            return asyncio.run(run())[url]
+
+    def test_writes_run_off_the_event_loop(self):
+        scraper = AsyncANGSPEScraper(data_dir=tempfile.mkdtemp(prefix='angspe-data-'))
+        write = HashingWriter.write
+        threads = set()
+
+        def recording_write(writer, chunk):
+            threads.add(threading.current_thread())
+            write(writer, chunk)
+
+        with serve(DocumentHandler) as base_url, mock.patch.object(HashingWriter, 'write', recording_write):
+            url = f"{base_url}/uploads/rapport.pdf"
+            status, entry = self.download(scraper, url)
+            self.assertEqual(status, 'downloaded')
+            self.assertEqual(self.download(scraper, url)[0], 'unchanged')
+        self.assertEqual(entry['size'], len(BODY))
+        self.assertEqual((scraper.documents.directory / entry['path']).read_bytes(), BODY)
+        self.assertTrue(threads)
+        self.assertNotIn(threading.main_thread(), threads)
+
+
+if __name__ == '__main__':
+    unittest.main()
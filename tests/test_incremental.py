@@ -0,0 +1,143 @@
+import asyncio
+import random
+import tempfile
+import unittest
+
+from async_scraper import AsyncANGSPEScraper
+from scraper import ANGSPEScraper
+from tests.stub_server import StubHandler, serve
+
+
+def publication(name, year, category='Publications', size='2 Mo'):
+    return {
+        'title': f'Rapport {name}',
+        'download_url': f'https://angspe.ma/uploads/{name}.pdf',
+        'file_size': size,
+        'date_posted': f'01/02/{year}',
+        'category': category,
+        'file_type': 'PDF',
+    }
+
+
+class UpdateAnalysisTest(unittest.TestCase):
+    """update_analysis must give what analyze_publications computes from scratch"""
+
+    def setUp(self):
+        self.data_dir = tempfile.TemporaryDirectory()
+        self.scraper = ANGSPEScraper(data_dir=self.data_dir.name)
+
+    def tearDown(self):
+        self.data_dir.cleanup()
+
+    def with_ids(self, publications):
+        return [dict(pub, id=self.scraper.publication_id(pub)) for pub in publications]
+
+    def assert_incremental_matches_full(self, old, new):
+        old, new = self.with_ids(old), self.with_ids(new)
+        changes = self.scraper.diff_publications(old, new)
+        updated = self.scraper.update_analysis(self.scraper.analyze_publications(old), changes, new)
+        self.assertEqual(updated, self.scraper.analyze_publications(new))
+
+    def test_swap_of_latest_year_next_to_a_replacement(self):
+        a, b, c, d = publication('A', 2024), publication('B', 2024), publication('C', 2020), publication('D', 2020)
+        self.assert_incremental_matches_full([a, b, c], [b, a, d])
+
+    def test_reorder_only(self):
+        a, b = publication('A', 2024), publication('B', 2024)
+        self.assert_incremental_matches_full([a, b], [b, a])
+
+    def test_new_latest_year(self):
+        a, b = publication('A', 2023), publication('B', 2025, category='Autres rapports', size='500 ko')
+        self.assert_incremental_matches_full([a], [a, b])
+
+    def test_changed_fields(self):
+        a, b = publication('A', 2024), publication('B', 2023)
+        self.assert_incremental_matches_full([a, b], [dict(a, date_posted='01/02/2022'), dict(b, category='Documents')])
+
+    def test_random_change_sets(self):
+        rng = random.Random(7)
+        pool = [publication(f'P{n}', rng.choice([2021, 2022, 2023, 2024]),
+                            rng.choice(['Publications', 'Autres rapports']), f'{rng.randint(1, 9)} Mo')
+                for n in range(30)]
+        for _ in range(200):
+            old = rng.sample(pool, rng.randint(1, 12))
+            new = rng.sample(old, rng.randint(0, len(old))) + rng.sample(pool, rng.randint(0, 4))
+            new = list({pub['download_url']: pub for pub in new}.values())
+            if new:
+                rng.shuffle(new)
+                self.assert_incremental_matches_full(old, new)
+
+
+class DiffPublicationsTest(unittest.TestCase):
+
+    def test_change_set(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            scraper = ANGSPEScraper(data_dir=data_dir)
+            a, b, c = publication('A', 2024), publication('B', 2023), publication('C', 2022)
+            changed_b = dict(b, file_size='3 Mo')
+            changes = scraper.diff_publications([a, b], [changed_b, c])
+        self.assertEqual(changes['added'], [c])
+        self.assertEqual(changes['removed'], [a])
+        self.assertEqual(changes['changed'], [(b, changed_b)])
+
+
+
+class ValidatorHandler(StubHandler):
+    """The listing page with validators, 304 when a request carries them"""
+
+    etag = '"v1"'
+    last_modified = 'Wed, 01 Jan 2025 00:00:00 GMT'
+    conditional_requests = []
+
+    def do_GET(self):
+        headers = {'ETag': self.etag, 'Last-Modified': self.last_modified}
+        conditional = (self.headers.get('If-None-Match'), self.headers.get('If-Modified-Since'))
+        type(self).conditional_requests.append(conditional)
+        if conditional == (self.etag, self.last_modified):
+            self.send_body(b'', status=304, headers=headers)
+        else:
+            self.send_body('<html><body>Publications</body></html>', headers=headers)
+
+
+class ConditionalFetchTest(unittest.TestCase):
+    """Both scrapers send the saved validators and take a 304 as the page not being modified"""
+
+    def setUp(self):
+        self.data_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.data_dir.cleanup)
+        ValidatorHandler.conditional_requests = []
+
+    def check(self, scraper, fetch):
+        with serve(ValidatorHandler) as base_url:
+            scraper.target_url = f"{base_url}/les-publications"
+            self.assertIn('Publications', fetch(scraper, True))
+            # Validators are only saved with the results, so a failed run fetches again
+            self.assertEqual(scraper.conditional_headers(), {})
+            scraper.save_validators()
+            self.assertIsNone(fetch(scraper, True))
+            self.assertTrue(scraper.page_not_modified)
+            self.assertIn('Publications', fetch(scraper, False))
+            self.assertFalse(scraper.page_not_modified)
+        self.assertEqual(ValidatorHandler.conditional_requests, [
+            (None, None), (ValidatorHandler.etag, ValidatorHandler.last_modified), (None, None)
+        ])
+
+    def test_sync_scraper(self):
+        self.check(ANGSPEScraper(data_dir=self.data_dir.name),
+                   lambda scraper, conditional: scraper.fetch_page_html(conditional))
+
+    def test_async_scraper(self):
+        async def fetch(scraper, conditional):
+            scraper._semaphore = asyncio.Semaphore(1)
+            await scraper.open()
+            try:
+                return await scraper.fetch_page_html(conditional)
+            finally:
+                await scraper.aclose()
+
+        self.check(AsyncANGSPEScraper(data_dir=self.data_dir.name),
+                   lambda scraper, conditional: asyncio.run(fetch(scraper, conditional)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from near_duplicates import DEFAULT_THRESHOLD, NearDuplicateIndex, parse_threshold
+from scraper import ANGSPEScraper, fuzzy_title_threshold
+
+
+def publication(title, n):
+    return {'title': title, 'download_url': f'https://angspe.ma/uploads/{n}.pdf'}
+
+
+class DefaultThresholdTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.TemporaryDirectory()
+        self.scraper = ANGSPEScraper(data_dir=self.data_dir.name)
+
+    def tearDown(self):
+        self.data_dir.cleanup()
+
+    def dedupe(self, titles):
+        self.scraper.fuzzy_title_threshold = fuzzy_title_threshold(['scraper.py', '--fuzzy-titles'])
+        with contextlib.redirect_stdout(io.StringIO()):
+            kept = self.scraper.dedupe_near_titles([publication(title, n) for n, title in enumerate(titles)])
+        return [pub['title'] for pub in kept]
+
+    def test_cli_and_index_share_the_default(self):
+        self.assertEqual(fuzzy_title_threshold(['scraper.py', '--fuzzy-titles']), DEFAULT_THRESHOLD)
+        self.assertEqual(NearDuplicateIndex().threshold, DEFAULT_THRESHOLD)
+
+    def test_default_drops_a_version_suffix(self):
+        self.assertEqual(self.dedupe(['Rapport annuel 2023', 'Rapport annuel 2023 (version finale)']),
+                         ['Rapport annuel 2023'])
+
+    def test_default_drops_accent_variants(self):
+        self.assertEqual(self.dedupe(["Rapport sur l'État actionnaire 2023 - 2024",
+                                      "Rapport sur l'Etat actionnaire 2023 - 2024"]),
+                         ["Rapport sur l'État actionnaire 2023 - 2024"])
+
+    def test_different_numbers_or_subjects_are_kept(self):
+        titles = ['Rapport annuel 2023', 'Rapport annuel 2024', 'Charte de gouvernance pour les EEP',
+                  "Note d'orientation stratégique", "Note d'orientation budgétaire"]
+        self.assertEqual(self.dedupe(titles), titles)
+
+
+class ThresholdSettingTest(unittest.TestCase):
+
+    def test_parse_threshold(self):
+        self.assertEqual(parse_threshold('0.7'), 0.7)
+        self.assertEqual(parse_threshold('1'), 1.0)
+        for value in ('', 'abc', '0', '-0.2', '1.5', None):
+            self.assertIsNone(parse_threshold(value), value)
+
+    def test_invalid_cli_value_falls_back_to_the_default(self):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(fuzzy_title_threshold(['--fuzzy-titles=beaucoup']), DEFAULT_THRESHOLD)
+        self.assertIn('Invalid --fuzzy-titles', out.getvalue())
+        self.assertEqual(fuzzy_title_threshold(['--fuzzy-titles=0.9']), 0.9)
+        self.assertIsNone(fuzzy_title_threshold(['--force']))
+
+    def test_malformed_environment_value_does_not_break_app_startup(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, '-c', 'import app.scrape_worker as w; print(w.FUZZY_TITLE_THRESHOLD)'],
+            cwd=root, capture_output=True, text=True,
+            env={**os.environ, 'ANGSPE_FUZZY_TITLE_THRESHOLD': 'zero-point-eight'}
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], str(DEFAULT_THRESHOLD))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import contextlib
+import io
+import tempfile
+import unittest
+
+import extraction
+from benchmarks.page_generator import generate_links_page, generate_sections_page
+from scraper import ANGSPEScraper
+
+
+class BareLinksTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.TemporaryDirectory()
+        self.scraper = ANGSPEScraper(data_dir=self.data_dir.name)
+
+    def tearDown(self):
+        self.data_dir.cleanup()
+
+    def parse(self, html):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.scraper.parse_publications(html, lean=True)
+
+    def test_generic_link_labels_take_the_title_from_the_heading(self):
+        publications = self.parse(generate_links_page(50))
+        self.assertEqual(len(publications), 50)
+        self.assertTrue(all(pub['title'].endswith(f"n°{i}") for i, pub in enumerate(
+            sorted(publications, key=lambda pub: int(pub['title'].rsplit('n°', 1)[1])))))
+
+    def test_descriptive_link_text_is_kept_as_title(self):
+        html = ('<div class="card"><h4>Titre de la carte</h4>'
+                '<a href="/uploads/rapport.pdf">Rapport annuel 2023</a></div>')
+        self.assertEqual([pub['title'] for pub in self.parse(html)], ['Rapport annuel 2023'])
+
+    def test_sections_layout(self):
+        self.assertEqual(len(self.parse(generate_sections_page(50))), 50)
+
+
+class TitleSourceTest(unittest.TestCase):
+    """Which text becomes a publication's title, identical in the full and lean parsers
+
+    Generic labels used to be kept as the title when 5 characters or longer
+    ("Télécharger", "Download"); they now defer to the nearby heading.
+    """
+
+    CARDS = (
+        ('<h4>Rapport sur l\'État actionnaire</h4>', 'etat.pdf', 'Télécharger'),
+        ('<h4>Charte de gouvernance</h4>', 'charte.pdf', 'Download'),
+        ('<h4>Note de conjoncture</h4>', 'note.pdf', 'PDF'),
+        ('<h4>Titre de la carte</h4>', 'annuel.pdf', 'Rapport annuel 2023'),
+        ('', 'orphelin.pdf', 'Télécharger'),
+    )
+
+    def parse(self, lean):
+        html = ''.join(f'<div class="card">{heading}<a href="/uploads/{href}">{text}</a></div>'
+                       for heading, href, text in self.CARDS)
+        with tempfile.TemporaryDirectory() as data_dir, contextlib.redirect_stdout(io.StringIO()):
+            publications = ANGSPEScraper(data_dir=data_dir).parse_publications(html, lean=lean)
+        return {pub['download_url'].rsplit('/', 1)[1]: pub['title'] for pub in publications}
+
+    def test_titles(self):
+        expected = {
+            'etat.pdf': "Rapport sur l'État actionnaire",
+            'charte.pdf': 'Charte de gouvernance',
+            'note.pdf': 'Note de conjoncture',
+            'annuel.pdf': 'Rapport annuel 2023',
+            # Without a heading to fall back on, the label is all there is
+            'orphelin.pdf': 'Télécharger',
+        }
+        self.assertEqual(self.parse(lean=False), expected)
+        self.assertEqual(self.parse(lean=True), expected)
+
+
+class LinkTextTest(unittest.TestCase):
+
+    def test_generic_labels(self):
+        for text in ('Télécharger', '  TÉLÉCHARGER ', 'Download', 'PDF', 'Télécharger  le PDF', 'Voir', ''):
+            self.assertFalse(extraction.is_descriptive_link_text(text), text)
+        for text in ('Rapport annuel 2023', 'Charte de gouvernance'):
+            self.assertTrue(extraction.is_descriptive_link_text(text), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
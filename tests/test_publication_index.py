@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from publication_index import InvalidCursor, PublicationIndex, decode_cursor, encode_cursor
+
+
+def publication(n):
+    # Every title matches "rapport" with the same rank, so only the tie-break orders them
+    return {'id': f'pub{n:03d}', 'title': f'Rapport {n:03d}', 'category': 'Rapports',
+            'date_posted': '01/02/2024', 'file_type': 'PDF', 'download_url': f'https://angspe.ma/{n}.pdf'}
+
+
+class SearchPagingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = PublicationIndex(Path(tempfile.mkdtemp(prefix='angspe-index-')) / 'publications.db')
+        self.addCleanup(self.index.close)
+        self.index.sync([publication(n) for n in range(120)], '2025-01-01T00:00:00')
+
+    def test_offset_pages_through_every_match_once(self):
+        seen = []
+        for offset in range(0, 120, 25):
+            seen.extend(pub['id'] for pub, _ in self.index.search('rapport', limit=25, offset=offset))
+        self.assertEqual(len(seen), 120)
+        self.assertEqual(len(set(seen)), 120)
+        self.assertEqual(self.index.search('rapport', limit=25, offset=120), [])
+
+    def test_best_match_comes_first(self):
+        results = self.index.search('rapport 007', limit=5)
+        self.assertEqual(results[0][0]['id'], 'pub007')
+
+
+class CursorTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        for sort_value in ('2024-02-01', 3, 1.5, None):
+            self.assertEqual(decode_cursor(encode_cursor(sort_value, 'pub001')), (sort_value, 'pub001'))
+
+    def test_malformed_cursors_are_rejected(self):
+        # Not base64, not JSON, not a pair, then values SQLite can't bind: [{}, "x"] and ["x", 1]
+        for cursor in ('***', 'bm90IGpzb24', 'WzFd', 'W3t9LCJ4Il0', encode_cursor('x', 1), encode_cursor([1], 'x')):
+            with self.assertRaises(InvalidCursor, msg=cursor):
+                decode_cursor(cursor)
+
+    def test_query_rejects_a_forged_cursor(self):
+        index = PublicationIndex(Path(tempfile.mkdtemp(prefix='angspe-index-')) / 'publications.db')
+        self.addCleanup(index.close)
+        index.sync([publication(n) for n in range(3)], '2025-01-01T00:00:00')
+        with self.assertRaises(InvalidCursor):
+            index.query(limit=1, cursor='W3t9LCJ4Il0')
+
+
+if __name__ == '__main__':
+    unittest.main()
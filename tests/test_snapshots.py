@@ -0,0 +1,126 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from scraper import ANGSPEScraper
+from snapshots import ReplaySession, SnapshotArchive, SnapshotMiss, request_key
+from tests.stub_server import StubHandler, serve
+from transport import HTTPXSession, ResilientSession
+
+PAGE = '<html><body><h3>Rapport annuel 2023</h3><a href="/doc.pdf">Télécharger</a></body></html>'
+PDF = b'%PDF-1.4\n' + bytes(range(256)) * 800
+ETAG = '"v1"'
+
+
+class SiteHandler(StubHandler):
+    """The listing page, and a PDF honoring "Range: bytes=N-" and If-None-Match"""
+
+    def do_GET(self):
+        if self.path == '/les-publications':
+            self.send_body(PAGE, headers={'ETag': ETAG})
+        elif self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.headers.get('Range'):
+            offset = int(self.headers['Range'][len('bytes='):].rstrip('-'))
+            self.send_body(PDF[offset:], status=206, content_type='application/pdf', headers={
+                'Content-Range': f"bytes {offset}-{len(PDF) - 1}/{len(PDF)}"
+            })
+        else:
+            self.send_body(PDF, content_type='application/pdf', headers={'ETag': ETAG})
+
+
+class RecordReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp(prefix='angspe-snapshots-'))
+
+    def recording_session(self, session_class=ResilientSession, **kwargs):
+        session = session_class(**kwargs)
+        session.recorder = SnapshotArchive(self.directory)
+        self.addCleanup(session.close)
+        return session
+
+    def test_streamed_body_is_archived_as_it_is_read(self):
+        session = self.recording_session()
+        with serve(SiteHandler) as base_url:
+            url = f"{base_url}/doc.pdf"
+            with session.get(url, stream=True) as response:
+                self.assertNotIn(request_key('GET', url), session.recorder.index)
+                received = b''.join(response.iter_content(4096))
+        self.assertEqual(received, PDF)
+        entry = session.recorder.index[request_key('GET', url)]
+        self.assertEqual((entry['status'], entry['size'], entry['headers']['ETag']), (200, len(PDF), ETAG))
+        self.assertEqual(session.recorder.body(entry), PDF)
+        self.assertEqual(list(self.directory.glob('.object.*')), [])
+
+    def test_abandoned_stream_is_not_archived(self):
+        session = self.recording_session()
+        with serve(SiteHandler) as base_url:
+            url = f"{base_url}/doc.pdf"
+            with session.get(url, stream=True) as response:
+                next(response.iter_content(4096))
+        self.assertNotIn(request_key('GET', url), session.recorder.index)
+        self.assertEqual(list(self.directory.glob('.object.*')), [])
+        self.assertEqual(list(self.directory.glob('objects/*/*')), [])
+
+    def test_replay_answers_from_the_archive(self):
+        session = self.recording_session()
+        with serve(SiteHandler) as base_url:
+            page_url, pdf_url = f"{base_url}/les-publications", f"{base_url}/doc.pdf"
+            session.get(page_url)
+            with session.get(pdf_url, stream=True) as response:
+                for _ in response.iter_content(4096):
+                    pass
+            with session.get(pdf_url, stream=True, headers={'Range': 'bytes=1000-'}) as response:
+                self.assertEqual(response.content, PDF[1000:])
+            with session.get(pdf_url, stream=True, headers={'If-None-Match': ETAG}) as response:
+                self.assertEqual(response.status_code, 304)
+        session.recorder.save()
+
+        replay = ReplaySession(SnapshotArchive(self.directory))
+        self.assertEqual(replay.get(page_url).text, PAGE)
+        with replay.get(pdf_url, stream=True) as response:
+            self.assertEqual(b''.join(response.iter_content(4096)), PDF)
+        self.assertEqual(replay.get(pdf_url, headers={'Range': 'bytes=1000-'}).content, PDF[1000:])
+        self.assertEqual(replay.get(pdf_url, headers={'If-None-Match': ETAG}).status_code, 304)
+        with self.assertRaises(SnapshotMiss):
+            replay.get(f"{page_url}?page=2")
+        # Replayed responses never crossed the wire: no transfer sizes to report
+        self.assertEqual(replay.summary()['wire_bytes'], 0)
+        self.assertEqual(replay.summary()['decoded_bytes'], 0)
+
+    def test_httpx_backend_is_recorded(self):
+        session = self.recording_session(HTTPXSession, http2=False)
+        with serve(SiteHandler) as base_url:
+            url = f"{base_url}/doc.pdf"
+            with session.get(url, stream=True, headers={'Range': 'bytes=1000-'}) as response:
+                self.assertEqual(response.content, PDF[1000:])
+            self.assertEqual(session.get(f"{base_url}/les-publications").text, PAGE)
+        entry = session.recorder.index[request_key('GET', url, {'Range': 'bytes=1000-'})]
+        self.assertEqual((entry['status'], entry['size']), (206, len(PDF) - 1000))
+        self.assertEqual(len(session.recorder.index), 2)
+
+
+class FinishSnapshotTest(unittest.TestCase):
+
+    def test_run_without_publications_records_no_result(self):
+        directory = Path(tempfile.mkdtemp(prefix='angspe-snapshots-'))
+        scraper = ANGSPEScraper(data_dir=tempfile.mkdtemp(prefix='angspe-data-'))
+        archive = scraper.record_snapshots(directory)
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.finish_snapshot(None)
+        self.assertTrue(archive.index_file.exists())
+        self.assertFalse(archive.result_file.exists())
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.finish_snapshot([{'title': 'Rapport annuel 2023'}])
+        self.assertEqual(archive.check_result([{'title': 'Rapport annuel 2023'}]), True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,297 @@
+import contextlib
+import gzip
+import io
+import socket
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import requests
+
+from tests.stub_server import StubHandler, serve
+from transport import HTTP2_AVAILABLE, HTTPXSession, ResilientSession, retry_after_seconds
+
+BODY = ('<html><body>' + 'Rapport annuel sur la performance des EEP. ' * 200 + '</body></html>').encode('utf-8')
+
+
+def scripted_handler(responses, delay=0.0):
+    """Handler answering GET/POST with the next (status, headers) of responses, then 200s"""
+    lock = threading.Lock()
+
+    class Handler(StubHandler):
+        requests = []
+
+        def handle_request(self):
+            with lock:
+                type(self).requests.append((self.command, self.path, dict(self.headers)))
+                status, headers = responses.pop(0) if responses else (200, {})
+            time.sleep(delay)
+            body = BODY
+            if 'gzip' in self.headers.get('Accept-Encoding', '') and status == 200:
+                body = gzip.compress(BODY)
+                headers = {**headers, 'Content-Encoding': 'gzip'}
+            self.send_body(body, status=status, headers=headers)
+
+        do_GET = do_POST = handle_request
+
+    return Handler
+
+
+def range_handler():
+    """Handler serving BODY, or its tail from a "Range: bytes=N-" request as a 206"""
+
+    class Handler(StubHandler):
+        def do_GET(self):
+            if self.path == '/missing':
+                self.send_body(b'introuvable', status=404)
+                return
+            requested = self.headers.get('Range', '')
+            if requested.startswith('bytes='):
+                offset = int(requested[len('bytes='):].rstrip('-'))
+                self.send_body(BODY[offset:], status=206, content_type='application/pdf', headers={
+                    'Content-Range': f"bytes {offset}-{len(BODY) - 1}/{len(BODY)}"
+                })
+            else:
+                self.send_body(BODY, content_type='application/pdf')
+
+    return Handler
+
+
+def fast_session(**kwargs):
+    kwargs.setdefault('backoff_base', 0.01)
+    return ResilientSession(**kwargs)
+
+
+def unused_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class RetryTest(unittest.TestCase):
+
+    def get(self, session, url, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return session.get(url, **kwargs)
+
+    def test_retries_retryable_statuses_honoring_retry_after(self):
+        handler = scripted_handler([(503, {'Retry-After': '0'}), (502, {})])
+        session = fast_session()
+        with serve(handler) as base_url:
+            response = self.get(session, f"{base_url}/les-publications")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(handler.requests), 3)
+        summary = session.summary()
+        self.assertEqual((summary['requests'], summary['retries'], summary['failures']), (3, 2, 0))
+        self.assertEqual(summary['retry_budget_left'], 8)
+
+    def test_retry_budget_is_shared_across_requests(self):
+        handler = scripted_handler([(503, {})] * 10)
+        session = fast_session(retry_budget=2, max_attempts=4)
+        with serve(handler) as base_url:
+            first = self.get(session, f"{base_url}/a")
+            second = self.get(session, f"{base_url}/b")
+        # Three attempts for the first request used the budget up, the second isn't retried
+        self.assertEqual((first.status_code, second.status_code), (503, 503))
+        self.assertEqual([path for _, path, _ in handler.requests], ['/a', '/a', '/a', '/b'])
+        self.assertEqual(session.summary()['failures'], 2)
+        session.start_run()
+        self.assertEqual(session.retry_budget.remaining, 2)
+
+    def test_too_long_retry_after_is_not_waited_for(self):
+        handler = scripted_handler([(429, {'Retry-After': '3600'})])
+        session = fast_session()
+        with serve(handler) as base_url:
+            start = time.monotonic()
+            response = self.get(session, f"{base_url}/x")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(handler.requests), 1)
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_non_idempotent_requests_are_not_retried(self):
+        handler = scripted_handler([(503, {})])
+        session = fast_session()
+        with serve(handler) as base_url:
+            response = session.post(f"{base_url}/x", data=b'payload')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(handler.requests), 1)
+
+    def test_read_timeout_is_retried_then_raised(self):
+        handler = scripted_handler([], delay=0.5)
+        session = fast_session(max_attempts=2)
+        with serve(handler) as base_url:
+            with self.assertRaises(requests.Timeout):
+                self.get(session, f"{base_url}/slow", timeout=(1, 0.1))
+        self.assertEqual(len(handler.requests), 2)
+        timings = list(session.timings)
+        self.assertEqual([timing['retried'] for timing in timings], [True, False])
+        self.assertTrue(all(timing['error'] and timing['transfer'] is None for timing in timings))
+
+    def test_connection_refused_raises_connection_error(self):
+        session = fast_session(max_attempts=2)
+        with self.assertRaises(requests.ConnectionError):
+            self.get(session, f"http://127.0.0.1:{unused_port()}/x")
+        self.assertEqual(session.summary()['failures'], 1)
+
+    def test_default_timeout_applies(self):
+        session = fast_session(timeout=(1, 2))
+        seen = {}
+
+        def request_once(method, url, **kwargs):
+            seen.update(kwargs)
+            raise requests.ConnectionError('stop')
+        session.request_once = request_once
+        with self.assertRaises(requests.ConnectionError):
+            self.get(session, 'http://127.0.0.1/x')
+        self.assertEqual(seen['timeout'], (1, 2))
+
+
+class TimingTest(unittest.TestCase):
+
+    def test_phases_and_bytes(self):
+        session = fast_session()
+        session.headers['Accept-Encoding'] = 'gzip'
+        with serve(scripted_handler([])) as base_url:
+            session.get(f"{base_url}/x")
+            session.get(f"{base_url}/y")
+        first, second = session.timings
+        self.assertGreater(first['connect'], 0)
+        # The second request reuses the pooled connection
+        self.assertEqual(second['connect'], 0)
+        self.assertEqual(first['http_version'], 'HTTP/1.1')
+        self.assertEqual(first['decoded_bytes'], len(BODY))
+        self.assertEqual(first['wire_bytes'], len(gzip.compress(BODY)))
+        summary = session.summary()
+        self.assertEqual(summary['wire_bytes'], 2 * len(gzip.compress(BODY)))
+        self.assertEqual(summary['decoded_bytes'], 2 * len(BODY))
+
+    def test_streamed_transfer_is_timed_on_close(self):
+        session = fast_session()
+        with serve(scripted_handler([])) as base_url:
+            with session.get(f"{base_url}/doc.pdf", stream=True, headers={'Accept-Encoding': 'identity'}) as response:
+                self.assertIsNone(session.timings[-1]['transfer'])
+                received = b''.join(response.iter_content(1024))
+        timing = session.timings[-1]
+        self.assertEqual(received, BODY)
+        self.assertIsNotNone(timing['transfer'])
+        self.assertEqual(timing['wire_bytes'], len(BODY))
+        self.assertEqual(timing['decoded_bytes'], len(BODY))
+
+    def test_compressed_stream_leaves_decoded_size_unknown(self):
+        session = fast_session()
+        with serve(scripted_handler([])) as base_url:
+            with session.get(f"{base_url}/doc.pdf", stream=True) as response:
+                self.assertEqual(b''.join(response.iter_content(1024)), BODY)
+        timing = session.timings[-1]
+        self.assertEqual(timing['wire_bytes'], len(gzip.compress(BODY)))
+        self.assertIsNone(timing['decoded_bytes'])
+
+
+class SummaryTest(unittest.TestCase):
+
+    def test_bytes_only_count_responses_of_known_wire_size(self):
+        session = fast_session()
+        with serve(scripted_handler([])) as base_url:
+            session.get(f"{base_url}/x", headers={'Accept-Encoding': 'gzip'})
+        # A replayed response: decoded size known, nothing received on the wire
+        replayed = requests.Response()
+        replayed.status_code, replayed._content, replayed.raw = 200, BODY, None
+        session.record('GET', 'http://archive/x', replayed, None, 1, {}, 0.0, 0.001)
+        summary = session.summary()
+        self.assertEqual(summary['requests'], 2)
+        self.assertEqual(summary['wire_bytes'], len(gzip.compress(BODY)))
+        self.assertEqual(summary['decoded_bytes'], len(BODY))
+
+
+class HTTPXSessionTest(unittest.TestCase):
+
+    def session(self, **kwargs):
+        kwargs.setdefault('http2', False)
+        kwargs.setdefault('backoff_base', 0.01)
+        session = HTTPXSession(**kwargs)
+        self.addCleanup(session.close)
+        return session
+
+    def test_buffered_response_and_timing(self):
+        session = self.session()
+        with serve(scripted_handler([])) as base_url:
+            response = session.get(f"{base_url}/x", headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual((response.status_code, response.content), (200, BODY))
+        self.assertIn('Rapport annuel', response.text)
+        timing = session.timings[-1]
+        self.assertEqual(timing['http_version'], 'HTTP/1.1')
+        self.assertGreater(timing['connect'], 0)
+        self.assertIsNotNone(timing['transfer'])
+        self.assertEqual((timing['wire_bytes'], timing['decoded_bytes']), (len(gzip.compress(BODY)), len(BODY)))
+
+    def test_stream_and_range(self):
+        session = self.session()
+        with serve(range_handler()) as base_url:
+            with session.get(f"{base_url}/doc.pdf", stream=True) as response:
+                head = next(response.iter_content(1000))
+            with session.get(f"{base_url}/doc.pdf", stream=True, headers={'Range': 'bytes=1000-'}) as response:
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response.headers['Content-Range'], f"bytes 1000-{len(BODY) - 1}/{len(BODY)}")
+                tail = b''.join(response.iter_content(4096))
+        self.assertEqual(head[:1000] + tail, BODY)
+        timing = session.timings[-1]
+        self.assertIsNotNone(timing['transfer'])
+        self.assertEqual((timing['wire_bytes'], timing['decoded_bytes']), (len(BODY) - 1000, len(BODY) - 1000))
+
+    def test_retries_like_the_requests_backend(self):
+        handler = scripted_handler([(503, {'Retry-After': '0'})])
+        session = self.session()
+        with serve(handler) as base_url:
+            with contextlib.redirect_stdout(io.StringIO()):
+                response = session.get(f"{base_url}/x")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(handler.requests), 2)
+        self.assertEqual(session.summary()['retries'], 1)
+
+    def test_raise_for_status(self):
+        session = self.session()
+        with serve(range_handler()) as base_url:
+            response = session.get(f"{base_url}/missing")
+        self.assertFalse(response.ok)
+        with self.assertRaises(requests.HTTPError) as raised:
+            response.raise_for_status()
+        self.assertIs(raised.exception.response, response)
+
+    def test_errors_map_to_requests_exceptions(self):
+        session = self.session(max_attempts=2)
+        with contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(requests.ConnectionError):
+                session.get(f"http://127.0.0.1:{unused_port()}/x")
+            with serve(scripted_handler([], delay=0.5)) as base_url:
+                with self.assertRaises(requests.ReadTimeout):
+                    session.get(f"{base_url}/slow", timeout=(1, 0.1))
+        self.assertEqual([timing['retried'] for timing in session.timings], [True, False, True, False])
+
+    @unittest.skipUnless(HTTP2_AVAILABLE, 'h2 is not installed')
+    def test_http2_client_falls_back_to_http11_without_tls(self):
+        session = self.session(http2=True)
+        with serve(scripted_handler([])) as base_url:
+            response = session.get(f"{base_url}/x")
+        self.assertEqual((response.status_code, response.http_version), (200, 'HTTP/1.1'))
+
+
+class RetryAfterTest(unittest.TestCase):
+
+    def test_delta_seconds_and_http_date(self):
+        now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.assertEqual(retry_after_seconds('120'), 120.0)
+        self.assertEqual(retry_after_seconds(format_datetime(now + timedelta(seconds=30), usegmt=True), now=now), 30.0)
+        self.assertEqual(retry_after_seconds(format_datetime(now - timedelta(seconds=30), usegmt=True), now=now), 0.0)
+        self.assertIsNone(retry_after_seconds('bientôt'))
+        self.assertIsNone(retry_after_seconds(None))
+
+    def test_backoff_is_capped_full_jitter(self):
+        session = ResilientSession(backoff_base=1, backoff_cap=4)
+        delays = [session.backoff_delay(retry) for retry in range(6) for _ in range(50)]
+        self.assertTrue(all(0 <= delay <= 4 for delay in delays))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,496 @@
+"""
+Resilient HTTP transport for the scraper
+A requests.Session with a sized connection pool, separate connect and read
+timeouts, and retries with jittered exponential backoff. Retries are drawn
+from a budget shared by every request of a run, so a struggling site gets a
+few more chances instead of a retry storm. Each request records how long it
+spent resolving DNS, connecting (TCP + TLS), waiting for the first byte and
+transferring the body, and how many bytes crossed the wire against how many
+it decoded to.
+
+HTTPXSession offers the same interface over httpx, so the scraper can fetch
+over HTTP/2 (one multiplexed connection per host) when the h2 package is
+installed.
+"""
+
+import importlib.util
+import random
+import socket
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+# The timed connection classes override urllib3 2.x internals (_new_conn, _dns_host), hence urllib3>=2,<3
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (10, 30)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+RETRY_EXCEPTIONS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+# Both backends decode brotli when the brotli package is importable, so only then is it offered
+BROTLI_AVAILABLE = importlib.util.find_spec('brotli') is not None
+HTML_ACCEPT_ENCODING = 'br, gzip' if BROTLI_AVAILABLE else 'gzip'
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+# Phase durations of the request in flight on this thread, filled in by the connection classes
+_phases = threading.local()
+
+
+def _record_phase(name, seconds):
+    phases = getattr(_phases, 'current', None)
+    if phases is not None:
+        phases[name] = phases.get(name, 0.0) + seconds
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """HTTPConnection that times DNS resolution and connection setup separately"""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        host = self._dns_host
+        try:
+            infos = socket.getaddrinfo(host.strip('[]'), self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        _record_phase('dns', time.perf_counter() - start)
+        # Connect to each resolved address in turn, as create_connection would;
+        # the Host header and TLS SNI still use self.host
+        error = None
+        for address in dict.fromkeys(info[4][0] for info in infos):
+            self._dns_host = address
+            try:
+                return super()._new_conn()
+            except (ConnectTimeoutError, NewConnectionError) as e:
+                error = e
+            finally:
+                self._dns_host = host
+        raise error
+
+    def connect(self):
+        start = time.perf_counter()
+        phases = getattr(_phases, 'current', None)
+        dns_before = phases.get('dns', 0.0) if phases is not None else 0.0
+        try:
+            super().connect()
+        finally:
+            dns = (phases.get('dns', 0.0) if phases is not None else 0.0) - dns_before
+            _record_phase('connect', time.perf_counter() - start - dns)
+
+
+class TimedHTTPSConnection(TimedHTTPConnection, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools use the timed connection classes"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            # Until the response headers arrived: DNS + connect + request upload + server time
+            _record_phase('headers', time.perf_counter() - start)
+
+
+class RetryBudget:
+    """Retries allowed across every request of a run (thread-safe)"""
+
+    def __init__(self, retries=10):
+        self.retries = retries
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one retry from the budget; False once it is spent"""
+        with self._lock:
+            if self.used >= self.retries:
+                return False
+            self.used += 1
+            return True
+
+    def reset(self):
+        with self._lock:
+            self.used = 0
+
+    @property
+    def remaining(self):
+        return max(0, self.retries - self.used)
+
+
+def retry_after_seconds(value, now=None):
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP-date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+class ResilientSession(requests.Session):
+    """requests.Session with pooling, (connect, read) timeouts, budgeted retries and per-request timings
+
+    Requests that don't pass a timeout get DEFAULT_TIMEOUT. Idempotent
+    requests are retried on connection errors, timeouts and RETRY_STATUSES,
+    up to max_attempts each, while the shared retry budget lasts. The delay
+    before retry n is uniform in [0, min(backoff_cap, backoff_base * 2**n)]
+    ("full jitter"), or the server's Retry-After when that is longer; a
+    Retry-After beyond max_retry_after is not waited for.
+
+    When retries are exhausted the last response is returned (so callers'
+    raise_for_status() still applies) or the last exception re-raised.
+    """
+
+    def __init__(self, pool_size=10, timeout=DEFAULT_TIMEOUT, max_attempts=4, retry_budget=10,
+                 backoff_base=0.5, backoff_cap=30.0, max_retry_after=120.0, history=500):
+        super().__init__()
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.retry_budget = RetryBudget(retry_budget)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_retry_after = max_retry_after
+        # Optional SnapshotArchive every final response is stored in (see snapshots.py)
+        self.recorder = None
+        # Timings of the most recent request attempts, oldest first (see record())
+        self.timings = deque(maxlen=history)
+        self._timings_lock = threading.Lock()
+        adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def start_run(self):
+        """Refill the retry budget and forget previous timings"""
+        self.retry_budget.reset()
+        with self._timings_lock:
+            self.timings.clear()
+
+    def backoff_delay(self, retry, response=None):
+        """Delay before retry number retry (0-based), or None if the server asks for too long a wait"""
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** retry))
+        if response is not None:
+            retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                if retry_after > self.max_retry_after:
+                    return None
+                delay = max(delay, retry_after)
+        return delay
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        retryable = method.upper() in IDEMPOTENT_METHODS
+        attempt = 1
+        while True:
+            phases = _phases.current = {}
+            start = time.perf_counter()
+            response, error = None, None
+            try:
+                response = self.request_once(method, url, *args, **kwargs)
+            except RETRY_EXCEPTIONS as e:
+                error = e
+            finally:
+                _phases.current = None
+            end = time.perf_counter()
+
+            retry = retryable and attempt < self.max_attempts and (
+                error is not None or response.status_code in RETRY_STATUSES)
+            delay = self.backoff_delay(attempt - 1, response) if retry else None
+            if delay is not None and not self.retry_budget.acquire():
+                delay = None
+            self.record(method, url, response, error, attempt, phases, start, end,
+                        stream=kwargs.get('stream'), retried=delay is not None)
+
+            if delay is None:
+                if error is not None:
+                    raise error
+                if self.recorder is not None:
+                    response = self.recorder.store(method, url, kwargs.get('headers'), response,
+                                                   stream=kwargs.get('stream'))
+                return response
+            reason = error.__class__.__name__ if error is not None else f"HTTP {response.status_code}"
+            print(f"🔁 {reason} for {url}, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_attempts}, "
+                  f"{self.retry_budget.remaining} retries left this run)")
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def request_once(self, method, url, *args, **kwargs):
+        """Send one attempt of a request (overridden by other backends)"""
+        return super().request(method, url, *args, **kwargs)
+
+    def record(self, method, url, response, error, attempt, phases, start, end, stream=False, retried=False):
+        """Store the timing of one attempt
+
+        dns/connect are 0 on a reused pooled connection. ttfb runs from
+        sending the request to the response headers; transfer is the body
+        read, which for streamed responses is measured when they are closed.
+        wire_bytes is the body as received, decoded_bytes after undoing its
+        Content-Encoding (taken equal to wire_bytes for streamed responses
+        without one, and left None for compressed streamed responses).
+        """
+        elapsed = end - start
+        dns = phases.get('dns', 0.0)
+        connect = phases.get('connect', 0.0)
+        headers = phases.get('headers', elapsed)
+        timing = {
+            'method': method.upper(),
+            'url': url,
+            'status': response.status_code if response is not None else None,
+            'error': repr(error) if error is not None else None,
+            'attempt': attempt,
+            'retried': retried,
+            'dns': round(dns, 6),
+            'connect': round(connect, 6),
+            'ttfb': round(max(0.0, headers - dns - connect), 6),
+            'transfer': None if stream or response is None else round(max(0.0, elapsed - headers), 6),
+            'total': round(elapsed, 6),
+            'http_version': http_version(response),
+            'wire_bytes': None,
+            'decoded_bytes': None,
+        }
+        if response is not None:
+            if stream:
+                self._time_stream(response, timing, start + headers)
+            else:
+                timing['wire_bytes'] = wire_bytes(response)
+                timing['decoded_bytes'] = len(response.content)
+        with self._timings_lock:
+            self.timings.append(timing)
+
+    @staticmethod
+    def _time_stream(response, timing, headers_at):
+        """Complete a streamed response's timing when the caller closes it"""
+        close = response.close
+
+        def timed_close():
+            if timing['transfer'] is None:
+                timing['transfer'] = round(time.perf_counter() - headers_at, 6)
+                timing['total'] = round(timing['total'] + timing['transfer'], 6)
+                timing['wire_bytes'] = wire_bytes(response)
+                if response.headers.get('Content-Encoding', 'identity') == 'identity':
+                    timing['decoded_bytes'] = timing['wire_bytes']
+            close()
+        response.close = timed_close
+
+    def summary(self):
+        """Aggregate of the recorded timings: counts, retries, bytes, per-phase totals and the slowest requests
+
+        The byte totals only cover responses whose wire and decoded sizes are
+        both known (not compressed streams, nor replayed responses, which
+        never crossed the wire), so wire_bytes / decoded_bytes is the share
+        compression left to transfer.
+        """
+        with self._timings_lock:
+            timings = list(self.timings)
+        sized = [timing for timing in timings if timing['wire_bytes'] is not None and timing['decoded_bytes'] is not None]
+        phases = ('dns', 'connect', 'ttfb', 'transfer')
+        return {
+            'requests': len(timings),
+            'retries': sum(1 for timing in timings if timing['retried']),
+            'failures': sum(1 for timing in timings
+                            if not timing['retried'] and (timing['error'] or (timing['status'] or 0) >= 400)),
+            'retry_budget_left': self.retry_budget.remaining,
+            'http_versions': dict(Counter(timing['http_version'] for timing in timings if timing['http_version'])),
+            'wire_bytes': sum(timing['wire_bytes'] for timing in sized),
+            'decoded_bytes': sum(timing['decoded_bytes'] for timing in sized),
+            'phases': {phase: round(sum(timing[phase] or 0.0 for timing in timings), 3) for phase in phases},
+            'slowest': sorted(timings, key=lambda timing: timing['total'], reverse=True)[:5],
+        }
+
+
+def http_version(response):
+    """"HTTP/1.1", "HTTP/2", ... of a requests or HTTPXResponse response, or None"""
+    if response is None:
+        return None
+    if isinstance(response, HTTPXResponse):
+        return response.http_version
+    version = getattr(response.raw, 'version', None)
+    return f"HTTP/{version // 10}.{version % 10}" if version else None
+
+
+def wire_bytes(response):
+    """Body bytes received so far, before Content-Encoding decoding"""
+    raw = response.raw
+    return raw.tell() if raw is not None else None
+
+
+@contextmanager
+def requests_errors():
+    """Re-raise httpx errors as their requests counterparts, which callers already handle"""
+    try:
+        yield
+    except httpx.ConnectTimeout as e:
+        raise requests.ConnectTimeout(str(e)) from e
+    except httpx.TimeoutException as e:
+        raise requests.ReadTimeout(str(e)) from e
+    except httpx.RemoteProtocolError as e:
+        raise requests.exceptions.ChunkedEncodingError(str(e)) from e
+    except httpx.DecodingError as e:
+        raise requests.exceptions.ContentDecodingError(str(e)) from e
+    except httpx.TransportError as e:
+        raise requests.ConnectionError(str(e)) from e
+    except httpx.HTTPError as e:
+        raise requests.RequestException(str(e)) from e
+
+
+class _ByteCounter:
+    """Stands in for requests' response.raw: tell() is the number of body bytes received"""
+
+    def __init__(self, response):
+        self._response = response
+
+    def tell(self):
+        return self._response.num_bytes_downloaded
+
+
+class HTTPXResponse:
+    """The part of the requests.Response interface the scraper uses, over an httpx.Response"""
+
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.http_version = response.http_version
+        self.raw = _ByteCounter(response)
+        self._content = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def content(self):
+        # Read through iter_content, which a snapshot recorder may wrap to archive the body
+        if self._content is None:
+            self._content = b''.join(self.iter_content())
+        return self._content
+
+    @property
+    def text(self):
+        return self.content.decode(self._response.encoding or 'utf-8', errors='replace')
+
+    def iter_content(self, chunk_size=None):
+        with requests_errors():
+            yield from self._response.iter_bytes(chunk_size)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            kind = 'Client' if self.status_code < 500 else 'Server'
+            raise requests.HTTPError(f"{self.status_code} {kind} Error: {self._response.reason_phrase} for url: {self.url}",
+                                     response=self)
+
+    def close(self):
+        self._response.close()
+
+
+class HTTPXSession(ResilientSession):
+    """ResilientSession whose requests go through one httpx.Client, over HTTP/2 when http2 is True
+
+    HTTP/2 multiplexes concurrent requests (crawler and download threads)
+    over a single connection per host. httpx can't time DNS apart from the
+    TCP connect, so connect includes it and dns stays 0. Only the keyword
+    arguments the scraper uses are supported (headers, params, stream,
+    timeout, allow_redirects, data, json).
+    """
+
+    def __init__(self, pool_size=10, timeout=DEFAULT_TIMEOUT, http2=True, **kwargs):
+        super().__init__(pool_size=pool_size, timeout=timeout, **kwargs)
+        # Connection-specific headers are forbidden in HTTP/2
+        self.headers.pop('Connection', None)
+        self.client = httpx.Client(
+            http2=http2,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    @staticmethod
+    def _httpx_timeout(timeout):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(timeout)
+
+    @staticmethod
+    def _trace(event, info):
+        """httpcore trace hook: connection setup time, accumulated into the current attempt's phases"""
+        phases = getattr(_phases, 'current', None)
+        if phases is None or not event.startswith(('connection.connect_tcp.', 'connection.start_tls.')):
+            return
+        if event.endswith('.started'):
+            phases['_connect_started'] = time.perf_counter()
+        elif event.endswith('.complete') and '_connect_started' in phases:
+            _record_phase('connect', time.perf_counter() - phases.pop('_connect_started'))
+
+    def request_once(self, method, url, params=None, data=None, headers=None, timeout=None,
+                     allow_redirects=True, stream=False, json=None):
+        merged = {key: value for key, value in {**self.headers, **(headers or {})}.items() if value is not None}
+        request = self.client.build_request(
+            method, url, params=params, data=data, json=json, headers=merged,
+            timeout=self._httpx_timeout(timeout), extensions={'trace': self._trace}
+        )
+        start = time.perf_counter()
+        with requests_errors():
+            response = self.client.send(request, stream=True, follow_redirects=allow_redirects)
+        _record_phase('headers', time.perf_counter() - start)
+        response = HTTPXResponse(response)
+        if not stream:
+            try:
+                response.content
+            finally:
+                response.close()
+        return response
+
+    def close(self):
+        self.client.close()
+        super().close()
+
+
+def make_session(http2=False, **kwargs):
+    """HTTPXSession over HTTP/2 if asked for and h2 is installed, else a ResilientSession"""
+    if http2:
+        if HTTP2_AVAILABLE:
+            return HTTPXSession(http2=True, **kwargs)
+        print("⚠️ HTTP/2 needs the h2 package (pip install 'httpx[http2]'); using HTTP/1.1")
+    return ResilientSession(**kwargs)